@@ -1,81 +1,142 @@
-import requests
-import os
-from typing import Dict, Any, Optional
-import time
-import urllib.parse
-
-class PropertyAPIClient:
-    def __init__(self):
-        self.rapidapi_key = os.getenv("RAPIDAPI_KEY")
-        self.base_headers = {
-            "X-RapidAPI-Key": self.rapidapi_key
-        }
-    
-    def search_zillow(self, address: str) -> Dict[Any, Any]:
-        """Search Zillow API for property by address"""
-        headers = {
-            **self.base_headers,
-            "X-RapidAPI-Host": "zillow56.p.rapidapi.com"
-        }
-        
-        url = "https://zillow56.p.rapidapi.com/search"
-        querystring = {
-            "location": address
-        }
-        
-        try:
-            response = requests.get(url, headers=headers, params=querystring, timeout=10)
-            return response.json() if response.status_code == 200 else {"error": f"HTTP {response.status_code}"}
-        except Exception as e:
-            return {"error": str(e)}
-    
-    def search_realty_base(self, address: str) -> Dict[Any, Any]:
-        """Search Realty Base API for property by address"""
-        headers = {
-            **self.base_headers,
-            "X-RapidAPI-Host": "realty-base-us.p.rapidapi.com"
-        }
-        
-        # Try to extract city and state from address
-        parts = address.split(',')
-        if len(parts) >= 2:
-            city = parts[-2].strip()
-            state = parts[-1].strip().split()[0]  # Get state code
-        else:
-            city = address
-            state = ""
-        
-        url = "https://realty-base-us.p.rapidapi.com/search-buy"
-        querystring = {
-            "city": city,
-            "state": state
-        }
-        
-        try:
-            response = requests.get(url, headers=headers, params=querystring, timeout=10)
-            return response.json() if response.status_code == 200 else {"error": f"HTTP {response.status_code}"}
-        except Exception as e:
-            return {"error": str(e)}
-    
-    def generate_links(self, address: str) -> Dict[str, str]:
-        """Generate properly formatted direct links to Zillow and Realtor.com"""
-        
-        # URL encode the address for better link generation
-        encoded_address = urllib.parse.quote_plus(address)
-        
-        # Clean address for Zillow (they prefer dashes and specific format)
-        clean_address_zillow = address.replace(" ", "-").replace(",", "").lower()
-        clean_address_zillow = ''.join(c for c in clean_address_zillow if c.isalnum() or c in '-')
-        
-        # Clean address for Realtor.com (they prefer underscores)
-        clean_address_realtor = address.replace(" ", "_").replace(",", "").lower()
-        clean_address_realtor = ''.join(c for c in clean_address_realtor if c.isalnum() or c in '_')
-        
-        # Generate search URLs (more reliable than direct property URLs)
-        zillow_link = f"https://www.zillow.com/homes/{encoded_address}_rb/"
-        realtor_link = f"https://www.realtor.com/realestateandhomes-search/{encoded_address}"
-        
-        return {
-            "zillow_link": zillow_link,
-            "realtor_link": realtor_link
-        }
\ No newline at end of file
+import httpx
+import os
+import time
+from typing import Callable, Dict, Any, Optional, Tuple
+import urllib.parse
+
+from .rate_limit import get_rate_limiter, RateLimitScheduler, PRIORITY_BULK
+from .decoding import decode_realty_base, decode_zillow, loads
+from .metrics import RATE_LIMIT_WAIT_SECONDS
+
+ZILLOW_HOST = "zillow56.p.rapidapi.com"
+REALTY_BASE_HOST = "realty-base-us.p.rapidapi.com"
+
+# Override to point at a mock server (see benchmarks/mock_rapidapi.py)
+ZILLOW_BASE_URL = os.getenv("ZILLOW_BASE_URL", f"https://{ZILLOW_HOST}").rstrip("/")
+REALTY_BASE_BASE_URL = os.getenv("REALTY_BASE_BASE_URL", f"https://{REALTY_BASE_HOST}").rstrip("/")
+
+# Seconds to hold back a host after a 429 without a Retry-After header
+RATE_LIMIT_BACKOFF = float(os.getenv("RATE_LIMIT_BACKOFF", "5"))
+
+# HTTP client configuration
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared pooled async HTTP client"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE
+            )
+        )
+    return _http_client
+
+async def close_http_client():
+    """Close the shared HTTP client and its connection pool"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+def realty_city_state(address: str) -> Tuple[str, str]:
+    """Extract the city and state code Realty Base searches by"""
+    parts = address.split(',')
+    if len(parts) >= 2:
+        city = parts[-2].strip()
+        state = (parts[-1].strip().split() or [""])[0]  # Get state code
+    else:
+        city = address
+        state = ""
+    return city, state
+
+def generate_links(address: str) -> Dict[str, str]:
+    """Search links for an address; derived at read time instead of being stored with each inquiry"""
+    
+    # URL encode the address; search URLs are more reliable than direct property URLs
+    encoded_address = urllib.parse.quote_plus(address)
+    return {
+        "zillow_link": f"https://www.zillow.com/homes/{encoded_address}_rb/",
+        "realtor_link": f"https://www.realtor.com/realestateandhomes-search/{encoded_address}"
+    }
+
+class PropertyAPIClient:
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[RateLimitScheduler] = None
+    ):
+        self.rapidapi_key = os.getenv("RAPIDAPI_KEY")
+        self.base_headers = {
+            "X-RapidAPI-Key": self.rapidapi_key or ""
+        }
+        self.http_client = http_client or get_http_client()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+    
+    async def _get(
+        self,
+        host: str,
+        url: str,
+        params: Dict[str, str],
+        priority: int,
+        timeout: float = None,
+        on_latency: Optional[Callable[[float], None]] = None,
+        decode: Callable[[bytes], Any] = loads
+    ) -> Dict[Any, Any]:
+        """Send a rate-limited GET to a RapidAPI host and return the decoded body
+        
+        on_latency receives the request time in seconds, excluding any rate limiter wait.
+        decode turns the raw body into the dict providers read, e.g. projected to a few fields.
+        """
+        headers = {
+            **self.base_headers,
+            "X-RapidAPI-Host": host
+        }
+        
+        started = None
+        try:
+            with RATE_LIMIT_WAIT_SECONDS.time(host=host):
+                await self.rate_limiter.acquire(host, priority)
+            started = time.perf_counter()
+            response = await self.http_client.get(url, headers=headers, params=params, timeout=timeout or HTTP_TIMEOUT)
+            if response.status_code == 429:
+                retry_after = response.headers.get("Retry-After", "")
+                await self.rate_limiter.penalize(host, float(retry_after) if retry_after.isdigit() else RATE_LIMIT_BACKOFF)
+            data = decode(response.content) if response.status_code == 200 else {"error": f"HTTP {response.status_code}"}
+        except Exception as e:
+            data = {"error": str(e) or type(e).__name__}
+        
+        if on_latency and started is not None:
+            on_latency(time.perf_counter() - started)
+        return data
+    
+    async def search_zillow(self, address: str, priority: int = PRIORITY_BULK, **options) -> Dict[Any, Any]:
+        """Search Zillow API for property by address"""
+        url = f"{ZILLOW_BASE_URL}/search"
+        querystring = {
+            "location": address
+        }
+        
+        return await self._get(ZILLOW_HOST, url, querystring, priority, decode=decode_zillow, **options)
+    
+    async def search_realty_base(self, address: str, priority: int = PRIORITY_BULK, **options) -> Dict[Any, Any]:
+        """Search Realty Base API for property by address"""
+        city, state = realty_city_state(address)
+        
+        url = f"{REALTY_BASE_BASE_URL}/search-buy"
+        querystring = {
+            "city": city,
+            "state": state
+        }
+        
+        return await self._get(REALTY_BASE_HOST, url, querystring, priority, decode=decode_realty_base, **options)
+    
+    def generate_links(self, address: str) -> Dict[str, str]:
+        """Generate properly formatted direct links to Zillow and Realtor.com"""
+        return generate_links(address)
\ No newline at end of file
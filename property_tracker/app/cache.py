@@ -0,0 +1,213 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from .database import AddressResultCache, SessionLocal
+from .normalize import address_key
+
+# Cache configuration
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_PERSISTENT_ENTRIES = int(os.getenv("CACHE_MAX_PERSISTENT_ENTRIES", "500000"))
+CACHE_DATABASE_URL = os.getenv("CACHE_DATABASE_URL")  # e.g. sqlite:///./address_cache.db for dev
+
+# Seconds to keep a result, matched against the status text (case-insensitive substring)
+CACHE_TTLS = {
+    "not found": 3600,
+    "sold": 30 * 86400,
+    "pending": 86400,
+    "default": 12 * 3600,
+}
+for _item in filter(None, os.getenv("CACHE_TTLS", "").split(",")):
+    _status, _, _seconds = _item.partition("=")
+    CACHE_TTLS[_status.strip().lower()] = int(_seconds)
+
+# Statuses that are never cached
+UNCACHED_STATUSES = {"error"}
+
+# Result fields that are derived from the address and rebuilt on every hit
+DERIVED_FIELDS = {"address", "zillow_link", "realtor_link"}
+
+# Prices are shown to users but never written to the database
+UNSTORED_FIELDS = {"price"}
+
+# How many writes between persistent-tier eviction passes
+EVICTION_INTERVAL = 1000
+
+def normalize_cache_key(address: str) -> str:
+    """Build a cache key that ignores case, punctuation, spacing, ZIP and USPS abbreviation differences"""
+    return address_key(address)
+
+def ttl_for_status(status: Optional[str]) -> int:
+    """Return the cache lifetime in seconds for a result status"""
+    status = (status or "").lower()
+    if status in UNCACHED_STATUSES:
+        return 0
+    for name, ttl in CACHE_TTLS.items():
+        if name != "default" and name in status:
+            return ttl
+    return CACHE_TTLS["default"]
+
+class AddressCache:
+    """Two-tier cache of property lookups: in-memory LRU backed by a database table"""
+
+    def __init__(
+        self,
+        max_entries: int = None,
+        max_persistent_entries: int = None,
+        session_factory=None
+    ):
+        self.max_entries = max_entries or CACHE_MAX_ENTRIES
+        self.max_persistent_entries = max_persistent_entries or CACHE_MAX_PERSISTENT_ENTRIES
+        self.session_factory = session_factory
+        self._entries: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._writes = 0
+        self.counters = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "memory_evictions": 0,
+            "persistent_evictions": 0,
+            "persistent_errors": 0,
+        }
+
+    async def get(self, address: str) -> Optional[Dict[str, Any]]:
+        """Return cached result fields for an address, or None"""
+
+        key = normalize_cache_key(address)
+        now = time.time()
+
+        entry = self._entries.get(key)
+        if entry:
+            expires_at, data = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return data
+            del self._entries[key]
+
+        if self.session_factory:
+            try:
+                row = await asyncio.to_thread(self._load, key, now)
+            except Exception:
+                # A broken persistent tier degrades to a miss, never a failed lookup
+                self.counters["persistent_errors"] += 1
+                row = None
+            if row:
+                expires_at, data = row
+                self._remember(key, expires_at, data)
+                self.counters["persistent_hits"] += 1
+                return data
+
+        self.counters["misses"] += 1
+        return None
+
+    async def set(self, address: str, status: Optional[str], data: Dict[str, Any]):
+        """Cache result fields for an address using the TTL for its status"""
+
+        ttl = ttl_for_status(status)
+        if ttl <= 0:
+            return
+
+        key = normalize_cache_key(address)
+        data = {k: v for k, v in data.items() if k not in DERIVED_FIELDS}
+        expires_at = time.time() + ttl
+
+        self._remember(key, expires_at, data)
+        self.counters["writes"] += 1
+
+        if self.session_factory:
+            self._writes += 1
+            evict = self._writes % EVICTION_INTERVAL == 0
+            try:
+                await asyncio.to_thread(self._store, key, status, expires_at, data, evict)
+            except Exception:
+                self.counters["persistent_errors"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes"""
+        lookups = self.counters["memory_hits"] + self.counters["persistent_hits"] + self.counters["misses"]
+        hits = lookups - self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "max_persistent_entries": self.max_persistent_entries,
+            "persistent": self.session_factory is not None,
+        }
+
+    def _remember(self, key: str, expires_at: float, data: Dict[str, Any]):
+        self._entries[key] = (expires_at, data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["memory_evictions"] += 1
+
+    def _load(self, key: str, now: float):
+        db = self.session_factory()
+        try:
+            row = db.get(AddressResultCache, key)
+            if row and row.expires_at > now:
+                return row.expires_at, json.loads(row.result)
+            return None
+        finally:
+            db.close()
+
+    def _store(self, key: str, status: str, expires_at: float, data: Dict[str, Any], evict: bool):
+        db = self.session_factory()
+        try:
+            db.merge(AddressResultCache(
+                cache_key=key,
+                status=status,
+                result=json.dumps({k: v for k, v in data.items() if k not in UNSTORED_FIELDS}),
+                expires_at=expires_at
+            ))
+            db.commit()
+            if evict:
+                self._evict(db)
+        finally:
+            db.close()
+
+    def _evict(self, db):
+        # Drop expired rows, then the least recently written rows over the size limit
+        removed = db.query(AddressResultCache).filter(
+            AddressResultCache.expires_at <= time.time()
+        ).delete(synchronize_session=False)
+
+        excess = db.query(AddressResultCache).count() - self.max_persistent_entries
+        if excess > 0:
+            oldest = select(AddressResultCache.cache_key).order_by(
+                AddressResultCache.updated_at
+            ).limit(excess)
+            removed += db.query(AddressResultCache).filter(
+                AddressResultCache.cache_key.in_(oldest)
+            ).delete(synchronize_session=False)
+
+        db.commit()
+        self.counters["persistent_evictions"] += removed
+
+_cache: Optional[AddressCache] = None
+
+def get_address_cache() -> Optional[AddressCache]:
+    """Return the process-wide address cache, or None when caching is disabled"""
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    if _cache is None:
+        if CACHE_DATABASE_URL:
+            # Dedicated cache store, e.g. a local SQLite file in development
+            cache_engine = create_engine(CACHE_DATABASE_URL)
+            AddressResultCache.__table__.create(bind=cache_engine, checkfirst=True)
+            session_factory = sessionmaker(autocommit=False, autoflush=False, bind=cache_engine)
+        else:
+            session_factory = SessionLocal
+        _cache = AddressCache(session_factory=session_factory)
+    return _cache
@@ -0,0 +1,182 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .api_clients import PropertyAPIClient, realty_city_state
+from .decoding import REALTY_BASE_STREET_FIELDS
+from .normalize import UNIT_DESIGNATORS, address_key
+from .rate_limit import PRIORITY_BULK
+
+# Seconds a downloaded Realty Base city listing is reused
+REALTY_CITY_TTL = int(os.getenv("REALTY_CITY_TTL", "3600"))
+REALTY_CITY_MAX_ENTRIES = int(os.getenv("REALTY_CITY_MAX_ENTRIES", "500"))
+
+# Unit designators (normalized) that start the secondary part of a street line
+_UNIT_TOKENS = set(UNIT_DESIGNATORS.values()) | {"#"}
+
+def street_key(street: str) -> str:
+    """Normalized street line, e.g. '123 n main st apt 4'"""
+    return address_key(street.split(",")[0])
+
+def _base_street_key(key: str) -> str:
+    # Street key without its apartment/suite part
+    tokens = key.split()
+    for i, token in enumerate(tokens):
+        if i and token in _UNIT_TOKENS:
+            return " ".join(tokens[:i])
+    return key
+
+def record_street(record: Dict[str, Any]) -> Optional[str]:
+    """Street line of a Realty Base listing, from whichever field this payload uses"""
+    for candidate in (record.get(field) for field in REALTY_BASE_STREET_FIELDS):
+        if isinstance(candidate, dict):
+            candidate = (
+                candidate.get("line") or candidate.get("street") or candidate.get("line1")
+                or candidate.get("streetAddress") or candidate.get("address")
+            )
+        if isinstance(candidate, dict):
+            candidate = candidate.get("line") or candidate.get("street")
+        if isinstance(candidate, str) and candidate.strip():
+            return candidate
+    return None
+
+class CityListing:
+    """One city/state search result indexed by normalized street address"""
+
+    def __init__(self, records: List[Dict[str, Any]], expires_at: float):
+        self.records = records
+        self.expires_at = expires_at
+        self.by_street: Dict[str, Dict[str, Any]] = {}
+        self.by_base_street: Dict[str, Optional[Dict[str, Any]]] = {}
+
+        for record in records:
+            street = record_street(record)
+            if not street:
+                continue
+            key = street_key(street)
+            self.by_street.setdefault(key, record)
+            base = _base_street_key(key)
+            # Ambiguous when several units share a building address
+            if base in self.by_base_street and self.by_base_street[base] is not record:
+                self.by_base_street[base] = None
+            else:
+                self.by_base_street[base] = record
+
+    def match(self, address: str) -> Optional[Dict[str, Any]]:
+        """Listing for this address, or None when the city has no such street address"""
+        if not self.by_street:
+            # Nothing to match against: keep the old first-row pick
+            return self.records[0] if self.records else None
+
+        key = street_key(address)
+        record = self.by_street.get(key)
+        if record is None:
+            record = self.by_base_street.get(_base_street_key(key))
+        return record
+
+class CityListingCache:
+    """LRU of Realty Base city listings; one upstream call per city, shared by concurrent lookups"""
+
+    def __init__(self, ttl: int = None, max_entries: int = None):
+        self.ttl = ttl or REALTY_CITY_TTL
+        self.max_entries = max_entries or REALTY_CITY_MAX_ENTRIES
+        self._entries: "OrderedDict[tuple, CityListing]" = OrderedDict()
+        self._in_flight: Dict[tuple, asyncio.Task] = {}
+        self.counters = {"hits": 0, "fetches": 0, "shared_fetches": 0, "matched": 0, "unmatched": 0}
+
+    async def search(
+        self,
+        api_client: PropertyAPIClient,
+        address: str,
+        priority: int = PRIORITY_BULK,
+        **options
+    ) -> Dict[str, Any]:
+        """Realty Base search reduced to the listing matching this address
+
+        Returns {"data": [record]} on a match, {"data": []} on a miss and the
+        upstream error dict if the city listing could not be fetched.
+        """
+
+        cached = self.cached(address)
+        if cached is not None:
+            return cached
+
+        listing = await self._fetch(self._key(address), api_client, address, priority, options)
+        if isinstance(listing, dict):
+            return listing
+        return self._match(listing, address)
+
+    def cached(self, address: str) -> Optional[Dict[str, Any]]:
+        """The search answer from a fresh listing already downloaded, or None if the city needs a download"""
+        key = self._key(address)
+        listing = self._entries.get(key)
+        if not listing or listing.expires_at <= time.time():
+            return None
+        self._entries.move_to_end(key)
+        self.counters["hits"] += 1
+        return self._match(listing, address)
+
+    def _key(self, address: str) -> tuple:
+        city, state = realty_city_state(address)
+        return (address_key(city), state.lower())
+
+    def _match(self, listing: CityListing, address: str) -> Dict[str, Any]:
+        record = listing.match(address)
+        self.counters["matched" if record is not None else "unmatched"] += 1
+        return {"data": [record] if record is not None else []}
+
+    async def _fetch(self, key: tuple, api_client: PropertyAPIClient, address: str, priority: int, options: dict):
+        # The download runs in its own task, as in SingleFlight.run, so a cancelled
+        # caller (e.g. a losing hedge) neither fails the others nor reaches them as data
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._download(key, api_client, address, priority, options))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.counters["shared_fetches"] += 1
+        return await asyncio.shield(task)
+
+    async def _download(self, key: tuple, api_client: PropertyAPIClient, address: str, priority: int, options: dict):
+        data = await api_client.search_realty_base(address, priority, **options)
+
+        self.counters["fetches"] += 1
+        if "error" in data:
+            # Errors are shared with current waiters but never cached
+            return data
+
+        listing = CityListing(data.get("data") or [], time.time() + self.ttl)
+        self._entries[key] = listing
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return listing
+
+    def _forget(self, key: tuple, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark retrieved so a failure nobody waited for is not reported as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "cities": len(self._entries), "max_entries": self.max_entries, "ttl": self.ttl}
+
+_cache: Optional[CityListingCache] = None
+
+def get_city_listing_cache() -> CityListingCache:
+    """Return the process-wide Realty Base city listing cache"""
+    global _cache
+    if _cache is None:
+        _cache = CityListingCache()
+    return _cache
+
+async def search_realty_base_listing(api_client: PropertyAPIClient, address: str, priority: int = PRIORITY_BULK, **options):
+    """Provider search function: Realty Base through the city listing cache"""
+    return await get_city_listing_cache().search(api_client, address, priority, **options)
+
+def cached_realty_base_listing(address: str) -> Optional[Dict[str, Any]]:
+    """Provider cache function: the Realty Base answer when the city listing is already downloaded"""
+    return get_city_listing_cache().cached(address)
@@ -1,62 +1,267 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Float, Text, Boolean
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.sql import func
-import os
-from typing import Generator
-
-# Database configuration
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-Base = declarative_base()
-
-# Database Models
-class PropertyInquiry(Base):
-    __tablename__ = "property_inquiries"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    address = Column(String, index=True)
-    search_type = Column(String)  # 'single' or 'bulk'
-    status = Column(String)
-    # REMOVED: price = Column(String)  # Price removed from database
-    property_type = Column(String)
-    bedrooms = Column(Integer)
-    bathrooms = Column(Float)
-    square_feet = Column(Integer)
-    zillow_link = Column(Text)
-    realtor_link = Column(Text)
-    api_source = Column(String)  # 'zillow' or 'realty_base'
-    success = Column(Boolean, default=False)
-    error_message = Column(Text)
-    user_ip = Column(String)
-    user_agent = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-
-class SearchSession(Base):
-    __tablename__ = "search_sessions"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String, unique=True, index=True)
-    search_type = Column(String)  # 'single' or 'bulk'
-    total_addresses = Column(Integer)
-    successful_searches = Column(Integer, default=0)
-    failed_searches = Column(Integer, default=0)
-    user_ip = Column(String)
-    user_agent = Column(Text)
-    filename = Column(String)  # for bulk uploads
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    completed_at = Column(DateTime(timezone=True))
-
-# Create tables
-Base.metadata.create_all(bind=engine)
-
-# Dependency to get DB session
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+from sqlalchemy import create_engine, text, Column, Index, Integer, BigInteger, String, DateTime, Float, Text, Boolean
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.sql.expression import FunctionElement
+import asyncio
+import os
+import time
+from typing import Any, AsyncGenerator, Dict, Generator
+
+# Database configuration
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+# Connection pool configuration (applies to both the sync and async engines)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; stay under RDS/proxy idle timeouts
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Async drivers for each sync URL scheme
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str) -> str:
+    """Swap a sync database URL's driver for its asyncio equivalent"""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+# Derived from DATABASE_URL when unset, once the async engine is first needed
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Checkout metrics for every pool in this process, keyed by engine name
+pool_stats: Dict[str, Dict[str, float]] = {}
+
+def _timed_pool(pool_class, name: str):
+    """Subclass a queue pool so each checkout records how long it waited"""
+
+    stats = pool_stats.setdefault(name, {
+        "checkouts": 0,
+        "checkout_timeouts": 0,
+        "total_wait_seconds": 0.0,
+        "max_wait_seconds": 0.0,
+    })
+
+    class TimedPool(pool_class):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            except PoolTimeoutError:
+                stats["checkout_timeouts"] += 1
+                raise
+            finally:
+                waited = time.perf_counter() - started
+                stats["checkouts"] += 1
+                stats["total_wait_seconds"] += waited
+                stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+
+    return TimedPool
+
+def _pool_options(pool_class, name: str) -> Dict[str, Any]:
+    return {
+        "poolclass": _timed_pool(pool_class, name),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+_engine = None
+_async_engine = None
+
+def get_engine():
+    """Sync engine for background threads (jobs, write-behind buffer, exports, CLI tools), created on first use"""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(DATABASE_URL, **_pool_options(QueuePool, "sync"))
+    return _engine
+
+def get_async_engine():
+    """Async engine for request handlers, so DB round trips do not block the event loop"""
+    global _async_engine
+    if _async_engine is None:
+        url = ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+        _async_engine = create_async_engine(url, **_pool_options(AsyncAdaptedQueuePool, "async"))
+    return _async_engine
+
+async def warm_up_engines():
+    """Open one connection in each engine's pool, so the first requests do not pay for connecting"""
+    async with get_async_engine().connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+    def connect_sync():
+        with get_engine().connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    await asyncio.to_thread(connect_sync)
+
+async def dispose_engines():
+    """Close pooled connections of both engines, e.g. at shutdown"""
+    global _engine, _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
+
+class _LazySession(Session):
+    # Binds to the engine when the first session is opened, not at import
+    def __init__(self, **kw):
+        if kw.get("bind") is None:
+            kw["bind"] = get_engine()
+        super().__init__(**kw)
+
+class _LazyAsyncSession(AsyncSession):
+    def __init__(self, **kw):
+        if kw.get("bind") is None:
+            kw["bind"] = get_async_engine()
+        super().__init__(**kw)
+
+SessionLocal = sessionmaker(class_=_LazySession, autocommit=False, autoflush=False)
+AsyncSessionLocal = async_sessionmaker(class_=_LazyAsyncSession, autoflush=False, expire_on_commit=False)
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Return checkout counts, wait times and current occupancy for each pool that has been opened"""
+    result = {}
+    engines = (("sync", _engine), ("async", _async_engine.sync_engine if _async_engine else None))
+    for name, db_engine in engines:
+        if db_engine is None:
+            continue
+        stats = pool_stats[name]
+        pool = db_engine.pool
+        checkouts = stats["checkouts"]
+        result[name] = {
+            **stats,
+            "avg_wait_seconds": round(stats["total_wait_seconds"] / checkouts, 6) if checkouts else 0.0,
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "idle": pool.checkedin(),
+        }
+    return result
+
+class utc_now(FunctionElement):
+    """Current timestamp as a column default, stored the way bound datetimes are
+
+    SQLite keeps datetimes as text. SQLAlchemy binds them as
+    'YYYY-MM-DD HH:MM:SS.ffffff' but CURRENT_TIMESTAMP writes no fraction, so
+    the two compare wrongly as strings; write the same six-digit fraction.
+    """
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+@compiles(utc_now)
+def _utc_now_default(element, compiler, **kw):
+    return "now()"
+
+@compiles(utc_now, "sqlite")
+def _utc_now_sqlite(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+Base = declarative_base()
+
+# Database Models
+class PropertyInquiry(Base):
+    # On PostgreSQL the table is range-partitioned by month on created_at with a
+    # (id, created_at) primary key; see migration 0008 and app.retention
+    __tablename__ = "property_inquiries"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, index=True)
+    row_number = Column(Integer)  # position in the uploaded file for bulk searches
+    address = Column(String, index=True)
+    address_key = Column(String)  # normalized address, see app.normalize
+    search_type = Column(String)  # 'single', 'bulk' or 'batch'
+    status = Column(String)
+    previous_status = Column(String)  # status from the last run, for refresh uploads
+    # REMOVED: price = Column(String)  # Price removed from database
+    property_type = Column(String)
+    bedrooms = Column(Integer)
+    bathrooms = Column(Float)
+    square_feet = Column(Integer)
+    # zillow_link/realtor_link are derived from the address at read time, see api_clients.generate_links
+    api_source = Column(String)  # 'zillow' or 'realty_base'
+    success = Column(Boolean, default=False)
+    error_message = Column(Text)
+    user_ip = Column(String)
+    user_agent = Column(Text)
+    checked_at = Column(DateTime(timezone=True))  # when the status was fetched upstream
+    created_at = Column(DateTime(timezone=True), server_default=utc_now())
+    
+    # Keyset pagination on (created_at, id), optionally narrowed by one filter column
+    __table_args__ = (
+        Index("ix_property_inquiries_created_at_id", "created_at", "id"),
+        Index("ix_property_inquiries_session_created", "session_id", "created_at", "id"),
+        Index("ix_property_inquiries_success_created", "success", "created_at", "id"),
+        Index("ix_property_inquiries_source_created", "api_source", "created_at", "id"),
+        Index("ix_property_inquiries_status_created", "status", "created_at", "id"),
+        # Latest result per address for refresh uploads
+        Index("ix_property_inquiries_address_key_created", "address_key", "created_at"),
+    )
+
+class SearchSession(Base):
+    __tablename__ = "search_sessions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, unique=True, index=True)
+    search_type = Column(String)  # 'single', 'bulk' or 'batch'
+    total_addresses = Column(Integer)
+    successful_searches = Column(Integer, default=0)
+    failed_searches = Column(Integer, default=0)
+    user_ip = Column(String)
+    user_agent = Column(Text)
+    filename = Column(String)  # for bulk uploads
+    mode = Column(String, default="full")  # 'full' or 'refresh' for bulk uploads
+    status = Column(String, default="completed")  # 'queued', 'running', 'completed' or 'failed'
+    file_path = Column(String)  # spooled upload, kept until the bulk job finishes
+    processed_rows = Column(Integer, default=0)  # rows checkpointed so far
+    claimed_by = Column(String)  # worker currently running the bulk job
+    heartbeat_at = Column(DateTime(timezone=True))
+    error_message = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=utc_now())
+    completed_at = Column(DateTime(timezone=True))
+
+class InquiryCounter(Base):
+    __tablename__ = "inquiry_counters"
+    
+    name = Column(String, primary_key=True)  # e.g. 'total_inquiries', 'successful_searches'
+    value = Column(BigInteger, nullable=False, default=0)
+
+class AddressSearchCount(Base):
+    __tablename__ = "address_search_counts"
+    
+    address = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0, index=True)
+
+class AddressResultCache(Base):
+    __tablename__ = "address_result_cache"
+    
+    cache_key = Column(String, primary_key=True)  # normalized address
+    status = Column(String)
+    result = Column(Text)  # JSON-encoded PropertyResult fields
+    expires_at = Column(Float, index=True)  # unix timestamp
+    updated_at = Column(DateTime(timezone=True), server_default=utc_now(), onupdate=utc_now(), index=True)
+
+# Dependency to get DB session
+def get_db() -> Generator[Session, None, None]:
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Dependency to get an async DB session
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -0,0 +1,131 @@
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 'projected' keeps only the fields lookups read; 'full' decodes whole bodies like response.json()
+UPSTREAM_DECODING = os.getenv("UPSTREAM_DECODING", "projected")
+
+# Bytes scanned for the Zillow results key before falling back to a full decode
+DECODE_SCAN_LIMIT = int(os.getenv("DECODE_SCAN_LIMIT", "65536"))
+
+# Smaller bodies are cheaper to decode whole than to scan
+DECODE_SCAN_MIN = 4096
+
+# Fields read from a Zillow result by providers.parse_zillow
+ZILLOW_FIELDS = ("statusText", "formattedPrice", "propertyType", "bedrooms", "bathrooms", "livingArea")
+
+# Fields read from a Realty Base record by providers.parse_realty_base and city_listings.record_street
+REALTY_BASE_STREET_FIELDS = ("address", "location", "streetAddress")
+REALTY_BASE_FIELDS = ("price", "beds", "baths") + REALTY_BASE_STREET_FIELDS
+
+def loads(body: bytes) -> Any:
+    """Decode JSON with orjson when it is installed"""
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+def project(record: Any, fields: Iterable[str]) -> Any:
+    """Copy of a decoded record with only the given keys"""
+    if not isinstance(record, dict):
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+# JSON strings (with escapes) and brackets; everything between them can be skipped.
+# A lone quote is an unterminated string, matched so a bad body fails in one pass
+_TOKEN_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]|"')
+_ARRAY_START_RE = re.compile(rb'\s*:\s*\[\s*')
+# Everything up to the next bracket outside a string, then that bracket (or an unterminated quote)
+_BRACKET_RE = re.compile(rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*(?:([\[\]{}])|")')
+
+def first_array_item(body: bytes, key: str, scan_limit: int = None) -> Optional[bytes]:
+    """Raw bytes of the first element of the top-level array under key, without decoding the rest
+
+    Returns b"" for an empty array, and None when the body is not laid out
+    that way or the key is too far in (decode the whole body instead).
+    """
+
+    scan_limit = DECODE_SCAN_LIMIT if scan_limit is None else scan_limit
+    marker = b'"' + key.encode() + b'"'
+    position = body.find(marker, 0, scan_limit)
+    if position < 0:
+        return None
+
+    # The marker must be a key of the outermost object, not nested or inside a string
+    depth = 0
+    for token in _TOKEN_RE.finditer(body):
+        if token.start() >= position:
+            break
+        if token.end() > position or token.group() == b'"':
+            return None
+        depth += {b"{": 1, b"[": 1, b"}": -1, b"]": -1}.get(token.group(), 0)
+    if depth != 1:
+        return None
+
+    opening = _ARRAY_START_RE.match(body, position + len(marker))
+    if opening is None:
+        return None
+    start = opening.end()
+    if body[start:start + 1] == b"]":
+        return b""
+    if body[start:start + 1] != b"{":
+        return None
+
+    # Stop at the bracket that closes the first element; strings are skipped inside the regex
+    depth = 0
+    for token in _BRACKET_RE.finditer(body, start):
+        bracket = token.group(1)
+        if bracket is None:
+            return None
+        if bracket in (b"{", b"["):
+            depth += 1
+        elif bracket in (b"}", b"]"):
+            depth -= 1
+            if depth == 0:
+                return body[start:token.end()]
+    return None
+
+def _keep_error(data: Dict[str, Any], decoded: Dict[str, Any]) -> Dict[str, Any]:
+    # Providers treat a top-level "error" as an upstream failure
+    if "error" in data:
+        decoded["error"] = data["error"]
+    return decoded
+
+def decode_zillow(body: bytes) -> Any:
+    """Zillow /search body reduced to {"results": [first result's fields]}"""
+
+    if UPSTREAM_DECODING == "full":
+        return loads(body)
+
+    # Bodies mentioning "error" take the full decode, which keeps a top-level error
+    scan = len(body) >= DECODE_SCAN_MIN and b'"error"' not in body
+    raw = first_array_item(body, "results") if scan else None
+    if raw == b"":
+        return {"results": []}
+    if raw is not None:
+        first = loads(raw)
+        if isinstance(first, dict):
+            return {"results": [project(first, ZILLOW_FIELDS)]}
+
+    data = loads(body)
+    if not isinstance(data, dict):
+        return data
+    results = data.get("results")
+    return _keep_error(data, {"results": [project(results[0], ZILLOW_FIELDS)] if results else []})
+
+def decode_realty_base(body: bytes) -> Any:
+    """Realty Base /search-buy body with every record reduced to the fields matching and parsing read
+
+    The whole listing is kept, since one city download serves every address in it.
+    """
+
+    data = loads(body)
+    if UPSTREAM_DECODING == "full" or not isinstance(data, dict):
+        return data
+    records = data.get("data")
+    if not isinstance(records, list):
+        return data
+    return _keep_error(data, {"data": [project(record, REALTY_BASE_FIELDS) for record in records]})
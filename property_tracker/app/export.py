@@ -0,0 +1,178 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from sqlalchemy import select
+
+from .api_clients import generate_links
+from .database import PropertyInquiry, SessionLocal
+
+# Rows fetched from the server-side cursor (and encoded) per chunk
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))
+
+# Columns written to every export, in order; user_ip/user_agent are left out
+EXPORT_COLUMNS = [
+    "id", "session_id", "row_number", "address", "search_type", "status", "previous_status",
+    "property_type", "bedrooms", "bathrooms", "square_feet", "api_source",
+    "success", "error_message", "zillow_link", "realtor_link", "created_at",
+]
+
+# Export columns computed from the address instead of read from the table
+LINK_COLUMNS = {"zillow_link", "realtor_link"}
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+def iter_inquiry_batches(
+    session_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    batch_size: int = None
+) -> Iterator[List[tuple]]:
+    """Yield lists of inquiry rows from a server-side cursor
+
+    A session export is in file order (row_number); a date range export is
+    in insertion order.
+    """
+
+    stored = [name for name in EXPORT_COLUMNS if name not in LINK_COLUMNS]
+    stmt = select(*[getattr(PropertyInquiry, name) for name in stored])
+
+    if session_id is not None:
+        stmt = stmt.where(PropertyInquiry.session_id == session_id)
+    if created_from is not None:
+        stmt = stmt.where(PropertyInquiry.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(PropertyInquiry.created_at < created_to)
+
+    if session_id is not None:
+        stmt = stmt.order_by(PropertyInquiry.row_number, PropertyInquiry.id)
+    else:
+        stmt = stmt.order_by(PropertyInquiry.created_at, PropertyInquiry.id)
+
+    # yield_per streams results (named cursor on PostgreSQL) instead of buffering them all
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=batch_size or EXPORT_BATCH_ROWS))
+        for partition in result.partitions():
+            yield [_with_links(row) for row in partition]
+    finally:
+        db.close()
+
+def _with_links(row) -> tuple:
+    values = {**row._mapping, **generate_links(row.address)}
+    return tuple(values[name] for name in EXPORT_COLUMNS)
+
+def _jsonable(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def encode_csv(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    """Encode row batches as CSV, one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+
+    for rows in batches:
+        writer.writerows([[_jsonable(value) for value in row] for row in rows])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Header only, when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def encode_ndjson(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    """Encode row batches as newline-delimited JSON objects"""
+    for rows in batches:
+        lines = [
+            json.dumps({name: _jsonable(value) for name, value in zip(EXPORT_COLUMNS, row)})
+            for row in rows
+        ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the generator"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def parquet_schema(columns: List[str]):
+    """Arrow schema for the given property_inquiries columns"""
+    import pyarrow as pa
+
+    types = {
+        "id": pa.int64(),
+        "row_number": pa.int64(),
+        "bedrooms": pa.int64(),
+        "bathrooms": pa.float64(),
+        "square_feet": pa.int64(),
+        "success": pa.bool_(),
+        "checked_at": pa.timestamp("us"),
+        "created_at": pa.timestamp("us"),
+    }
+    return pa.schema([(name, types.get(name, pa.string())) for name in columns])
+
+def write_parquet_batch(writer, rows: List[tuple]):
+    """Write row tuples, in schema column order, as one row group"""
+    import pyarrow as pa
+
+    schema = writer.schema
+    columns = list(zip(*rows))
+    writer.write_table(pa.Table.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema
+    ))
+
+def encode_parquet(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    """Encode row batches as a Parquet file, one row group per batch"""
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, parquet_schema(EXPORT_COLUMNS), compression="snappy")
+    try:
+        for rows in batches:
+            write_parquet_batch(writer, rows)
+            yield sink.drain()
+    finally:
+        # Footer is written on close
+        writer.close()
+    yield sink.drain()
+
+ENCODERS = {
+    "csv": encode_csv,
+    "ndjson": encode_ndjson,
+    "parquet": encode_parquet,
+}
+
+def export_inquiries(fmt: str, **filters) -> Iterator[bytes]:
+    """Stream matching inquiries encoded as csv, ndjson or parquet"""
+    return ENCODERS[fmt](iter_inquiry_batches(**filters))
@@ -0,0 +1,144 @@
+import asyncio
+import csv
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+from .metrics import UPLOAD_PARSE_SECONDS, UPLOAD_ROWS
+
+# Rows read from a CSV file per chunk
+CSV_CHUNK_SIZE = int(os.getenv("CSV_CHUNK_SIZE", "1000"))
+
+# 'pandas' or 'csv'; the csv module is faster for the single address column but skips pandas' NA handling
+CSV_PARSER = os.getenv("CSV_PARSER", "pandas")
+
+# Processes converting uploads to address lists; 0 converts in a thread instead
+UPLOAD_PARSE_WORKERS = int(os.getenv("UPLOAD_PARSE_WORKERS", "2"))
+
+# Converted uploads: one address per line, read by bulk jobs without pandas or openpyxl
+ADDRESS_LINES_SUFFIX = ".addresses.txt"
+
+# Flexible address column names, in order of preference
+ADDRESS_COLUMNS = ['address', 'Address', 'property_address', 'Property Address', 'full_address']
+
+def pick_address_column(columns: List) -> str:
+    """Return the address column name, falling back to the first column"""
+    for col in ADDRESS_COLUMNS:
+        if col in columns:
+            return col
+    return columns[0]
+
+def iter_addresses(file_path: str, chunk_size: int = None) -> Iterator[str]:
+    """Lazily yield non-empty addresses from an uploaded CSV/Excel file or a converted address list"""
+    if file_path.endswith(ADDRESS_LINES_SUFFIX):
+        return _iter_address_lines(file_path)
+    if file_path.endswith('.csv'):
+        if CSV_PARSER == "csv":
+            return _iter_csv_addresses_fast(file_path)
+        return _iter_csv_addresses(file_path, chunk_size or CSV_CHUNK_SIZE)
+    return _iter_excel_addresses(file_path, chunk_size or CSV_CHUNK_SIZE)
+
+def _iter_address_lines(file_path: str) -> Iterator[str]:
+    with open(file_path, encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+def _iter_csv_addresses(file_path: str, chunk_size: int) -> Iterator[str]:
+    # Imported here so workers that never parse an upload do not pay for pandas
+    import pandas as pd
+
+    # Read the header once, then only the address column a chunk at a time
+    columns = list(pd.read_csv(file_path, nrows=0).columns)
+    address_col = pick_address_column(columns)
+
+    for chunk in pd.read_csv(file_path, usecols=[address_col], chunksize=chunk_size):
+        yield from (str(address) for address in chunk[address_col].dropna())
+
+def _iter_csv_addresses_fast(file_path: str) -> Iterator[str]:
+    # Plain csv module: no pandas import and no per-chunk DataFrames
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return
+
+        address_idx = header.index(pick_address_column(header))
+        for row in reader:
+            if address_idx < len(row) and row[address_idx].strip():
+                yield row[address_idx]
+
+def _iter_excel_addresses(file_path: str, chunk_size: int) -> Iterator[str]:
+    from openpyxl import load_workbook
+
+    # Read-only mode streams rows from the sheet XML instead of loading every cell
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            return
+
+        address_idx = header.index(pick_address_column(list(header)))
+
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield from (
+                str(row[address_idx]) for row in chunk
+                if address_idx < len(row) and row[address_idx] is not None and row[address_idx] != ""
+            )
+    finally:
+        workbook.close()
+
+def convert_to_address_lines(file_path: str, lines_path: str) -> int:
+    """Write the addresses of an upload to lines_path, one per line; return how many
+
+    Runs in a parse worker process, so slow openpyxl/pandas parsing never blocks the event loop.
+    """
+    rows = 0
+    try:
+        with open(lines_path, "w", encoding="utf-8") as out:
+            for address in iter_addresses(file_path):
+                out.write(" ".join(address.splitlines()) + "\n")
+                rows += 1
+    except BaseException:
+        os.remove(lines_path)
+        raise
+    return rows
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the process pool for upload parsing, or None when UPLOAD_PARSE_WORKERS is 0"""
+    global _parse_pool
+    if _parse_pool is None and UPLOAD_PARSE_WORKERS > 0:
+        # Spawned rather than forked, so children do not inherit the event loop and open connections
+        _parse_pool = ProcessPoolExecutor(UPLOAD_PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _parse_pool
+
+def shutdown_parse_pool():
+    global _parse_pool
+    if _parse_pool is not None:
+        # Waits for conversions already running; their jobs are requeued and start over
+        _parse_pool.shutdown(wait=True, cancel_futures=True)
+        _parse_pool = None
+
+async def prepare_upload(file_path: str) -> Tuple[str, int]:
+    """Convert an upload to an address list off the event loop; return its path and row count"""
+
+    lines_path = os.path.splitext(file_path)[0] + ADDRESS_LINES_SUFFIX
+    file_format = "csv" if file_path.endswith(".csv") else "excel"
+
+    started = time.perf_counter()
+    pool = get_parse_pool()
+    if pool is not None:
+        rows = await asyncio.get_running_loop().run_in_executor(pool, convert_to_address_lines, file_path, lines_path)
+    else:
+        rows = await asyncio.to_thread(convert_to_address_lines, file_path, lines_path)
+    UPLOAD_PARSE_SECONDS.observe(time.perf_counter() - started, format=file_format)
+    UPLOAD_ROWS.inc(rows, format=file_format)
+    return lines_path, rows
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .database import PropertyInquiry, SessionLocal
+from .stats import record_inquiries
+from .metrics import INQUIRY_FLUSH_SECONDS, INQUIRY_ROWS_WRITTEN
+
+logger = logging.getLogger(__name__)
+
+# Write-behind configuration
+INQUIRY_BATCH_SIZE = int(os.getenv("INQUIRY_BATCH_SIZE", "200"))
+INQUIRY_FLUSH_INTERVAL = float(os.getenv("INQUIRY_FLUSH_INTERVAL", "1.0"))  # seconds
+INQUIRY_MAX_PENDING = int(os.getenv("INQUIRY_MAX_PENDING", "5000"))
+# Seconds a search waits for room in a full shared buffer before failing
+INQUIRY_BACKPRESSURE_TIMEOUT = float(os.getenv("INQUIRY_BACKPRESSURE_TIMEOUT", "10"))
+
+# Totals across every writer in this process
+flush_stats = {
+    "flushes": 0,
+    "rows_written": 0,
+    "flush_errors": 0,
+    "backpressure_waits": 0,
+    "last_batch_size": 0,
+    "max_batch_size": 0,
+    "last_flush_seconds": 0.0,
+    "max_flush_seconds": 0.0,
+    "total_flush_seconds": 0.0,
+}
+
+class InquiryBacklogFull(Exception):
+    """The buffer stayed full for the backpressure timeout, e.g. while the database is failing"""
+
+def get_flush_stats() -> Dict[str, Any]:
+    """Return batch size and flush latency metrics for inquiry writes"""
+    flushes = flush_stats["flushes"]
+    return {
+        **flush_stats,
+        "avg_batch_size": round(flush_stats["rows_written"] / flushes, 2) if flushes else 0.0,
+        "avg_flush_seconds": round(flush_stats["total_flush_seconds"] / flushes, 6) if flushes else 0.0,
+    }
+
+class InquiryWriter:
+    """Buffer PropertyInquiry rows and bulk-insert them on size or time thresholds
+
+    on_flush(db, state) runs inside the same transaction as each insert, with the
+    most recent state passed to add(), so callers can commit progress atomically
+    with the rows it describes.
+    """
+
+    def __init__(
+        self,
+        session_factory=None,
+        batch_size: int = None,
+        flush_interval: float = None,
+        max_pending: int = None,
+        on_flush: Optional[Callable[[Session, Any], None]] = None,
+        backpressure_timeout: Optional[float] = None
+    ):
+        self.session_factory = session_factory or SessionLocal
+        self.batch_size = batch_size or INQUIRY_BATCH_SIZE
+        self.flush_interval = flush_interval or INQUIRY_FLUSH_INTERVAL
+        self.max_pending = max(max_pending or INQUIRY_MAX_PENDING, self.batch_size)
+        self.on_flush = on_flush
+        # None waits for as long as it takes, as bulk jobs do
+        self.backpressure_timeout = backpressure_timeout
+        self._buffer: List[Dict[str, Any]] = []
+        self._state: Any = None
+        self._flush_lock = asyncio.Lock()
+        self._space = asyncio.Condition()
+        self._wake = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    async def add(self, row: Dict[str, Any], state: Any = None):
+        """Queue one inquiry row, waiting for a flush if the buffer is full
+
+        Raises InquiryBacklogFull if there is still no room after backpressure_timeout.
+        """
+
+        if len(self._buffer) >= self.max_pending:
+            flush_stats["backpressure_waits"] += 1
+            self._wake.set()
+            async with self._space:
+                try:
+                    await asyncio.wait_for(
+                        self._space.wait_for(lambda: len(self._buffer) < self.max_pending),
+                        self.backpressure_timeout
+                    )
+                except asyncio.TimeoutError:
+                    raise InquiryBacklogFull(f"{self.pending} inquiry rows waiting to be written") from None
+
+        self._buffer.append(row)
+        if state is not None:
+            self._state = state
+
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+        self._ensure_flusher()
+
+    async def flush(self, state: Any = None):
+        """Write all buffered rows (and the latest state) in one transaction"""
+
+        async with self._flush_lock:
+            await self._flush(state)
+        async with self._space:
+            self._space.notify_all()
+
+    async def flush_session(self, session_id: str):
+        """Write buffered rows now if any belong to session_id, e.g. before the session is marked complete
+
+        A flush already in progress may be writing them, so it is waited for
+        first; concurrent callers then share one write instead of each committing.
+        """
+
+        async with self._flush_lock:
+            if any(row.get("session_id") == session_id for row in self._buffer):
+                await self._flush()
+        async with self._space:
+            self._space.notify_all()
+
+    async def _flush(self, state: Any = None):
+        # Called with _flush_lock held
+        if state is not None:
+            self._state = state
+        if not self._buffer and self._state is None:
+            return
+
+        rows, state = self._buffer, self._state
+        self._buffer, self._state = [], None
+
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._write, rows, state)
+        except Exception:
+            # Put the batch back so a later flush can retry it
+            flush_stats["flush_errors"] += 1
+            self._buffer[:0] = rows
+            if self._state is None:
+                self._state = state
+            raise
+
+        elapsed = time.perf_counter() - started
+        INQUIRY_FLUSH_SECONDS.observe(elapsed)
+        INQUIRY_ROWS_WRITTEN.inc(len(rows))
+        flush_stats["flushes"] += 1
+        flush_stats["rows_written"] += len(rows)
+        flush_stats["last_batch_size"] = len(rows)
+        flush_stats["max_batch_size"] = max(flush_stats["max_batch_size"], len(rows))
+        flush_stats["last_flush_seconds"] = round(elapsed, 6)
+        flush_stats["max_flush_seconds"] = max(flush_stats["max_flush_seconds"], round(elapsed, 6))
+        flush_stats["total_flush_seconds"] += elapsed
+
+    def discard(self):
+        """Drop buffered rows without writing them"""
+        self._buffer, self._state = [], None
+
+    async def stop(self):
+        """Stop the background flusher after any flush in progress; buffered rows are kept"""
+        if self._flusher:
+            self._stopping = True
+            self._wake.set()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+            self._stopping = False
+
+    async def close(self):
+        """Stop the background flusher and write whatever is still buffered"""
+        await self.stop()
+        await self.flush()
+
+    def _ensure_flusher(self):
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._stopping:
+                return
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Inquiry flush failed; will retry")
+
+    def _write(self, rows: List[Dict[str, Any]], state: Any):
+        db = self.session_factory()
+        try:
+            if rows:
+                db.execute(insert(PropertyInquiry), rows)
+                record_inquiries(db, rows)
+            if self.on_flush and state is not None:
+                self.on_flush(db, state)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+_writer: Optional[InquiryWriter] = None
+
+def get_inquiry_writer() -> InquiryWriter:
+    """Return the shared writer used for single searches"""
+    global _writer
+    if _writer is None:
+        _writer = InquiryWriter(backpressure_timeout=INQUIRY_BACKPRESSURE_TIMEOUT)
+    return _writer
+
+async def close_inquiry_writer():
+    """Flush the shared writer, e.g. at shutdown"""
+    global _writer
+    if _writer is not None:
+        await _writer.close()
+        _writer = None
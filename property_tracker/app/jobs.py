@@ -0,0 +1,358 @@
+import asyncio
+import logging
+import os
+import socket
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import or_, and_
+
+from .database import SessionLocal, SearchSession
+from .utils import process_csv_file, inquiry_row
+from .ingest import ADDRESS_LINES_SUFFIX, prepare_upload
+from .inquiry_writer import InquiryWriter
+from .metrics import JOBS_RUNNING
+
+logger = logging.getLogger(__name__)
+
+# Background job configuration
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_CHECKPOINT_ROWS = int(os.getenv("JOB_CHECKPOINT_ROWS", "25"))
+JOB_STALE_AFTER = int(os.getenv("JOB_STALE_AFTER", "300"))  # seconds without a heartbeat
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "60"))  # keep well below JOB_STALE_AFTER
+JOB_SWEEP_INTERVAL = int(os.getenv("JOB_SWEEP_INTERVAL", "60"))
+JOB_DRAIN_TIMEOUT = float(os.getenv("JOB_DRAIN_TIMEOUT", "0"))  # seconds running jobs get to finish at shutdown
+
+# Live results buffered per streaming client; a client that falls further behind catches up from the database
+JOB_STREAM_QUEUE_SIZE = int(os.getenv("JOB_STREAM_QUEUE_SIZE", "1000"))
+
+# Identifies this process in search_sessions.claimed_by
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+class JobClaimLost(Exception):
+    """Another worker has taken over a job this worker was running"""
+
+def claim_job(db, session_id: str) -> Optional[SearchSession]:
+    """Atomically mark a bulk job as running on this worker, or return None if someone else has it"""
+
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=JOB_STALE_AFTER)
+
+    claimed = db.query(SearchSession).filter(
+        SearchSession.session_id == session_id,
+        or_(
+            SearchSession.status == "queued",
+            and_(
+                SearchSession.status == "running",
+                or_(
+                    SearchSession.claimed_by == WORKER_ID,
+                    SearchSession.heartbeat_at.is_(None),
+                    SearchSession.heartbeat_at < stale_before
+                )
+            )
+        )
+    ).update(
+        {"status": "running", "claimed_by": WORKER_ID, "heartbeat_at": now},
+        synchronize_session=False
+    )
+    db.commit()
+
+    if not claimed:
+        return None
+    return db.query(SearchSession).filter(SearchSession.session_id == session_id).first()
+
+class JobEvents:
+    """In-process fan-out of bulk job results to streaming clients"""
+
+    # Published once a job stops running in this process, whatever the outcome
+    FINISHED = ("finished", None, None)
+
+    def __init__(self, queue_size: int = None):
+        self.queue_size = queue_size or JOB_STREAM_QUEUE_SIZE
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def has_subscribers(self, session_id: str) -> bool:
+        return session_id in self._subscribers
+
+    def publish(self, session_id: str, event: tuple):
+        """Queue (kind, row_number, data) for every client following the job"""
+        for queue in self._subscribers.get(session_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow client; it reloads the missing rows from the database
+                pass
+
+    @contextmanager
+    def subscribe(self, session_id: str):
+        """Receive events for a job while the block runs"""
+        queue = asyncio.Queue(self.queue_size)
+        self._subscribers.setdefault(session_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(session_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[session_id]
+
+job_events = JobEvents()
+
+def _update_claimed(db, session_id: str, values: dict) -> bool:
+    """Update a job only while this worker holds its claim; False once another worker has it"""
+    updated = db.query(SearchSession).filter(
+        SearchSession.session_id == session_id,
+        SearchSession.claimed_by == WORKER_ID
+    ).update(values, synchronize_session=False)
+    return updated > 0
+
+def _save_progress(session_id: str):
+    def save(db, values):
+        # Raising rolls back the inquiries flushed with this checkpoint
+        if not _update_claimed(db, session_id, values):
+            raise JobClaimLost(session_id)
+    return save
+
+async def run_job(session_id: str):
+    """Process a queued bulk upload, checkpointing progress so it can resume after a restart"""
+    with JOBS_RUNNING.track():
+        try:
+            await _run_job(session_id)
+        finally:
+            job_events.publish(session_id, JobEvents.FINISHED)
+
+def _claim(session_id: str) -> Optional[SearchSession]:
+    db = SessionLocal()
+    try:
+        return claim_job(db, session_id)
+    finally:
+        db.close()
+
+async def _run_job(session_id: str):
+
+    # The claim is a blocking UPDATE and commit, so it runs off the event loop
+    session = await asyncio.to_thread(_claim, session_id)
+    if session is None:
+        return
+
+    file_path = session.file_path
+    user_ip = session.user_ip or "unknown"
+    user_agent = session.user_agent or "unknown"
+    processed = session.processed_rows or 0
+    successful = session.successful_searches or 0
+    failed = session.failed_searches or 0
+    refresh = session.mode == "refresh"
+    started_at = session.created_at
+
+    # Inquiries and progress are committed in the same transaction, so a resumed
+    # job never logs a row twice or skips one
+    writer = InquiryWriter(batch_size=JOB_CHECKPOINT_ROWS, on_flush=_save_progress(session_id))
+
+    # Heartbeats run for the whole job, including long parses and rate limiter waits
+    job = asyncio.current_task()
+    claim_lost = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(session_id, job, claim_lost))
+
+    try:
+        # Parse the upload once, in a worker process; a resumed job reuses the address list
+        if not file_path.endswith(ADDRESS_LINES_SUFFIX):
+            lines_path, total = await prepare_upload(file_path)
+            if not await asyncio.to_thread(_update_job, session_id, {"file_path": lines_path, "total_addresses": total}):
+                raise JobClaimLost(session_id)
+            _remove_upload(file_path)
+            file_path = lines_path
+
+        async for result in process_csv_file(
+            file_path, start_row=processed, refresh=refresh, refresh_before=started_at
+        ):
+            row = inquiry_row(
+                address=result.address,
+                result=result,
+                search_type="bulk",
+                session_id=session_id,
+                user_ip=user_ip,
+                user_agent=user_agent,
+                row_number=processed
+            )
+            # Results reach streaming clients before the batch holding them is flushed
+            if job_events.has_subscribers(session_id):
+                job_events.publish(session_id, ("result", processed, result.as_dict()))
+            processed += 1
+            if result.success:
+                successful += 1
+            else:
+                failed += 1
+
+            await writer.add(row, state={
+                "processed_rows": processed,
+                "successful_searches": successful,
+                "failed_searches": failed,
+                "heartbeat_at": datetime.utcnow()
+            })
+
+        # Guaranteed final flush, marking the session complete with its last rows
+        await writer.stop()
+        await writer.flush(state={
+            "processed_rows": processed,
+            "successful_searches": successful,
+            "failed_searches": failed,
+            "total_addresses": processed,
+            "status": "completed",
+            "completed_at": datetime.utcnow()
+        })
+        _remove_upload(file_path)
+
+    except JobClaimLost:
+        # The new owner carries on from the last checkpoint, with the upload left in place
+        logger.warning("Bulk job %s was taken over by another worker", session_id)
+        await writer.stop()
+        writer.discard()
+
+    except asyncio.CancelledError:
+        await writer.stop()
+        writer.discard()
+        if claim_lost.is_set():
+            # Cancelled by the heartbeat, not by shutdown; the job row is no longer ours
+            logger.warning("Bulk job %s was taken over by another worker", session_id)
+            return
+        # Shutting down: keep the last checkpoint and hand the job back to the queue
+        await asyncio.to_thread(_update_job, session_id, {"status": "queued", "claimed_by": None})
+        raise
+
+    except Exception as e:
+        logger.exception("Bulk job %s failed", session_id)
+        await writer.stop()
+        writer.discard()
+        claimed = await asyncio.to_thread(_update_job, session_id, {
+            "status": "failed",
+            "error_message": f"Failed to process file: {str(e)}",
+            "completed_at": datetime.utcnow()
+        })
+        if claimed:
+            _remove_upload(file_path)
+
+    finally:
+        heartbeat.cancel()
+
+async def _heartbeat(session_id: str, job: asyncio.Task, claim_lost: asyncio.Event):
+    # Refresh heartbeat_at until the job ends; cancel the job if another worker has claimed it
+    while True:
+        await asyncio.sleep(JOB_HEARTBEAT_INTERVAL)
+        try:
+            claimed = await asyncio.to_thread(_update_job, session_id, {"heartbeat_at": datetime.utcnow()})
+        except Exception:
+            logger.exception("Heartbeat for bulk job %s failed; will retry", session_id)
+            continue
+        if not claimed:
+            claim_lost.set()
+            job.cancel()
+            return
+
+def _update_job(session_id: str, values: dict) -> bool:
+    db = SessionLocal()
+    try:
+        claimed = _update_claimed(db, session_id, values)
+        db.commit()
+        return claimed
+    finally:
+        db.close()
+
+def _remove_upload(file_path: Optional[str]):
+    if file_path and os.path.exists(file_path):
+        os.remove(file_path)
+
+class JobQueue:
+    """Local pool of workers that run bulk jobs in the background"""
+
+    def __init__(self, workers: int = None):
+        self.workers = workers or JOB_WORKERS
+        self._queue: asyncio.Queue = None
+        self._tasks: List[asyncio.Task] = []
+        self._busy: Set[asyncio.Task] = set()
+        self._draining = False
+        self._queued = set()
+
+    async def start(self):
+        """Start workers and pick up jobs left unfinished by earlier processes"""
+        self._queue = asyncio.Queue()
+        self._draining = False
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep()))
+
+    async def stop(self, drain_timeout: float = None):
+        """Stop workers, giving running jobs up to drain_timeout seconds to finish
+
+        Jobs still running after that are checkpointed and requeued; jobs that
+        never started stay queued for another process to pick up.
+        """
+        drain_timeout = JOB_DRAIN_TIMEOUT if drain_timeout is None else drain_timeout
+        self._draining = True
+
+        # Idle workers and the sweeper stop right away
+        for task in self._tasks:
+            if task not in self._busy:
+                task.cancel()
+        if self._busy and drain_timeout > 0:
+            logger.info("Waiting up to %ss for %d running bulk jobs", drain_timeout, len(self._busy))
+            await asyncio.wait(set(self._busy), timeout=drain_timeout)
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def depth(self) -> int:
+        """Jobs waiting for a free worker"""
+        return self._queue.qsize() if self._queue else 0
+
+    def submit(self, session_id: str):
+        """Queue a bulk job for processing"""
+        if session_id not in self._queued:
+            self._queued.add(session_id)
+            self._queue.put_nowait(session_id)
+
+    async def _worker(self):
+        task = asyncio.current_task()
+        while not self._draining:
+            session_id = await self._queue.get()
+            self._busy.add(task)
+            try:
+                await run_job(session_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Bulk job %s crashed", session_id)
+            finally:
+                self._busy.discard(task)
+                self._queued.discard(session_id)
+                self._queue.task_done()
+
+    async def _sweep(self):
+        # Periodically adopt queued jobs and jobs whose worker stopped heartbeating
+        while True:
+            for session_id in await asyncio.to_thread(_find_resumable_jobs):
+                self.submit(session_id)
+            await asyncio.sleep(JOB_SWEEP_INTERVAL)
+
+def _find_resumable_jobs() -> List[str]:
+    stale_before = datetime.utcnow() - timedelta(seconds=JOB_STALE_AFTER)
+    db = SessionLocal()
+    try:
+        rows = db.query(SearchSession.session_id).filter(
+            SearchSession.search_type == "bulk",
+            or_(
+                SearchSession.status == "queued",
+                and_(
+                    SearchSession.status == "running",
+                    or_(SearchSession.heartbeat_at.is_(None), SearchSession.heartbeat_at < stale_before)
+                )
+            )
+        ).order_by(SearchSession.created_at).all()
+        return [row.session_id for row in rows]
+    finally:
+        db.close()
+
+job_queue = JobQueue()
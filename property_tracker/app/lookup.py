@@ -0,0 +1,141 @@
+import asyncio
+import os
+from collections import OrderedDict, deque
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Generic, Hashable, Iterable, TypeVar, Union
+
+# Maximum number of address lookups allowed in flight at once
+LOOKUP_MAX_IN_FLIGHT = int(os.getenv("LOOKUP_MAX_IN_FLIGHT", "10"))
+
+# Completed results remembered per upload for repeated addresses
+DEDUPE_MAX_ENTRIES = int(os.getenv("DEDUPE_MAX_ENTRIES", "10000"))
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+async def _aiter(items: Union[Iterable[T], AsyncIterable[T]]) -> AsyncIterator[T]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+async def bounded_map(
+    func: Callable[[T], Awaitable[R]],
+    items: Union[Iterable[T], AsyncIterable[T]],
+    max_in_flight: int = None
+) -> AsyncIterator[R]:
+    """Run func over items with bounded concurrency, yielding results in input order"""
+
+    max_in_flight = max(1, max_in_flight or LOOKUP_MAX_IN_FLIGHT)
+    pending = deque()
+
+    try:
+        async for item in _aiter(items):
+            # Wait for the oldest lookup before starting a new one once the window is full
+            if len(pending) >= max_in_flight:
+                yield await pending.popleft()
+            pending.append(asyncio.ensure_future(func(item)))
+
+        while pending:
+            yield await pending.popleft()
+
+    finally:
+        # Cancel outstanding lookups if the consumer stops early
+        for task in pending:
+            task.cancel()
+
+async def bounded_map_unordered(
+    func: Callable[[T], Awaitable[R]],
+    items: Union[Iterable[T], AsyncIterable[T]],
+    max_in_flight: int = None
+) -> AsyncIterator[R]:
+    """Run func over items with bounded concurrency, yielding results as they complete
+
+    Items are pulled while earlier calls run, so a slow (e.g. streamed) input
+    does not hold back results that are already done.
+    """
+
+    max_in_flight = max(1, max_in_flight or LOOKUP_MAX_IN_FLIGHT)
+    iterator = _aiter(items)
+    pending = set()
+    next_item = None
+    exhausted = False
+
+    try:
+        while True:
+            if next_item is None and not exhausted and len(pending) < max_in_flight:
+                next_item = asyncio.ensure_future(iterator.__anext__())
+            waiting = pending | {next_item} if next_item is not None else pending
+            if not waiting:
+                return
+
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+            if next_item in done:
+                done.discard(next_item)
+                try:
+                    pending.add(asyncio.ensure_future(func(next_item.result())))
+                except StopAsyncIteration:
+                    exhausted = True
+                next_item = None
+
+            for task in done:
+                pending.discard(task)
+                yield task.result()
+
+    finally:
+        # Cancel outstanding calls if the consumer stops early
+        for task in pending:
+            task.cancel()
+        if next_item is not None:
+            next_item.cancel()
+            await asyncio.gather(next_item, return_exceptions=True)
+        await iterator.aclose()
+
+class Deduplicator(Generic[R]):
+    """Run one call per key; callers with a key that is in flight or recently done share its result
+
+    Completed results are kept in a bounded LRU so memory stays flat on large uploads.
+    """
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or DEDUPE_MAX_ENTRIES
+        self._done: "OrderedDict[Hashable, R]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[R]]) -> R:
+        if key in self._done:
+            self._done.move_to_end(key)
+            self.shared += 1
+            return self._done[key]
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.shared += 1
+            # Shielded so one waiter being cancelled does not cancel the others
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.calls += 1
+        try:
+            result = await func()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark retrieved so an unshared failure is not reported as unhandled
+                future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+        future.set_result(result)
+        self._done[key] = result
+        while len(self._done) > self.max_entries:
+            self._done.popitem(last=False)
+        return result
@@ -1,185 +1,778 @@
-from fastapi import FastAPI, File, UploadFile, Form, Request, Depends, HTTPException
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-import os
-import shutil
-from typing import List
-import uuid
-
-from .models import PropertyResult, SearchResponse, InquiryStats
-from .utils import process_property_address, process_csv_file, create_search_session, update_search_session
-from .api_clients import PropertyAPIClient
-from .database import get_db, PropertyInquiry, SearchSession
-
-app = FastAPI(title="Property Status Checker", description="Search property status without price information")
-
-# Mount static files and templates
-app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
-
-# Ensure uploads directory exists
-os.makedirs("uploads", exist_ok=True)
-
-def get_client_ip(request: Request) -> str:
-    """Get client IP address"""
-    forwarded = request.headers.get("X-Forwarded-For")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-    return request.client.host
-
-def get_user_agent(request: Request) -> str:
-    """Get user agent"""
-    return request.headers.get("User-Agent", "Unknown")
-
-@app.get("/", response_class=HTMLResponse)
-async def home(request: Request):
-    """Main application page"""
-    return templates.TemplateResponse("index.html", {"request": request})
-
-@app.post("/search-single", response_model=PropertyResult)
-async def search_single_property(
-    address: str = Form(...),
-    request: Request = None,
-    db: Session = Depends(get_db)
-):
-    """Search for a single property by address"""
-    
-    # Get user info
-    user_ip = get_client_ip(request)
-    user_agent = get_user_agent(request)
-    
-    # Create session for single search
-    session_id = create_search_session(
-        db=db,
-        search_type="single",
-        total_addresses=1,
-        user_ip=user_ip,
-        user_agent=user_agent
-    )
-    
-    # Process search
-    api_client = PropertyAPIClient()
-    result = process_property_address(
-        address=address,
-        api_client=api_client,
-        db=db,
-        search_type="single",
-        session_id=session_id,
-        user_ip=user_ip,
-        user_agent=user_agent
-    )
-    
-    # Update session
-    successful = 1 if result.status not in ["Error", "Not Found"] else 0
-    failed = 1 - successful
-    update_search_session(db, session_id, successful, failed)
-    
-    return result
-
-@app.post("/upload-file", response_model=SearchResponse)
-async def upload_file(
-    file: UploadFile = File(...),
-    request: Request = None,
-    db: Session = Depends(get_db)
-):
-    """Upload CSV/Excel file and process all addresses"""
-    
-    # Get user info
-    user_ip = get_client_ip(request)
-    user_agent = get_user_agent(request)
-    
-    # Save uploaded file
-    file_path = f"uploads/{file.filename}"
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    try:
-        # Process file with database logging
-        results, session_id = process_csv_file(
-            file_path=file_path,
-            db=db,
-            user_ip=user_ip,
-            user_agent=user_agent,
-            filename=file.filename
-        )
-        
-        # Calculate stats
-        successful = len([r for r in results if r.status not in ["Error", "Not Found"]])
-        failed = len(results) - successful
-        
-        return SearchResponse(
-            results=results,
-            total_searched=len(results),
-            successful=successful,
-            failed=failed,
-            session_id=session_id
-        )
-    
-    finally:
-        # Clean up uploaded file
-        if os.path.exists(file_path):
-            os.remove(file_path)
-
-@app.get("/admin/stats", response_model=InquiryStats)
-async def get_inquiry_stats(db: Session = Depends(get_db)):
-    """Get inquiry statistics (admin endpoint)"""
-    
-    # Total inquiries
-    total_inquiries = db.query(PropertyInquiry).count()
-    
-    # Total sessions
-    total_sessions = db.query(SearchSession).count()
-    
-    # Success/failure counts
-    successful_searches = db.query(PropertyInquiry).filter(PropertyInquiry.success == True).count()
-    failed_searches = db.query(PropertyInquiry).filter(PropertyInquiry.success == False).count()
-    
-    # Top searched addresses
-    top_addresses = db.query(
-        PropertyInquiry.address,
-        db.func.count(PropertyInquiry.address).label('count')
-    ).group_by(PropertyInquiry.address).order_by(db.func.count(PropertyInquiry.address).desc()).limit(10).all()
-    
-    top_searched_addresses = [{"address": addr, "count": count} for addr, count in top_addresses]
-    
-    # Recent searches
-    recent = db.query(PropertyInquiry).order_by(PropertyInquiry.created_at.desc()).limit(10).all()
-    recent_searches = [
-        {
-            "address": r.address,
-            "status": r.status,
-            "created_at": r.created_at.isoformat(),
-            "search_type": r.search_type
-        } for r in recent
-    ]
-    
-    return InquiryStats(
-        total_inquiries=total_inquiries,
-        total_sessions=total_sessions,
-        successful_searches=successful_searches,
-        failed_searches=failed_searches,
-        top_searched_addresses=top_searched_addresses,
-        recent_searches=recent_searches
-    )
-
-@app.get("/admin/inquiries")
-async def get_all_inquiries(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
-):
-    """Get all inquiries with pagination"""
-    
-    inquiries = db.query(PropertyInquiry).offset(skip).limit(limit).all()
-    return inquiries
-
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "message": "Property Status Checker is running"}
-
-if __name__ == "__main__":
-    import uvicorn
+from fastapi import FastAPI, File, UploadFile, Form, Request, Depends, HTTPException
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from fastapi.templating import Jinja2Templates
+from starlette.datastructures import MutableHeaders
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import json
+import aiofiles
+import os
+import time
+from typing import List, Optional
+from datetime import datetime
+from sqlalchemy import select, tuple_
+from pydantic import ValidationError
+import uuid
+
+from .models import PropertyResult, BatchAddress, BatchSearchRequest, InquiryStats, JobStatus, JobResultsPage, JobChangesPage, StatusChange, InquiryPage, PropertyInquiryResponse
+from .utils import process_property_address, process_address_batch, create_search_session, update_search_session, encode_cursor, decode_cursor
+from .api_clients import PropertyAPIClient, close_http_client, generate_links, get_http_client
+from .cache import get_address_cache
+from .providers import get_provider_orchestrator
+from .city_listings import get_city_listing_cache
+from .singleflight import get_lookup_flights
+from .database import AsyncSessionLocal, dispose_engines, get_async_db, get_pool_stats, warm_up_engines, PropertyInquiry, SearchSession
+from .jobs import job_events, job_queue
+from .inquiry_writer import InquiryBacklogFull, close_inquiry_writer, get_flush_stats
+from .stats import get_counters, get_top_addresses
+from .retention import archived_stats
+from .ingest import shutdown_parse_pool
+from .export import EXPORT_FORMATS, export_inquiries, parquet_available
+from .metrics import (
+    HTTP_REQUEST_SECONDS, HTTP_REQUESTS, HTTP_REQUESTS_IN_FLIGHT, SERVER_TIMING_ENABLED,
+    register_collector, render, server_timing_header, start_request_timing
+)
+
+# Seconds between progress updates (and database catch-up) on result streams
+JOB_STREAM_POLL_INTERVAL = float(os.getenv("JOB_STREAM_POLL_INTERVAL", "2"))
+
+# Bulk upload modes: look up every row, or only rows without a recent result
+UPLOAD_MODES = ("full", "refresh")
+
+# Addresses accepted per /search-batch request, and the most looked up at once
+BATCH_MAX_ADDRESSES = int(os.getenv("BATCH_MAX_ADDRESSES", "10000"))
+BATCH_MAX_IN_FLIGHT = int(os.getenv("BATCH_MAX_IN_FLIGHT", "20"))
+
+# Spooled uploads, kept until their bulk job finishes
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+UPLOAD_EXTENSIONS = (".csv", ".xlsx")
+
+# Open the DB pools and HTTP client as each worker starts instead of on its first request
+WORKER_WARMUP = os.getenv("WORKER_WARMUP", "false").lower() == "true"
+
+app = FastAPI(title="Property Status Checker", description="Search property status without price information")
+
+# Mount static files and templates
+app.mount("/static", StaticFiles(directory="static"), name="static")
+templates = Jinja2Templates(directory="templates")
+
+class RequestMetricsMiddleware:
+    """Time every request and optionally report stage durations in a Server-Timing header
+    
+    Plain ASGI rather than @app.middleware("http"), which re-streams every response
+    through its own StreamingResponse and swallows request bodies still being read.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        timings = start_request_timing()
+        started = time.perf_counter()
+        status = 500
+        
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING_ENABLED:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", server_timing_header(timings, time.perf_counter() - started)
+                    )
+            await send(message)
+        
+        with HTTP_REQUESTS_IN_FLIGHT.track():
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                # Route template rather than raw path, so IDs do not explode label cardinality
+                route = getattr(scope.get("route"), "path", "unmatched")
+                HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, route=route)
+                HTTP_REQUESTS.inc(route=route, method=scope["method"], status=status)
+
+app.add_middleware(RequestMetricsMiddleware)
+
+def collect_component_metrics():
+    """Expose counters kept by the cache, pools, writer, providers and job queue"""
+    
+    cache = get_address_cache()
+    if cache is not None:
+        for name, value in cache.counters.items():
+            yield f"cache_{name}_total", "counter", f"Address cache {name.replace('_', ' ')}", [({}, value)]
+        yield "cache_memory_entries", "gauge", "Entries in the in-memory address cache", [({}, cache.stats()["memory_entries"])]
+    
+    for name, value in get_city_listing_cache().counters.items():
+        yield f"realty_city_cache_{name}_total", "counter", f"Realty Base city listing cache {name.replace('_', ' ')}", [({}, value)]
+    
+    states = {"closed": 0, "half_open": 1, "open": 2}
+    providers = get_provider_orchestrator().providers
+    yield "provider_breaker_state", "gauge", "Circuit breaker state (0 closed, 1 half open, 2 open)", [
+        ({"provider": provider.name}, states[provider.breaker.state]) for provider in providers
+    ]
+    
+    pools = get_pool_stats()
+    yield "db_pool_checked_out", "gauge", "Connections currently checked out", [
+        ({"pool": name}, stats["checked_out"]) for name, stats in pools.items()
+    ]
+    yield "db_pool_checkouts_total", "counter", "Connection checkouts", [
+        ({"pool": name}, stats["checkouts"]) for name, stats in pools.items()
+    ]
+    yield "db_pool_checkout_wait_seconds_total", "counter", "Time spent waiting for a connection", [
+        ({"pool": name}, stats["total_wait_seconds"]) for name, stats in pools.items()
+    ]
+    yield "db_pool_checkout_timeouts_total", "counter", "Checkouts that timed out waiting for a connection", [
+        ({"pool": name}, stats["checkout_timeouts"]) for name, stats in pools.items()
+    ]
+    
+    flush = get_flush_stats()
+    yield "inquiry_flush_errors_total", "counter", "Failed inquiry batch writes", [({}, flush["flush_errors"])]
+    yield "inquiry_backpressure_waits_total", "counter", "Times inquiry logging waited for a flush", [({}, flush["backpressure_waits"])]
+    
+    yield "jobs_queued", "gauge", "Bulk jobs waiting for a worker", [({}, job_queue.depth)]
+
+register_collector(collect_component_metrics)
+
+# Ensure uploads directory exists
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+@app.on_event("startup")
+async def startup():
+    """Warm up this worker's connection pools when configured, then start background bulk job workers"""
+    
+    # Runs in every worker process; pools are never shared across processes
+    if WORKER_WARMUP:
+        await warm_up_engines()
+        get_http_client()
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Drain or requeue running bulk jobs, flush buffered inquiries and release pooled connections and parse workers"""
+    await job_queue.stop()
+    await close_inquiry_writer()
+    await close_http_client()
+    await dispose_engines()
+    # Joining the worker processes blocks, so it runs off the event loop
+    await asyncio.to_thread(shutdown_parse_pool)
+
+@app.exception_handler(InquiryBacklogFull)
+async def inquiry_backlog_full(request: Request, exc: InquiryBacklogFull):
+    """Fail searches fast while inquiry logging cannot keep up, e.g. when the database is down"""
+    return JSONResponse(status_code=503, content={"detail": "Search logging is backed up, try again shortly"})
+
+def get_client_ip(request: Request) -> str:
+    """Get client IP address"""
+    forwarded = request.headers.get("X-Forwarded-For")
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    return request.client.host
+
+def get_user_agent(request: Request) -> str:
+    """Get user agent"""
+    return request.headers.get("User-Agent", "Unknown")
+
+@app.get("/", response_class=HTMLResponse)
+async def home(request: Request):
+    """Main application page"""
+    return templates.TemplateResponse("index.html", {"request": request})
+
+@app.post("/search-single", response_model=PropertyResult)
+async def search_single_property(
+    address: str = Form(...),
+    request: Request = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Search for a single property by address"""
+    
+    # Get user info
+    user_ip = get_client_ip(request)
+    user_agent = get_user_agent(request)
+    
+    # Create session for single search
+    session_id = await create_search_session(
+        db=db,
+        search_type="single",
+        total_addresses=1,
+        user_ip=user_ip,
+        user_agent=user_agent
+    )
+    
+    # Process search
+    api_client = PropertyAPIClient()
+    result = await process_property_address(
+        address=address,
+        api_client=api_client,
+        db=db,
+        search_type="single",
+        session_id=session_id,
+        user_ip=user_ip,
+        user_agent=user_agent
+    )
+    
+    # Update session
+    successful = 1 if result.success else 0
+    failed = 1 - successful
+    await update_search_session(db, session_id, successful, failed)
+    
+    return result.to_model()
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body may still be reading the request body
+    
+    The stock response watches receive() for a disconnect, which would swallow
+    request body chunks; here the streamed body is the only reader, and
+    _batch_results checks for a disconnect once the body has been read.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+def _batch_line(index: int, line: bytes) -> tuple:
+    # A line is an address string or an {"address", "id"} object
+    value = None
+    try:
+        value = json.loads(line)
+        item = BatchAddress(address=value) if isinstance(value, str) else BatchAddress.model_validate(value)
+    except (ValueError, ValidationError):
+        # Keep a usable id on the Error line, so the client can still match it
+        item_id = value.get("id") if isinstance(value, dict) else None
+        return index, item_id if isinstance(item_id, (str, int)) else None, None
+    return index, item.id, item.address
+
+async def _ndjson_batch_items(request: Request, body_read: asyncio.Event):
+    """(index, id, address) for each NDJSON line, parsed as the request body streams in
+    
+    body_read is set once nothing more will be read from the request.
+    """
+    
+    index = 0
+    buffer = b""
+    try:
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if not line.strip():
+                    continue
+                # Lines past the limit are not read
+                if index >= BATCH_MAX_ADDRESSES:
+                    return
+                yield _batch_line(index, line)
+                index += 1
+    finally:
+        body_read.set()
+    if buffer.strip() and index < BATCH_MAX_ADDRESSES:
+        yield _batch_line(index, buffer)
+
+async def _json_batch_items(addresses: List):
+    for index, item in enumerate(addresses):
+        if isinstance(item, str):
+            yield index, None, item
+        else:
+            yield index, item.id, item.address
+
+async def _batch_results(
+    items,
+    session_id: str,
+    user_ip: str,
+    user_agent: str,
+    use_cache: bool,
+    max_in_flight: int,
+    request: Optional[Request] = None,
+    body_read: Optional[asyncio.Event] = None
+):
+    """NDJSON result lines, in completion order
+    
+    With request and body_read (the duplex response, which does not watch for
+    disconnects), a client that has gone away stops the batch at the next result.
+    The stream outlives the endpoint, so it opens its own session.
+    """
+    
+    successful = failed = 0
+    async with AsyncSessionLocal() as db:
+        results = process_address_batch(
+            items, db, session_id, user_ip, user_agent, use_cache=use_cache, max_in_flight=max_in_flight
+        )
+        try:
+            async for index, item_id, result in results:
+                if result.success:
+                    successful += 1
+                else:
+                    failed += 1
+                yield json.dumps({"index": index, "id": item_id, **result.as_dict()}) + "\n"
+                # Polling before the body is read would take request chunks from the reader
+                if request is not None and body_read.is_set() and await request.is_disconnected():
+                    break
+        finally:
+            # Cancels lookups still in flight, e.g. after the client went away
+            await results.aclose()
+            await update_search_session(db, session_id, successful, failed, total_addresses=successful + failed)
+
+@app.post("/search-batch")
+async def search_batch(
+    request: Request,
+    use_cache: bool = True,
+    max_in_flight: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Look up many addresses in one request, streaming NDJSON results in completion order
+    
+    The body is either JSON, {"addresses": ["...", {"address": "...", "id": "..."}], "use_cache": true,
+    "max_in_flight": 10}, or NDJSON (Content-Type application/x-ndjson) with one address string or
+    object per line and options as query parameters. Each result line is a PropertyResult plus the
+    input "index" and "id". All lookups are logged under one session, returned in X-Session-Id.
+    """
+    
+    user_ip = get_client_ip(request)
+    user_agent = get_user_agent(request)
+    
+    content_type = request.headers.get("Content-Type", "").split(";")[0].strip()
+    if content_type == "application/x-ndjson":
+        # Read lazily, so lookups start before the client has finished sending
+        body_read = asyncio.Event()
+        items = _ndjson_batch_items(request, body_read)
+        total = None
+    else:
+        try:
+            body = BatchSearchRequest.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+        if len(body.addresses) > BATCH_MAX_ADDRESSES:
+            raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_ADDRESSES} addresses per batch")
+        items = _json_batch_items(body.addresses)
+        total = len(body.addresses)
+        use_cache, max_in_flight = body.use_cache, body.max_in_flight
+    
+    max_in_flight = max(1, min(max_in_flight or BATCH_MAX_IN_FLIGHT, BATCH_MAX_IN_FLIGHT))
+    
+    session_id = await create_search_session(
+        db=db,
+        search_type="batch",
+        total_addresses=total,
+        user_ip=user_ip,
+        user_agent=user_agent
+    )
+    
+    if total is None:
+        return _DuplexStreamingResponse(
+            _batch_results(items, session_id, user_ip, user_agent, use_cache, max_in_flight, request, body_read),
+            media_type="application/x-ndjson",
+            headers={"X-Session-Id": session_id}
+        )
+    return StreamingResponse(
+        _batch_results(items, session_id, user_ip, user_agent, use_cache, max_in_flight),
+        media_type="application/x-ndjson",
+        headers={"X-Session-Id": session_id}
+    )
+
+async def _spool_upload(file: UploadFile, extension: str) -> str:
+    """Copy an upload to a new file under UPLOAD_DIR without blocking the event loop"""
+    
+    file_path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}{extension}")
+    size = 0
+    try:
+        # "x" mode fails rather than overwrite, so concurrent uploads can never share a file
+        async with aiofiles.open(file_path, "xb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > UPLOAD_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail=f"File is larger than {UPLOAD_MAX_BYTES} bytes")
+                await buffer.write(chunk)
+    except BaseException:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+    return file_path
+
+@app.post("/upload-file", response_model=JobStatus)
+async def upload_file(
+    file: UploadFile = File(...),
+    mode: str = Form("full"),
+    request: Request = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Upload CSV/Excel file and queue a background job to process all addresses
+    
+    mode 'refresh' reuses recent results for addresses seen before and reports status changes.
+    """
+    
+    if mode not in UPLOAD_MODES:
+        raise HTTPException(status_code=400, detail=f"Unsupported mode: {mode}")
+    
+    # Get user info
+    user_ip = get_client_ip(request)
+    user_agent = get_user_agent(request)
+    
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    if extension not in UPLOAD_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Upload a .csv or .xlsx file")
+    
+    # Reject oversized uploads before reading the body when the client declares its size
+    declared = request.headers.get("Content-Length", "")
+    if declared.isdigit() and int(declared) > UPLOAD_MAX_BYTES + 64 * 1024:
+        raise HTTPException(status_code=413, detail=f"File is larger than {UPLOAD_MAX_BYTES} bytes")
+    
+    # Save uploaded file; it stays on disk until the job finishes so the job can resume
+    file_path = await _spool_upload(file, extension)
+    
+    # Total is unknown until the job has streamed through the file
+    session_id = await create_search_session(
+        db=db,
+        search_type="bulk",
+        total_addresses=None,
+        user_ip=user_ip,
+        user_agent=user_agent,
+        filename=file.filename,
+        status="queued",
+        file_path=file_path,
+        mode=mode
+    )
+    job_queue.submit(session_id)
+    
+    return JobStatus(session_id=session_id, status="queued", mode=mode, filename=file.filename)
+
+def _job_status(session: SearchSession) -> JobStatus:
+    return JobStatus(
+        session_id=session.session_id,
+        status=session.status or "completed",
+        mode=session.mode or "full",
+        filename=session.filename,
+        total_addresses=session.total_addresses,
+        processed_rows=session.processed_rows or 0,
+        successful=session.successful_searches or 0,
+        failed=session.failed_searches or 0,
+        error=session.error_message,
+        created_at=session.created_at,
+        completed_at=session.completed_at
+    )
+
+async def _job_result_rows(db: AsyncSession, session_id: str, start_row: int, limit: int):
+    # Plain column rows, converted straight to the response without ORM objects; links are added by the caller
+    return (await db.execute(
+        select(
+            PropertyInquiry.row_number,
+            PropertyInquiry.address,
+            PropertyInquiry.status,
+            PropertyInquiry.previous_status,
+            PropertyInquiry.property_type,
+            PropertyInquiry.bedrooms,
+            PropertyInquiry.bathrooms,
+            PropertyInquiry.square_feet,
+            PropertyInquiry.error_message.label("error"),
+            PropertyInquiry.api_source
+        ).where(
+            PropertyInquiry.session_id == session_id,
+            PropertyInquiry.row_number >= start_row
+        ).order_by(PropertyInquiry.row_number).limit(limit)
+    )).all()
+
+@app.get("/jobs/{session_id}", response_model=JobStatus)
+async def get_job_status(session_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Get progress of a bulk upload job"""
+    
+    session = await db.scalar(select(SearchSession).where(SearchSession.session_id == session_id))
+    if not session:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return _job_status(session)
+
+@app.get("/jobs/{session_id}/results", response_model=JobResultsPage)
+async def get_job_results(
+    session_id: str,
+    start_row: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a page of results for a bulk upload job, in file order"""
+    
+    limit = max(1, min(limit, 1000))
+    rows = await _job_result_rows(db, session_id, start_row, limit)
+    
+    results = [PropertyResult(**row._asdict(), **generate_links(row.address)) for row in rows]
+    next_row = rows[-1].row_number + 1 if rows else start_row
+    
+    return JobResultsPage(session_id=session_id, results=results, next_row=next_row)
+
+@app.get("/jobs/{session_id}/changes", response_model=JobChangesPage)
+async def get_job_changes(
+    session_id: str,
+    start_row: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get rows of a refresh upload whose status differs from the previous run, in file order"""
+    
+    limit = max(1, min(limit, 1000))
+    rows = (await db.execute(
+        select(
+            PropertyInquiry.row_number,
+            PropertyInquiry.address,
+            PropertyInquiry.previous_status,
+            PropertyInquiry.status
+        ).where(
+            PropertyInquiry.session_id == session_id,
+            PropertyInquiry.row_number >= start_row,
+            PropertyInquiry.previous_status.is_not(None),
+            PropertyInquiry.status != PropertyInquiry.previous_status
+        ).order_by(PropertyInquiry.row_number).limit(limit)
+    )).all()
+    
+    changes = [StatusChange(**row._asdict()) for row in rows]
+    next_row = rows[-1].row_number + 1 if rows else start_row
+    
+    return JobChangesPage(session_id=session_id, changes=changes, next_row=next_row)
+
+def _sse(event: str, data: str, event_id: Optional[int] = None) -> str:
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {data}\n\n"
+
+def _result_event(row_number: int, values: dict) -> str:
+    """SSE event for one job result, the same whether it comes live or from the database
+
+    price is not stored, so it is left out of live results too.
+    """
+    result = PropertyResult(**{**values, **generate_links(values["address"])})
+    return _sse("result", result.model_dump_json(exclude={"price"}), row_number)
+
+async def _job_event_stream(session_id: str, start_row: int):
+    """Saved results from start_row, then live results as the job produces them, then a final status"""
+    
+    next_row = start_row
+    with job_events.subscribe(session_id) as live:
+        while True:
+            # Catch up from the database; also covers jobs running in another worker
+            async with AsyncSessionLocal() as db:
+                while True:
+                    rows = await _job_result_rows(db, session_id, next_row, 500)
+                    for row in rows:
+                        yield _result_event(row.row_number, row._asdict())
+                        next_row = row.row_number + 1
+                    if len(rows) < 500:
+                        break
+                session = await db.scalar(select(SearchSession).where(SearchSession.session_id == session_id))
+            
+            if session is None:
+                return
+            status = _job_status(session)
+            if status.status in ("completed", "failed"):
+                yield _sse("done", status.model_dump_json())
+                return
+            yield _sse("status", status.model_dump_json())
+            
+            # Live results, in file order, until the next progress update is due
+            deadline = time.monotonic() + JOB_STREAM_POLL_INTERVAL
+            while (timeout := deadline - time.monotonic()) > 0:
+                try:
+                    kind, row_number, result = await asyncio.wait_for(live.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if kind == "finished":
+                    break
+                # Earlier rows were already sent; later ones after a gap wait for the database
+                if row_number == next_row:
+                    yield _result_event(row_number, result)
+                    next_row += 1
+
+@app.get("/jobs/{session_id}/stream")
+async def stream_job_results(session_id: str, request: Request, start_row: int = 0):
+    """Stream a bulk job's results as server-sent events while it runs"""
+    
+    async with AsyncSessionLocal() as db:
+        if await db.scalar(select(SearchSession.id).where(SearchSession.session_id == session_id)) is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+    
+    # EventSource reconnects with the id of the last result it received
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    if last_event_id.isdigit():
+        start_row = int(last_event_id) + 1
+    
+    return StreamingResponse(
+        _job_event_stream(session_id, start_row),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/admin/stats", response_model=InquiryStats)
+async def get_inquiry_stats(db: AsyncSession = Depends(get_async_db)):
+    """Get inquiry statistics (admin endpoint)"""
+    
+    # Totals and top addresses come from incrementally maintained aggregates
+    counters = await db.run_sync(get_counters)
+    top_searched_addresses = await db.run_sync(get_top_addresses, 10)
+    
+    # Recent searches
+    recent = (await db.scalars(
+        select(PropertyInquiry).order_by(PropertyInquiry.created_at.desc()).limit(10)
+    )).all()
+    recent_searches = [
+        {
+            "address": r.address,
+            "status": r.status,
+            "created_at": r.created_at.isoformat(),
+            "search_type": r.search_type
+        } for r in recent
+    ]
+    
+    return InquiryStats(
+        total_inquiries=counters["total_inquiries"],
+        total_sessions=counters["total_sessions"],
+        successful_searches=counters["successful_searches"],
+        failed_searches=counters["failed_searches"],
+        top_searched_addresses=top_searched_addresses,
+        recent_searches=recent_searches
+    )
+
+@app.get("/admin/archive-stats")
+async def get_archive_stats():
+    """Get statistics over inquiries archived to Parquet by the retention job (admin endpoint)"""
+    return await asyncio.to_thread(archived_stats)
+
+@app.get("/admin/cache-stats")
+async def get_cache_stats():
+    """Get address cache hit/miss counters (admin endpoint)"""
+    
+    cache = get_address_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@app.get("/admin/provider-stats")
+async def get_provider_stats():
+    """Get per-provider latency, circuit breaker state, hedging and coalescing counters (admin endpoint)"""
+    return {
+        **get_provider_orchestrator().stats(),
+        "realty_city_cache": get_city_listing_cache().stats(),
+        "lookup_single_flight": get_lookup_flights().stats()
+    }
+
+@app.get("/admin/db-pool-stats")
+async def get_db_pool_stats():
+    """Get connection pool checkout counts, wait times and occupancy (admin endpoint)"""
+    return get_pool_stats()
+
+@app.get("/admin/writer-stats")
+async def get_writer_stats():
+    """Get batch size and flush latency of inquiry writes (admin endpoint)"""
+    return get_flush_stats()
+
+@app.get("/admin/inquiries", response_model=InquiryPage)
+async def get_all_inquiries(
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    session_id: Optional[str] = None,
+    success: Optional[bool] = None,
+    api_source: Optional[str] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get inquiries newest first with keyset pagination and optional filters"""
+    
+    limit = max(1, min(limit, 1000))
+    query = select(PropertyInquiry)
+    
+    # Each filter has a matching (column, created_at, id) index
+    if session_id is not None:
+        query = query.where(PropertyInquiry.session_id == session_id)
+    if success is not None:
+        query = query.where(PropertyInquiry.success == success)
+    if api_source is not None:
+        query = query.where(PropertyInquiry.api_source == api_source)
+    if status is not None:
+        query = query.where(PropertyInquiry.status == status)
+    if created_from is not None:
+        query = query.where(PropertyInquiry.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(PropertyInquiry.created_at < created_to)
+    
+    # Seek past the last row of the previous page instead of using OFFSET
+    if cursor:
+        try:
+            last_created_at, last_id = decode_cursor(cursor)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(PropertyInquiry.created_at, PropertyInquiry.id) < (last_created_at, last_id))
+    
+    inquiries = (await db.scalars(query.order_by(
+        PropertyInquiry.created_at.desc(),
+        PropertyInquiry.id.desc()
+    ).limit(limit + 1))).all()
+    
+    next_cursor = None
+    if len(inquiries) > limit:
+        inquiries = inquiries[:limit]
+        next_cursor = encode_cursor(inquiries[-1].created_at, inquiries[-1].id)
+    
+    items = [
+        PropertyInquiryResponse.model_validate(inquiry).model_copy(update=generate_links(inquiry.address))
+        for inquiry in inquiries
+    ]
+    return InquiryPage(items=items, next_cursor=next_cursor)
+
+def _export_response(fmt: str, name: str, **filters) -> StreamingResponse:
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {fmt}")
+    if fmt == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow")
+    
+    # No Content-Length, so the body goes out with chunked transfer encoding
+    media_type, extension = EXPORT_FORMATS[fmt]
+    return StreamingResponse(
+        export_inquiries(fmt, **filters),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{extension}"'}
+    )
+
+@app.get("/export/inquiries")
+async def export_inquiry_history(
+    format: str = "csv",
+    session_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+):
+    """Stream inquiry history for a session or date range as CSV, NDJSON or Parquet"""
+    
+    if session_id is None and created_from is None and created_to is None:
+        raise HTTPException(status_code=400, detail="Provide session_id or a created_from/created_to range")
+    
+    return _export_response(
+        format,
+        f"inquiries-{session_id or 'range'}",
+        session_id=session_id,
+        created_from=created_from,
+        created_to=created_to
+    )
+
+@app.get("/jobs/{session_id}/export")
+async def export_job_results(session_id: str, format: str = "csv", db: AsyncSession = Depends(get_async_db)):
+    """Stream all results of a bulk upload job, in file order"""
+    
+    if await db.scalar(select(SearchSession.id).where(SearchSession.session_id == session_id)) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return _export_response(format, f"results-{session_id}", session_id=session_id)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics in text exposition format"""
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint"""
+    return {"status": "healthy", "message": "Property Status Checker is running"}
+
+if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
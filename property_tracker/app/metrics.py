@@ -0,0 +1,211 @@
+import contextvars
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Add a Server-Timing header with per-stage durations to every response
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
+METRIC_PREFIX = "propertytracker_"
+
+# Seconds; suits upstream calls and DB flushes alike
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str):
+        self.name = METRIC_PREFIX + name
+        self.help = help
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    """Monotonic count, optionally split by labels"""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in items]
+
+class Gauge(Counter):
+    """Value that can go up and down, e.g. work in flight"""
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    @contextmanager
+    def track(self, **labels):
+        """Count the enclosed block as in flight"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values: Dict[LabelKey, List[float]] = {}  # bucket counts..., sum
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [0] * len(self.buckets) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+                    break
+            data[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the enclosed block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(data)) for key, data in self._values.items()]
+        lines = []
+        for key, data in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, data):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, (('le', _format_value(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(data[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+REGISTRY: List[_Metric] = []
+
+# Callbacks returning (name, kind, help, [(labels, value), ...]) for state owned by other modules
+_collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, object], float]]]]]] = []
+
+def register_collector(collector: Callable):
+    """Export values read at scrape time, e.g. cache or pool counters"""
+    _collectors.append(collector)
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        for name, kind, help, samples in collector():
+            name = METRIC_PREFIX + name
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if value is not None:
+                    lines.append(f"{name}{_format_labels(_label_key(labels))} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+# Lookup pipeline
+LOOKUP_STAGE_SECONDS = Histogram("lookup_stage_seconds", "Time spent in each stage of an address lookup")
+LOOKUP_OUTCOMES = Counter(
+    "lookup_outcomes_total",
+    "Address lookups by outcome (zillow_hit, realty_base_fallback, cache_hit, coalesced, refresh_reused, not_found, error)"
+)
+LOOKUPS_IN_FLIGHT = Gauge("lookups_in_flight", "Address lookups currently running")
+
+# Upstream providers
+PROVIDER_REQUEST_SECONDS = Histogram("provider_request_seconds", "Upstream request time, excluding rate limiter waits")
+PROVIDER_CALLS = Counter("provider_calls_total", "Provider lookups by result (hit, miss, error, slow, skipped, cached_hit, cached_miss)")
+PROVIDER_HEDGES = Counter("provider_hedges_total", "Fallback providers started because the current one was slow")
+RATE_LIMIT_WAIT_SECONDS = Histogram("rate_limit_wait_seconds", "Time requests waited for a rate limiter token")
+
+# Uploads, jobs and database writes
+UPLOAD_PARSE_SECONDS = Histogram("upload_parse_seconds", "Time to convert an upload into an address list")
+UPLOAD_ROWS = Counter("upload_rows_total", "Addresses read from uploaded files")
+JOBS_RUNNING = Gauge("jobs_running", "Bulk jobs running in this worker")
+INQUIRY_FLUSH_SECONDS = Histogram("inquiry_flush_seconds", "Time to insert one batch of inquiry rows and commit")
+INQUIRY_ROWS_WRITTEN = Counter("inquiry_rows_written_total", "Inquiry rows committed to the database")
+
+# HTTP
+HTTP_REQUEST_SECONDS = Histogram("http_request_seconds", "HTTP request handling time by route")
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route, method and status")
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being handled")
+
+# Stage durations of the current request, for the Server-Timing header
+_request_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+@contextmanager
+def stage(name: str):
+    """Time one lookup stage into the stage histogram and the request's Server-Timing"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        LOOKUP_STAGE_SECONDS.observe(elapsed, stage=name)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+def start_request_timing() -> Dict[str, float]:
+    """Collect stage timings for the current request"""
+    timings: Dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+def server_timing_header(timings: Dict[str, float], total: float) -> str:
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
@@ -1,47 +1,96 @@
-from pydantic import BaseModel
-from typing import Optional, List
-from datetime import datetime
-
-class PropertyResult(BaseModel):
-    address: str
-    status: Optional[str] = "Not Found"
-    price: Optional[str] = None  # Still shown to user, just not stored
-    zillow_link: Optional[str] = None
-    realtor_link: Optional[str] = None
-    property_type: Optional[str] = None
-    bedrooms: Optional[int] = None
-    bathrooms: Optional[float] = None
-    square_feet: Optional[int] = None
-    error: Optional[str] = None
-    api_source: Optional[str] = None
-
-class SearchResponse(BaseModel):
-    results: List[PropertyResult]
-    total_searched: int
-    successful: int
-    failed: int
-    session_id: str
-
-class InquiryStats(BaseModel):
-    total_inquiries: int
-    total_sessions: int
-    successful_searches: int
-    failed_searches: int
-    top_searched_addresses: List[dict]
-    recent_searches: List[dict]
-
-# Database Models (for responses) - Price removed
-class PropertyInquiryResponse(BaseModel):
-    id: int
-    address: str
-    search_type: str
-    status: Optional[str]
-    # REMOVED: price: Optional[str]  # Price removed from database response
-    property_type: Optional[str]
-    bedrooms: Optional[int]
-    bathrooms: Optional[float]
-    success: bool
-    created_at: datetime
-    
-    class Config:
-        from_attributes = True
\ No newline at end of file
+from pydantic import BaseModel
+from typing import Optional, List, Union
+from datetime import datetime
+
+class PropertyResult(BaseModel):
+    address: str
+    status: Optional[str] = "Not Found"
+    price: Optional[str] = None  # Still shown to user, just not stored
+    zillow_link: Optional[str] = None
+    realtor_link: Optional[str] = None
+    property_type: Optional[str] = None
+    bedrooms: Optional[int] = None
+    bathrooms: Optional[float] = None
+    square_feet: Optional[int] = None
+    error: Optional[str] = None
+    api_source: Optional[str] = None
+    previous_status: Optional[str] = None  # refresh uploads only
+
+class BatchAddress(BaseModel):
+    address: str
+    id: Optional[Union[str, int]] = None  # echoed back unchanged so clients can match out-of-order results
+
+class BatchSearchRequest(BaseModel):
+    addresses: List[Union[str, BatchAddress]]
+    use_cache: bool = True
+    max_in_flight: Optional[int] = None
+
+class SearchResponse(BaseModel):
+    results: List[PropertyResult]
+    total_searched: int
+    successful: int
+    failed: int
+    session_id: str
+
+class JobStatus(BaseModel):
+    session_id: str
+    status: str
+    mode: str = "full"  # 'full' or 'refresh'
+    filename: Optional[str] = None
+    total_addresses: Optional[int] = None
+    processed_rows: int = 0
+    successful: int = 0
+    failed: int = 0
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+class JobResultsPage(BaseModel):
+    session_id: str
+    results: List[PropertyResult]
+    next_row: int  # pass as start_row to fetch the next page
+
+class StatusChange(BaseModel):
+    row_number: int
+    address: str
+    previous_status: Optional[str] = None
+    status: Optional[str] = None
+
+class JobChangesPage(BaseModel):
+    session_id: str
+    changes: List[StatusChange]
+    next_row: int  # pass as start_row to fetch the next page
+
+class InquiryStats(BaseModel):
+    total_inquiries: int
+    total_sessions: int
+    successful_searches: int
+    failed_searches: int
+    top_searched_addresses: List[dict]
+    recent_searches: List[dict]
+
+# Database Models (for responses) - Price removed
+class PropertyInquiryResponse(BaseModel):
+    id: int
+    session_id: Optional[str] = None
+    address: str
+    search_type: str
+    status: Optional[str]
+    # REMOVED: price: Optional[str]  # Price removed from database response
+    property_type: Optional[str]
+    bedrooms: Optional[int]
+    bathrooms: Optional[float]
+    square_feet: Optional[int] = None
+    api_source: Optional[str] = None
+    zillow_link: Optional[str] = None
+    realtor_link: Optional[str] = None
+    error_message: Optional[str] = None
+    success: bool
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class InquiryPage(BaseModel):
+    items: List[PropertyInquiryResponse]
+    next_cursor: Optional[str] = None  # pass back as cursor for the next page; None on the last page
\ No newline at end of file
@@ -0,0 +1,142 @@
+import argparse
+import re
+from typing import NamedTuple, Optional
+
+# USPS Publication 28 street suffix abbreviations (the common ones)
+STREET_SUFFIXES = {
+    "alley": "aly", "allee": "aly", "ally": "aly",
+    "avenue": "ave", "av": "ave", "aven": "ave", "avenu": "ave", "avn": "ave", "avnue": "ave",
+    "boulevard": "blvd", "boul": "blvd", "boulv": "blvd",
+    "circle": "cir", "circ": "cir", "circl": "cir", "crcl": "cir",
+    "court": "ct", "crt": "ct",
+    "cove": "cv",
+    "crossing": "xing", "crssng": "xing",
+    "drive": "dr", "driv": "dr", "drv": "dr",
+    "expressway": "expy", "expr": "expy", "express": "expy",
+    "freeway": "fwy", "frwy": "fwy",
+    "highway": "hwy", "highwy": "hwy", "hiway": "hwy", "hiwy": "hwy", "hway": "hwy",
+    "lane": "ln",
+    "loop": "loop",
+    "parkway": "pkwy", "parkwy": "pkwy", "pkway": "pkwy", "pky": "pkwy",
+    "place": "pl",
+    "plaza": "plz", "plza": "plz",
+    "point": "pt",
+    "road": "rd",
+    "square": "sq", "sqr": "sq",
+    "street": "st", "strt": "st", "str": "st",
+    "terrace": "ter", "terr": "ter",
+    "trail": "trl", "trails": "trl",
+    "way": "way",
+}
+
+# USPS secondary unit designators
+UNIT_DESIGNATORS = {
+    "apartment": "apt",
+    "building": "bldg",
+    "floor": "fl",
+    "suite": "ste",
+    "unit": "unit",
+    "room": "rm",
+    "department": "dept",
+    "lot": "lot",
+    "space": "spc",
+    "penthouse": "ph",
+    "basement": "bsmt",
+    "trailer": "trlr",
+}
+
+DIRECTIONALS = {
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw",
+}
+
+ABBREVIATIONS = {**STREET_SUFFIXES, **UNIT_DESIGNATORS, **DIRECTIONALS}
+
+# Trailing country names dropped from the key
+COUNTRY_TOKENS = {"usa", "us", "u.s.a", "u.s", "united states", "united states of america"}
+
+_ZIP_RE = re.compile(r"\b(\d{5})(?:-\d{4})?\s*$")
+_SEPARATOR_RE = re.compile(r"[^a-z0-9#]+")
+
+class NormalizedAddress(NamedTuple):
+    key: str
+    zip_code: Optional[str]
+
+def normalize_address(address: str) -> NormalizedAddress:
+    """Split an address into a canonical key and its ZIP code
+
+    The key ignores case, punctuation, spacing, the ZIP code and USPS
+    suffix/unit/directional spelling, so "123 MAIN STREET,  austin, tx 78701"
+    and "123 Main St, Austin, TX" share a key.
+    """
+
+    # Comma-separated parts keep street, city and state apart
+    parts = [" ".join(part.split()) for part in str(address).lower().split(",")]
+    parts = [part for part in parts if part]
+    if len(parts) > 1 and parts[-1].rstrip(".") in COUNTRY_TOKENS:
+        parts.pop()
+
+    zip_code = None
+    if parts:
+        match = _ZIP_RE.search(parts[-1])
+        # A lone number at the start of the only part is a house number, not a ZIP
+        if match and (match.start() > 0 or len(parts) > 1):
+            zip_code = match.group(1)
+            parts[-1] = parts[-1][:match.start()].strip()
+
+    tokens_by_part = []
+    for part in parts:
+        words = _SEPARATOR_RE.sub(" ", part.replace("#", " # ")).split()
+        tokens = [ABBREVIATIONS.get(word, word) for word in words]
+        if tokens:
+            tokens_by_part.append(" ".join(tokens))
+
+    return NormalizedAddress(" ".join(tokens_by_part), zip_code)
+
+def address_key(address: str) -> str:
+    """Return the canonical key used to match, cache and deduplicate an address"""
+    return normalize_address(address).key
+
+def extract_zip(address: str) -> Optional[str]:
+    """Return the 5-digit ZIP code at the end of an address, if any"""
+    return normalize_address(address).zip_code
+
+def backfill_address_keys(db, batch_size: int = 1000) -> int:
+    """Fill property_inquiries.address_key for rows logged before it existed"""
+    from sqlalchemy import bindparam, update
+    from .database import PropertyInquiry
+
+    stmt = update(PropertyInquiry).where(PropertyInquiry.id == bindparam("row_id")).values(
+        address_key=bindparam("key")
+    )
+
+    total, last_id = 0, 0
+    while True:
+        rows = db.query(PropertyInquiry.id, PropertyInquiry.address).filter(
+            PropertyInquiry.address_key.is_(None),
+            PropertyInquiry.address.isnot(None),
+            PropertyInquiry.id > last_id
+        ).order_by(PropertyInquiry.id).limit(batch_size).all()
+        if not rows:
+            return total
+
+        db.connection().execute(stmt, [{"row_id": row.id, "key": address_key(row.address)} for row in rows])
+        db.commit()
+        total += len(rows)
+        last_id = rows[-1].id
+
+def main():
+    parser = argparse.ArgumentParser(description="Address normalization utilities")
+    parser.add_argument("command", choices=["backfill"], help="backfill: fill address_key on existing inquiries")
+    parser.parse_args()
+
+    from .database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print("Address keys filled:", backfill_address_keys(db))
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
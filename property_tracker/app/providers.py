@@ -0,0 +1,315 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from .api_clients import PropertyAPIClient
+from .city_listings import cached_realty_base_listing, search_realty_base_listing
+from .metrics import PROVIDER_CALLS, PROVIDER_HEDGES, PROVIDER_REQUEST_SECONDS
+from .rate_limit import PRIORITY_BULK
+
+# 'sequential' tries providers one after another, 'hedged' starts the next
+# provider if the current one has not answered within PROVIDER_HEDGE_DELAY,
+# 'parallel' queries every provider at once; the first usable answer wins
+PROVIDER_MODE_SINGLE = os.getenv("PROVIDER_MODE_SINGLE", "hedged")
+PROVIDER_MODE_BULK = os.getenv("PROVIDER_MODE_BULK", "sequential")  # hedging spends extra quota
+PROVIDER_HEDGE_DELAY = float(os.getenv("PROVIDER_HEDGE_DELAY", "1.0"))  # seconds
+
+# Per-provider request timeouts in seconds
+PROVIDER_TIMEOUTS = {
+    "zillow": float(os.getenv("ZILLOW_TIMEOUT", "5")),
+    "realty_base": float(os.getenv("REALTY_BASE_TIMEOUT", "5")),
+}
+
+# Circuit breaker configuration
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))  # consecutive failures
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))  # open time before a trial call
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "3"))  # slower calls count as failures
+
+# Latency samples kept per provider for percentiles
+LATENCY_WINDOW = 500
+
+PROVIDER_MODES = {"sequential", "hedged", "parallel"}
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial call"""
+
+    def __init__(self, failure_threshold: int = None, reset_seconds: float = None):
+        self.failure_threshold = failure_threshold or BREAKER_FAILURE_THRESHOLD
+        self.reset_seconds = reset_seconds or BREAKER_RESET_SECONDS
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._trial_running = False
+
+    def allow(self) -> bool:
+        """Return whether a call may go to the provider now"""
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_running = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Give back a trial call that was abandoned without a verdict"""
+        self._trial_running = False
+
+class Provider:
+    """One upstream source: how to query it and how to read a match from its response
+
+    cached(address), when given, returns a response held locally or None; such
+    answers bypass the circuit breaker and latency stats, which track upstream calls.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        search: Callable,
+        parse: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+        cached: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None
+    ):
+        self.name = name
+        self.search = search
+        self.parse = parse
+        self.cached = cached
+        self.timeout = PROVIDER_TIMEOUTS.get(name)
+        self.breaker = CircuitBreaker()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.counters = {
+            "calls": 0, "cached": 0, "hits": 0, "misses": 0, "errors": 0, "slow": 0, "skipped": 0, "wins": 0
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        samples = sorted(self.latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 4)
+
+        return {
+            **self.counters,
+            "breaker": self.breaker.state,
+            "breaker_opened": self.breaker.times_opened,
+            "timeout": self.timeout,
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+            "latency_p99": percentile(0.99),
+        }
+
+def parse_zillow(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Result fields from the first Zillow match, or None"""
+    if not data.get("results"):
+        return None
+    first_result = data["results"][0]
+    return {
+        "status": first_result.get("statusText", "Active"),
+        "price": first_result.get("formattedPrice", "N/A"),
+        "property_type": first_result.get("propertyType", "N/A"),
+        "bedrooms": first_result.get("bedrooms"),
+        "bathrooms": first_result.get("bathrooms"),
+        "square_feet": first_result.get("livingArea"),
+    }
+
+def _format_price(price) -> str:
+    # Realty Base sends numbers; results carry display strings like Zillow's formattedPrice
+    if isinstance(price, (int, float)):
+        return f"${price:,.0f}"
+    return price or "N/A"
+
+def parse_realty_base(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Result fields from the Realty Base listing matched to the address, or None"""
+    if not data.get("data"):
+        return None
+    first_result = data["data"][0]
+    return {
+        "status": "Active",
+        "price": _format_price(first_result.get("price")),
+        "bedrooms": first_result.get("beds"),
+        "bathrooms": first_result.get("baths"),
+    }
+
+class ProviderOutcome:
+    """Which provider answered, with what, and which providers failed or were skipped"""
+
+    def __init__(self):
+        self.source: Optional[str] = None
+        self.fields: Optional[Dict[str, Any]] = None
+        self.errors: Dict[str, str] = {}
+        self.skipped: List[str] = []
+
+    @property
+    def complete(self) -> bool:
+        """True when every provider gave a real answer, so a miss is trustworthy"""
+        return not self.errors and not self.skipped
+
+class ProviderOrchestrator:
+    """Query providers in priority order with hedging and per-provider circuit breakers"""
+
+    def __init__(self, providers: List[Provider], hedge_delay: float = None):
+        self.providers = providers
+        self.hedge_delay = PROVIDER_HEDGE_DELAY if hedge_delay is None else hedge_delay
+        self.hedges = 0
+
+    async def lookup(
+        self,
+        api_client: PropertyAPIClient,
+        address: str,
+        priority: int = PRIORITY_BULK,
+        mode: str = "sequential"
+    ) -> ProviderOutcome:
+        """Return the first usable answer, preferring earlier providers on ties"""
+
+        if mode not in PROVIDER_MODES:
+            raise ValueError(f"Unknown provider mode: {mode}")
+        # Seconds to wait before starting the next provider; None waits for an answer
+        delay = {"sequential": None, "hedged": self.hedge_delay, "parallel": 0}[mode]
+
+        outcome = ProviderOutcome()
+        pending = list(self.providers)
+        running: Dict[asyncio.Task, Provider] = {}
+        # Upstream calls holding a breaker trial; cached answers hold none
+        upstream = set()
+
+        def launch_next():
+            while pending:
+                provider = pending.pop(0)
+                # A locally held answer is used even while the breaker is open
+                data = provider.cached(address) if provider.cached else None
+                if data is not None:
+                    running[asyncio.ensure_future(self._use_cached(provider, data))] = provider
+                    return
+                if provider.breaker.allow():
+                    task = asyncio.ensure_future(self._call(provider, api_client, address, priority, outcome))
+                    running[task] = provider
+                    upstream.add(task)
+                    return
+                provider.counters["skipped"] += 1
+                PROVIDER_CALLS.inc(provider=provider.name, result="skipped")
+                outcome.skipped.append(provider.name)
+
+        try:
+            while pending or running:
+                if pending and (not running or delay == 0):
+                    launch_next()
+                    continue
+
+                done, _ = await asyncio.wait(
+                    running, timeout=delay if pending else None, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # The running provider is slow: hedge with the next one
+                    self.hedges += 1
+                    PROVIDER_HEDGES.inc()
+                    launch_next()
+                    continue
+
+                for task in sorted(done, key=lambda t: self.providers.index(running[t])):
+                    provider = running.pop(task)
+                    fields = task.result()
+                    if fields is not None:
+                        provider.counters["wins"] += 1
+                        outcome.source, outcome.fields = provider.name, fields
+                        return outcome
+
+            return outcome
+
+        finally:
+            # Losing hedges are abandoned
+            for task, provider in running.items():
+                task.cancel()
+                if task in upstream:
+                    provider.breaker.release()
+
+    async def _use_cached(self, provider: Provider, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # No upstream request was made, so the breaker and latency stats are left alone
+        provider.counters["cached"] += 1
+        fields = provider.parse(data)
+        provider.counters["hits" if fields is not None else "misses"] += 1
+        PROVIDER_CALLS.inc(provider=provider.name, result="cached_hit" if fields is not None else "cached_miss")
+        return fields
+
+    async def _call(
+        self,
+        provider: Provider,
+        api_client: PropertyAPIClient,
+        address: str,
+        priority: int,
+        outcome: ProviderOutcome
+    ) -> Optional[Dict[str, Any]]:
+        provider.counters["calls"] += 1
+        latencies = []
+
+        try:
+            data = await provider.search(
+                api_client, address, priority, timeout=provider.timeout, on_latency=latencies.append
+            )
+        except Exception as e:
+            data = {"error": str(e) or type(e).__name__}
+
+        if latencies:
+            provider.latencies.append(latencies[0])
+            PROVIDER_REQUEST_SECONDS.observe(latencies[0], provider=provider.name)
+
+        if "error" in data:
+            provider.counters["errors"] += 1
+            PROVIDER_CALLS.inc(provider=provider.name, result="error")
+            provider.breaker.record_failure()
+            outcome.errors[provider.name] = data["error"]
+            return None
+
+        if latencies and latencies[0] > BREAKER_SLOW_CALL_SECONDS:
+            # Answered, but too slowly to keep relying on
+            provider.counters["slow"] += 1
+            PROVIDER_CALLS.inc(provider=provider.name, result="slow")
+            provider.breaker.record_failure()
+        else:
+            provider.breaker.record_success()
+
+        fields = provider.parse(data)
+        provider.counters["hits" if fields is not None else "misses"] += 1
+        PROVIDER_CALLS.inc(provider=provider.name, result="hit" if fields is not None else "miss")
+        return fields
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hedges": self.hedges,
+            "hedge_delay": self.hedge_delay,
+            "providers": {provider.name: provider.stats() for provider in self.providers},
+        }
+
+def mode_for_search(search_type: str) -> str:
+    """Provider mode configured for a 'single' or 'bulk' search"""
+    return PROVIDER_MODE_SINGLE if search_type == "single" else PROVIDER_MODE_BULK
+
+_orchestrator: Optional[ProviderOrchestrator] = None
+
+def get_provider_orchestrator() -> ProviderOrchestrator:
+    """Return the process-wide orchestrator, which owns breaker and latency state"""
+    global _orchestrator
+    if _orchestrator is None:
+        _orchestrator = ProviderOrchestrator([
+            Provider("zillow", PropertyAPIClient.search_zillow, parse_zillow),
+            # One city listing download serves every address in that city
+            Provider("realty_base", search_realty_base_listing, parse_realty_base, cached=cached_realty_base_listing),
+        ])
+    return _orchestrator
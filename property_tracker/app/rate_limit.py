@@ -0,0 +1,185 @@
+import asyncio
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# Scheduling priorities (lower runs first)
+PRIORITY_SINGLE = 0
+PRIORITY_BULK = 10
+
+# Requests-per-second and burst size for each upstream host
+RATE_LIMITS = {
+    "zillow56.p.rapidapi.com": (
+        float(os.getenv("ZILLOW_RATE_LIMIT_RPS", "2")),
+        int(os.getenv("ZILLOW_RATE_LIMIT_BURST", "2"))
+    ),
+    "realty-base-us.p.rapidapi.com": (
+        float(os.getenv("REALTY_BASE_RATE_LIMIT_RPS", "2")),
+        int(os.getenv("REALTY_BASE_RATE_LIMIT_BURST", "2"))
+    ),
+}
+
+# 'memory' keeps buckets in this process, 'sqlite' shares them between workers on one host
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "rate_limits.db")
+
+class MemoryBucketBackend:
+    """Token buckets held in process memory"""
+
+    # Calls return immediately, so they run on the event loop
+    blocking = False
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        """Take one token; return 0 on success or the seconds to wait for the next token"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            return 0.0
+
+        self._buckets[key] = (tokens, now)
+        return (1 - tokens) / rate
+
+    def penalize(self, key: str, seconds: float, rate: float, burst: int):
+        """Empty the bucket so no request is admitted for the given number of seconds"""
+        now = time.monotonic()
+        tokens, _ = self._buckets.get(key, (burst, now))
+        self._buckets[key] = (min(tokens, 0) - seconds * rate, now)
+
+class SQLiteBucketBackend:
+    """Token buckets in a local SQLite file, shared by every worker process on the host"""
+
+    # Calls wait on the file lock and disk, so the scheduler runs them in a thread
+    blocking = True
+
+    def __init__(self, path: str = None):
+        self.path = path or RATE_LIMIT_SQLITE_PATH
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        # WAL with NORMAL sync commits without an fsync each time; losing the last
+        # bucket updates in a power cut only means a brief burst afterwards
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS token_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _update(self, key: str, burst: int, compute) -> float:
+        # BEGIN IMMEDIATE takes the file's write lock, serializing workers
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT tokens, updated FROM token_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, updated = row if row else (burst, now)
+                tokens, wait = compute(tokens, max(0.0, now - updated))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO token_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                    (key, tokens, now)
+                )
+                self._conn.execute("COMMIT")
+                return wait
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        """Take one token; return 0 on success or the seconds to wait for the next token"""
+
+        def compute(tokens, elapsed):
+            tokens = min(burst, tokens + elapsed * rate)
+            if tokens >= 1:
+                return tokens - 1, 0.0
+            return tokens, (1 - tokens) / rate
+
+        return self._update(key, burst, compute)
+
+    def penalize(self, key: str, seconds: float, rate: float, burst: int):
+        """Empty the bucket so no request is admitted for the given number of seconds"""
+        self._update(key, burst, lambda tokens, elapsed: (min(tokens, 0) - seconds * rate, 0.0))
+
+class _HostQueue:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.waiters = []
+        self.condition = asyncio.Condition()
+
+class RateLimitScheduler:
+    """Admit upstream requests per host from a shared token bucket, highest priority first"""
+
+    def __init__(self, backend=None, limits: Dict[str, Tuple[float, int]] = None):
+        self.backend = backend or MemoryBucketBackend()
+        self.limits = limits if limits is not None else RATE_LIMITS
+        self._queues: Dict[str, _HostQueue] = {}
+        self._sequence = itertools.count()
+
+    async def acquire(self, host: str, priority: int = PRIORITY_BULK):
+        """Wait until a request to host may be sent"""
+
+        limit = self.limits.get(host)
+        if not limit or limit[0] <= 0:
+            return
+        rate, burst = limit
+
+        queue = self._queues.get(host)
+        if queue is None or queue.loop is not asyncio.get_running_loop():
+            queue = self._queues[host] = _HostQueue()
+        entry = (priority, next(self._sequence))
+
+        async with queue.condition:
+            heapq.heappush(queue.waiters, entry)
+            queue.condition.notify_all()
+            try:
+                while True:
+                    if queue.waiters[0] == entry:
+                        # Only the highest-priority waiter draws from the bucket
+                        delay = await self._call(self.backend.take, host, rate, burst)
+                        if delay <= 0:
+                            return
+                        try:
+                            await asyncio.wait_for(queue.condition.wait(), delay)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await queue.condition.wait()
+            finally:
+                queue.waiters.remove(entry)
+                heapq.heapify(queue.waiters)
+                queue.condition.notify_all()
+
+    async def penalize(self, host: str, seconds: float):
+        """Hold back all requests to host, e.g. after an HTTP 429"""
+        limit = self.limits.get(host)
+        if limit and limit[0] > 0:
+            await self._call(self.backend.penalize, host, seconds, *limit)
+
+    async def _call(self, method, *args):
+        # Keep a shared backend's locking and disk writes off the event loop
+        if getattr(self.backend, "blocking", False):
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+_scheduler: Optional[RateLimitScheduler] = None
+
+def get_rate_limiter() -> RateLimitScheduler:
+    """Return the process-wide rate limit scheduler"""
+    global _scheduler
+    if _scheduler is None:
+        if RATE_LIMIT_BACKEND == "sqlite":
+            backend = SQLiteBucketBackend()
+        else:
+            backend = MemoryBucketBackend()
+        _scheduler = RateLimitScheduler(backend)
+    return _scheduler
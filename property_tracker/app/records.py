@@ -0,0 +1,50 @@
+from dataclasses import dataclass, fields, replace
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from .models import PropertyResult
+
+@dataclass(slots=True)
+class LookupResult:
+    """Compact internal result of one address lookup
+
+    Used throughout the lookup and bulk pipeline instead of PropertyResult;
+    converted to the Pydantic model only when returned from the API.
+    """
+
+    address: str
+    status: Optional[str] = "Not Found"
+    price: Optional[str] = None  # Still shown to user, just not stored
+    zillow_link: Optional[str] = None
+    realtor_link: Optional[str] = None
+    property_type: Optional[str] = None
+    bedrooms: Optional[int] = None
+    bathrooms: Optional[float] = None
+    square_feet: Optional[int] = None
+    error: Optional[str] = None
+    api_source: Optional[str] = None
+    previous_status: Optional[str] = None  # refresh mode: status from the last run
+    checked_at: Optional[datetime] = None  # refresh mode: when a reused status was fetched
+
+    @property
+    def success(self) -> bool:
+        return self.status not in ("Error", "Not Found")
+
+    def update(self, values: Dict[str, Any]):
+        """Copy known result fields from a dict (provider fields or a cache entry)"""
+        for name, value in values.items():
+            if name in RESULT_FIELDS:
+                setattr(self, name, value)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in RESULT_FIELDS}
+
+    def for_address(self, address: str, links: Dict[str, str]) -> "LookupResult":
+        """Copy of this result for another row with the same property"""
+        return replace(self, address=address, **links)
+
+    def to_model(self) -> PropertyResult:
+        return PropertyResult(**self.as_dict())
+
+# Fields shared with PropertyResult; the rest are internal to the pipeline
+RESULT_FIELDS = tuple(field.name for field in fields(LookupResult) if field.name in PropertyResult.model_fields)
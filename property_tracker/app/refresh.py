@@ -0,0 +1,72 @@
+import os
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from .database import AsyncSessionLocal, PropertyInquiry
+from .normalize import address_key
+
+# Refresh uploads reuse a result checked upstream within this many seconds
+REFRESH_MAX_AGE = int(os.getenv("REFRESH_MAX_AGE", "86400"))
+
+# Addresses whose prior results are loaded per query
+REFRESH_BATCH_SIZE = int(os.getenv("REFRESH_BATCH_SIZE", "500"))
+
+async def load_prior_results(keys: List[str], before: Optional[datetime] = None) -> Dict[str, object]:
+    """Latest non-error inquiry for each address key, in one query
+
+    With before, only inquiries created earlier count, so a refresh upload
+    never treats rows it logged itself as the previous run.
+    """
+
+    checked_at = func.coalesce(PropertyInquiry.checked_at, PropertyInquiry.created_at)
+    ranked = select(
+        PropertyInquiry.address_key,
+        PropertyInquiry.status,
+        PropertyInquiry.property_type,
+        PropertyInquiry.bedrooms,
+        PropertyInquiry.bathrooms,
+        PropertyInquiry.square_feet,
+        PropertyInquiry.api_source,
+        checked_at.label("checked_at"),
+        func.row_number().over(
+            partition_by=PropertyInquiry.address_key,
+            order_by=(PropertyInquiry.created_at.desc(), PropertyInquiry.id.desc())
+        ).label("rank")
+    ).where(
+        PropertyInquiry.address_key.in_(keys),
+        PropertyInquiry.status != "Error",
+        *([PropertyInquiry.created_at < before] if before is not None else [])
+    ).subquery()
+
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(select(ranked).where(ranked.c.rank == 1))).all()
+    return {row.address_key: row for row in rows}
+
+def is_fresh(checked_at: Optional[datetime], max_age: int = None) -> bool:
+    if checked_at is None:
+        return False
+    # SQLite hands back naive UTC timestamps, PostgreSQL aware ones
+    if checked_at.tzinfo is not None:
+        checked_at = checked_at.astimezone(timezone.utc).replace(tzinfo=None)
+    max_age = REFRESH_MAX_AGE if max_age is None else max_age
+    return datetime.utcnow() - checked_at < timedelta(seconds=max_age)
+
+async def with_prior_results(
+    addresses: Iterable[str],
+    before: Optional[datetime] = None,
+    batch_size: int = None
+) -> AsyncIterator[Tuple[str, Optional[object]]]:
+    """Pair each address with its latest result logged before `before`, loading priors a batch of addresses at a time"""
+
+    addresses = iter(addresses)
+    while True:
+        batch = list(islice(addresses, batch_size or REFRESH_BATCH_SIZE))
+        if not batch:
+            return
+        keys = [address_key(address) for address in batch]
+        priors = await load_prior_results(sorted(set(keys)), before)
+        for address, key in zip(batch, keys):
+            yield address, priors.get(key)
@@ -0,0 +1,306 @@
+import argparse
+import json
+import os
+import re
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.orm import Session
+
+from .database import PropertyInquiry, SessionLocal
+from .export import EXPORT_BATCH_ROWS, parquet_schema, write_parquet_batch
+
+# Months of inquiries kept in property_inquiries, counting the current month
+RETENTION_MONTHS = int(os.getenv("RETENTION_MONTHS", "12"))
+
+# Older months are moved to compressed Parquet files here
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+ARCHIVE_COMPRESSION = os.getenv("ARCHIVE_COMPRESSION", "zstd")
+
+# PostgreSQL partitions created ahead of the current month
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+
+TABLE = PropertyInquiry.__tablename__
+
+# Every stored column; the links are derived from the address and not archived
+ARCHIVE_COLUMNS = [column.name for column in PropertyInquiry.__table__.columns]
+
+# property_inquiries_2026_01.parquet, then property_inquiries_2026_01.1.parquet for late rows
+_ARCHIVE_RE = re.compile(r"^property_inquiries_(\d{4})_(\d{2})(?:\.\d+)?\.parquet$")
+_PARTITION_RE = re.compile(r"^property_inquiries_(\d{4})_(\d{2})$")
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def month_of(value: datetime) -> date:
+    # SQLite hands back naive UTC timestamps, PostgreSQL aware ones
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date().replace(day=1)
+
+def current_month() -> date:
+    return datetime.now(timezone.utc).date().replace(day=1)
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_{month:%Y_%m}"
+
+def _bounds(month: date) -> Tuple[datetime, datetime]:
+    lower = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    upper = add_months(month, 1)
+    return lower, datetime(upper.year, upper.month, 1, tzinfo=timezone.utc)
+
+def _in_month(month: date):
+    lower, upper = _bounds(month)
+    return (PropertyInquiry.created_at >= lower) & (PropertyInquiry.created_at < upper)
+
+def is_partitioned(db: Session) -> bool:
+    """Whether property_inquiries is a partitioned table (PostgreSQL after migration 0008)"""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    kind = db.execute(text("SELECT relkind FROM pg_class WHERE relname = :name"), {"name": TABLE}).scalar()
+    return kind == "p"
+
+def partition_months(db: Session) -> Dict[date, str]:
+    """Monthly partitions currently attached, by month"""
+    names = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :name"
+    ), {"name": TABLE}).scalars()
+    months = {}
+    for name in names:
+        match = _PARTITION_RE.match(name)
+        if match:
+            months[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return months
+
+def ensure_partitions(db: Session, months_ahead: int = None) -> List[str]:
+    """Create missing partitions from the current month to months_ahead months out; return their names"""
+
+    if not is_partitioned(db):
+        return []
+
+    months_ahead = PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    existing = partition_months(db)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current_month(), offset)
+        if month in existing:
+            continue
+
+        lower, upper = _bounds(month)
+        name = partition_name(month)
+        db.execute(text(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)"))
+        # Rows that already landed in the default partition would block the attach
+        db.execute(text(
+            f"WITH moved AS (DELETE FROM {TABLE}_default WHERE created_at >= :lower AND created_at < :upper "
+            f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+        ), {"lower": lower, "upper": upper})
+        db.execute(text(
+            f"ALTER TABLE {TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{lower:%Y-%m-%d} 00:00:00+00') TO ('{upper:%Y-%m-%d} 00:00:00+00')"
+        ))
+        db.commit()
+        created.append(name)
+    return created
+
+def archive_files(month: date = None) -> List[str]:
+    """Archive file paths, oldest month first, optionally for one month"""
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    files = []
+    for name in sorted(os.listdir(ARCHIVE_DIR)):
+        match = _ARCHIVE_RE.match(name)
+        if match and (month is None or (int(match.group(1)), int(match.group(2))) == (month.year, month.month)):
+            files.append(os.path.join(ARCHIVE_DIR, name))
+    return files
+
+def _archived_ids(month: date) -> Set[int]:
+    import pyarrow.parquet as pq
+
+    ids = set()
+    for path in archive_files(month):
+        ids.update(pq.read_table(path, columns=["id"])["id"].to_pylist())
+    return ids
+
+def archive_month(db: Session, month: date) -> Optional[dict]:
+    """Move one month of inquiries into a Parquet file and out of the hot table
+
+    Rows are only removed once their file is complete. A rerun after a failure
+    in between skips rows already in an archive file for that month.
+    """
+    import pyarrow.parquet as pq
+
+    existing = archive_files(month)
+    archived_ids = _archived_ids(month) if existing else set()
+    path = os.path.join(ARCHIVE_DIR, f"{partition_name(month)}{f'.{len(existing)}' if existing else ''}.parquet")
+    partial = path + ".partial"
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+
+    columns = [PropertyInquiry.__table__.c[name] for name in ARCHIVE_COLUMNS]
+    stmt = select(*columns).where(_in_month(month)).order_by(PropertyInquiry.created_at, PropertyInquiry.id)
+
+    rows = 0
+    writer = pq.ParquetWriter(partial, parquet_schema(ARCHIVE_COLUMNS), compression=ARCHIVE_COMPRESSION)
+    try:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_ROWS))
+        for partition in result.partitions():
+            batch = [tuple(row) for row in partition if row.id not in archived_ids]
+            if batch:
+                write_parquet_batch(writer, batch)
+                rows += len(batch)
+        writer.close()
+    except BaseException:
+        writer.close()
+        os.remove(partial)
+        raise
+
+    if rows:
+        os.replace(partial, path)
+    else:
+        os.remove(partial)
+
+    # Detaching and dropping a partition avoids a large DELETE and the vacuum after it
+    partition = partition_months(db).get(month) if is_partitioned(db) else None
+    if partition is not None:
+        db.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {partition}"))
+        db.execute(text(f"DROP TABLE {partition}"))
+    # Rows in the default partition, or the whole month on an unpartitioned table
+    db.execute(delete(PropertyInquiry).where(_in_month(month)))
+    db.commit()
+
+    if not rows:
+        return None
+    return {"month": f"{month:%Y-%m}", "rows": rows, "path": path, "bytes": os.path.getsize(path)}
+
+def run_retention(db: Session, months: int = None) -> dict:
+    """Create upcoming partitions and archive every month older than the retention window"""
+
+    months = RETENTION_MONTHS if months is None else months
+    cutoff = add_months(current_month(), -(max(months, 1) - 1))
+    created = ensure_partitions(db)
+
+    expired = set()
+    oldest = db.scalar(select(func.min(PropertyInquiry.created_at)))
+    if oldest is not None:
+        month = month_of(oldest)
+        while month < cutoff:
+            expired.add(month)
+            month = add_months(month, 1)
+    # Empty partitions past the window are dropped too
+    if is_partitioned(db):
+        expired.update(month for month in partition_months(db) if month < cutoff)
+
+    archived = [archive_month(db, month) for month in sorted(expired)]
+    return {
+        "created_partitions": created,
+        "archived": [entry for entry in archived if entry is not None],
+        "kept_from": f"{cutoff:%Y-%m}",
+    }
+
+# Per-file aggregates, keyed by path and reused while the file is unchanged. Only
+# low-cardinality counts are kept; per-address counts would grow with the archive
+_summaries: Dict[str, Tuple[float, dict]] = {}
+
+def _value_counts(values) -> Counter:
+    import pyarrow.compute as pc
+
+    return Counter({item["values"]: item["counts"] for item in pc.value_counts(values).to_pylist()})
+
+def _summarize(path: str) -> dict:
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path, columns=["status", "search_type", "success"])
+    return {
+        "rows": table.num_rows,
+        "successful": _value_counts(table["success"]).get(True, 0),
+        "statuses": _value_counts(table["status"]),
+        "search_types": _value_counts(table["search_type"]),
+    }
+
+def _file_summary(path: str) -> dict:
+    mtime = os.path.getmtime(path)
+    cached = _summaries.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _summaries[path] = (mtime, _summarize(path))
+    return cached[1]
+
+def archive_totals() -> dict:
+    """Row, success, status and search type counts across every archive file"""
+
+    totals = {"rows": 0, "successful": 0, "statuses": Counter(), "search_types": Counter()}
+    for path in archive_files():
+        summary = _file_summary(path)
+        totals["rows"] += summary["rows"]
+        totals["successful"] += summary["successful"]
+        for key in ("statuses", "search_types"):
+            totals[key].update(summary[key])
+    return totals
+
+def archive_address_counts() -> Counter:
+    """Searches per address across every archive file; read afresh each call, for CLI tools"""
+
+    import pyarrow.parquet as pq
+
+    addresses = Counter()
+    for path in archive_files():
+        addresses.update(_value_counts(pq.read_table(path, columns=["address"])["address"]))
+    return addresses
+
+def archived_stats(top: int = 10, addresses: bool = False) -> dict:
+    """Statistics over archived inquiries, read from the Parquet files
+
+    Top addresses need every address in the archive in memory, so they are
+    only counted when asked for (the stats command), not for the API.
+    """
+
+    months: Dict[str, dict] = {}
+    for path in archive_files():
+        match = _ARCHIVE_RE.match(os.path.basename(path))
+        month = months.setdefault(f"{match.group(1)}-{match.group(2)}", {"rows": 0, "bytes": 0})
+        month["rows"] += _file_summary(path)["rows"]
+        month["bytes"] += os.path.getsize(path)
+
+    totals = archive_totals()
+    stats = {
+        "total_inquiries": totals["rows"],
+        "successful_searches": totals["successful"],
+        "failed_searches": totals["rows"] - totals["successful"],
+        "by_status": dict(totals["statuses"].most_common()),
+        "by_search_type": dict(totals["search_types"].most_common()),
+        "months": [{"month": month, **values} for month, values in sorted(months.items())],
+    }
+    if addresses:
+        stats["top_searched_addresses"] = [
+            {"address": address, "count": count}
+            for address, count in archive_address_counts().most_common(top)
+        ]
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Partition maintenance and archival of old inquiries")
+    parser.add_argument("command", choices=["run", "partitions", "stats"], help=(
+        "run: create upcoming partitions and archive months past retention; "
+        "partitions: only create upcoming partitions; stats: summarize archived inquiries"
+    ))
+    parser.add_argument("--months", type=int, default=None, help="months to keep in the table (default RETENTION_MONTHS)")
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        print(json.dumps(archived_stats(addresses=True), indent=2, default=str))
+        return
+
+    db = SessionLocal()
+    try:
+        if args.command == "partitions":
+            print("Partitions created:", ensure_partitions(db))
+        else:
+            print(json.dumps(run_retention(db, args.months), indent=2))
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
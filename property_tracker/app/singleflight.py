@@ -0,0 +1,47 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+R = TypeVar("R")
+
+class SingleFlight(Generic[R]):
+    """Coalesce concurrent calls with the same key into one
+
+    The call runs in its own task, so one caller being cancelled (a client
+    going away, a job being stopped) does not fail the others waiting on it.
+    Nothing is kept after the call finishes; repeat lookups are the cache's job.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[R]]) -> R:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.calls += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark retrieved so a failure nobody waited for is not reported as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._in_flight), "calls": self.calls, "shared": self.shared}
+
+_lookup_flights: Optional[SingleFlight] = None
+
+def get_lookup_flights() -> SingleFlight:
+    """Return the process-wide single-flight group for upstream address lookups"""
+    global _lookup_flights
+    if _lookup_flights is None:
+        _lookup_flights = SingleFlight()
+    return _lookup_flights
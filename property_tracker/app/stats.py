@@ -0,0 +1,133 @@
+import argparse
+from collections import Counter
+from typing import Dict, Iterable, List
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from .database import AddressSearchCount, InquiryCounter, PropertyInquiry, SearchSession, SessionLocal
+from .retention import archive_address_counts, archive_totals
+
+# Counters kept in inquiry_counters
+COUNTER_NAMES = ["total_inquiries", "successful_searches", "failed_searches", "total_sessions"]
+
+def _dialect_insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+def _increment(db: Session, model, key_attr: str, value_attr: str, increments: Dict[str, int]):
+    """Add increments to a key/count table with a single upsert"""
+
+    if not increments:
+        return
+
+    # Sorted keys keep lock order stable between concurrent writers
+    values = [{key_attr: key, value_attr: increments[key]} for key in sorted(increments)]
+    insert = _dialect_insert(db)
+
+    if insert is not None:
+        stmt = insert(model).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[key_attr],
+            set_={value_attr: getattr(model, value_attr) + getattr(stmt.excluded, value_attr)}
+        )
+        db.execute(stmt)
+        return
+
+    # Portable fallback for other databases
+    for row in values:
+        updated = db.query(model).filter(getattr(model, key_attr) == row[key_attr]).update(
+            {value_attr: getattr(model, value_attr) + row[value_attr]}, synchronize_session=False
+        )
+        if not updated:
+            db.add(model(**row))
+
+def record_inquiries(db: Session, rows: Iterable[dict]):
+    """Update aggregates for newly logged inquiry rows (call inside the inserting transaction)"""
+
+    counters = Counter()
+    addresses = Counter()
+    for row in rows:
+        counters["total_inquiries"] += 1
+        counters["successful_searches" if row.get("success") else "failed_searches"] += 1
+        if row.get("address") is not None:
+            addresses[row["address"]] += 1
+
+    _increment(db, InquiryCounter, "name", "value", dict(counters))
+    _increment(db, AddressSearchCount, "address", "count", dict(addresses))
+
+def record_session(db: Session):
+    """Count a newly created search session"""
+    _increment(db, InquiryCounter, "name", "value", {"total_sessions": 1})
+
+def get_counters(db: Session) -> Dict[str, int]:
+    """Return all aggregate counters, defaulting to zero"""
+    values = dict(db.query(InquiryCounter.name, InquiryCounter.value).all())
+    return {name: int(values.get(name, 0)) for name in COUNTER_NAMES}
+
+def get_top_addresses(db: Session, limit: int = 10) -> List[dict]:
+    """Return the most searched addresses from the maintained counts"""
+    rows = db.query(AddressSearchCount.address, AddressSearchCount.count).order_by(
+        AddressSearchCount.count.desc()
+    ).limit(limit).all()
+    return [{"address": address, "count": int(count)} for address, count in rows]
+
+def rebuild(db: Session):
+    """Recompute every aggregate from the raw tables and the inquiry archives
+
+    Run while no inquiries are being logged, or rows written during the
+    rebuild may be counted twice.
+    """
+
+    db.query(InquiryCounter).delete(synchronize_session=False)
+    db.query(AddressSearchCount).delete(synchronize_session=False)
+
+    total, successful = db.execute(
+        select(func.count(PropertyInquiry.id), func.sum(case((PropertyInquiry.success == True, 1), else_=0)))
+    ).one()
+    # Months moved out of property_inquiries by app.retention still count
+    archived = archive_totals()
+    total = (total or 0) + archived["rows"]
+    successful = (successful or 0) + archived["successful"]
+    sessions = db.query(func.count(SearchSession.id)).scalar() or 0
+
+    _increment(db, InquiryCounter, "name", "value", {
+        "total_inquiries": total,
+        "successful_searches": successful,
+        "failed_searches": total - successful,
+        "total_sessions": sessions,
+    })
+
+    db.execute(
+        AddressSearchCount.__table__.insert().from_select(
+            ["address", "count"],
+            select(PropertyInquiry.address, func.count(PropertyInquiry.id))
+            .where(PropertyInquiry.address.isnot(None))
+            .group_by(PropertyInquiry.address)
+        )
+    )
+    _increment(db, AddressSearchCount, "address", "count", {
+        address: count for address, count in archive_address_counts().items() if address is not None
+    })
+    db.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain pre-aggregated inquiry statistics")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: backfill aggregates from property_inquiries")
+    parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rebuild(db)
+        print("Aggregates rebuilt:", get_counters(db))
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,231 +1,385 @@
-import pandas as pd
-from typing import List
-from .models import PropertyResult
-from .api_clients import PropertyAPIClient
-from .database import PropertyInquiry, SearchSession, get_db
-from sqlalchemy.orm import Session
-import time
-import uuid
-from datetime import datetime
-
-def log_property_inquiry(
-    db: Session,
-    address: str,
-    result: PropertyResult,
-    search_type: str,
-    session_id: str,
-    user_ip: str,
-    user_agent: str
-) -> PropertyInquiry:
-    """Log property inquiry to database"""
-    
-    inquiry = PropertyInquiry(
-        address=address,
-        search_type=search_type,
-        status=result.status,
-        price=result.price,
-        property_type=result.property_type,
-        bedrooms=result.bedrooms,
-        bathrooms=result.bathrooms,
-        square_feet=result.square_feet,
-        zillow_link=result.zillow_link,
-        realtor_link=result.realtor_link,
-        api_source=result.api_source,
-        success=result.status not in ["Error", "Not Found"],
-        error_message=result.error,
-        user_ip=user_ip,
-        user_agent=user_agent
-    )
-    
-    db.add(inquiry)
-    db.commit()
-    db.refresh(inquiry)
-    return inquiry
-
-def create_search_session(
-    db: Session,
-    search_type: str,
-    total_addresses: int,
-    user_ip: str,
-    user_agent: str,
-    filename: str = None
-) -> str:
-    """Create a new search session and return session ID"""
-    
-    session_id = str(uuid.uuid4())
-    
-    session = SearchSession(
-        session_id=session_id,
-        search_type=search_type,
-        total_addresses=total_addresses,
-        user_ip=user_ip,
-        user_agent=user_agent,
-        filename=filename
-    )
-    
-    db.add(session)
-    db.commit()
-    return session_id
-
-def update_search_session(
-    db: Session,
-    session_id: str,
-    successful: int,
-    failed: int
-):
-    """Update search session with results"""
-    
-    session = db.query(SearchSession).filter(SearchSession.session_id == session_id).first()
-    if session:
-        session.successful_searches = successful
-        session.failed_searches = failed
-        session.completed_at = datetime.utcnow()
-        db.commit()
-
-def process_property_address(
-    address: str, 
-    api_client: PropertyAPIClient,
-    db: Session = None,
-    search_type: str = "single",
-    session_id: str = None,
-    user_ip: str = None,
-    user_agent: str = None
-) -> PropertyResult:
-    """Process a single property address and return results"""
-    
-    # Generate links
-    links = api_client.generate_links(address)
-    
-    # Initialize result
-    result = PropertyResult(
-        address=address,
-        zillow_link=links["zillow_link"],
-        realtor_link=links["realtor_link"]
-    )
-    
-    try:
-        # Search Zillow first
-        zillow_data = api_client.search_zillow(address)
-        
-        if "error" not in zillow_data and zillow_data.get("results"):
-            # Extract first result from Zillow
-            first_result = zillow_data["results"][0]
-            result.status = first_result.get("statusText", "Active")
-            result.price = first_result.get("formattedPrice", "N/A")
-            result.property_type = first_result.get("propertyType", "N/A")
-            result.bedrooms = first_result.get("bedrooms")
-            result.bathrooms = first_result.get("bathrooms")
-            result.square_feet = first_result.get("livingArea")
-            result.api_source = "zillow"
-        else:
-            # Try Realty Base if Zillow fails
-            time.sleep(0.5)  # Rate limiting
-            realty_data = api_client.search_realty_base(address)
-            
-            if "error" not in realty_data and realty_data.get("data"):
-                # Process Realty Base data
-                first_result = realty_data["data"][0] if realty_data["data"] else {}
-                result.status = "Active" if first_result else "Not Found"
-                result.price = first_result.get("price", "N/A")
-                result.bedrooms = first_result.get("beds")
-                result.bathrooms = first_result.get("baths")
-                result.api_source = "realty_base"
-            else:
-                result.status = "Not Found"
-                result.error = "No data found in either API"
-    
-    except Exception as e:
-        result.error = str(e)
-        result.status = "Error"
-    
-    # Log to database if db session provided
-    if db and session_id:
-        log_property_inquiry(
-            db=db,
-            address=address,
-            result=result,
-            search_type=search_type,
-            session_id=session_id,
-            user_ip=user_ip or "unknown",
-            user_agent=user_agent or "unknown"
-        )
-    
-    return result
-
-def process_csv_file(
-    file_path: str,
-    db: Session = None,
-    user_ip: str = None,
-    user_agent: str = None,
-    filename: str = None
-) -> tuple[List[PropertyResult], str]:
-    """Process uploaded CSV/Excel file and return property results with session ID"""
-    
-    try:
-        # Read file (supports both CSV and Excel)
-        if file_path.endswith('.csv'):
-            df = pd.read_csv(file_path)
-        else:
-            df = pd.read_excel(file_path)
-        
-        # Find address column (flexible column names)
-        address_columns = ['address', 'Address', 'property_address', 'Property Address', 'full_address']
-        address_col = None
-        
-        for col in address_columns:
-            if col in df.columns:
-                address_col = col
-                break
-        
-        if not address_col:
-            # If no standard column found, use first column
-            address_col = df.columns[0]
-        
-        addresses = df[address_col].dropna().tolist()
-        
-        # Create search session
-        session_id = None
-        if db:
-            session_id = create_search_session(
-                db=db,
-                search_type="bulk",
-                total_addresses=len(addresses),
-                user_ip=user_ip or "unknown",
-                user_agent=user_agent or "unknown",
-                filename=filename
-            )
-        
-        # Process each address
-        api_client = PropertyAPIClient()
-        results = []
-        
-        for i, address in enumerate(addresses):
-            if i > 0:  # Rate limiting - wait between requests
-                time.sleep(1)
-            
-            result = process_property_address(
-                address=str(address),
-                api_client=api_client,
-                db=db,
-                search_type="bulk",
-                session_id=session_id,
-                user_ip=user_ip,
-                user_agent=user_agent
-            )
-            results.append(result)
-        
-        # Update session with final counts
-        if db and session_id:
-            successful = len([r for r in results if r.status not in ["Error", "Not Found"]])
-            failed = len(results) - successful
-            update_search_session(db, session_id, successful, failed)
-        
-        return results, session_id or str(uuid.uuid4())
-    
-    except Exception as e:
-        # Return error result
-        return [PropertyResult(
-            address="File Error",
-            status="Error",
-            error=f"Failed to process file: {str(e)}"
-        )], str(uuid.uuid4())
\ No newline at end of file
+from typing import AsyncIterable, AsyncIterator, Optional, Tuple, Union
+from itertools import islice
+from .records import LookupResult
+from .api_clients import PropertyAPIClient
+from .database import PropertyInquiry, SearchSession
+from .lookup import bounded_map, bounded_map_unordered, Deduplicator
+from .singleflight import get_lookup_flights
+from .refresh import is_fresh, with_prior_results
+from .normalize import address_key
+from .ingest import iter_addresses
+from .cache import get_address_cache
+from .inquiry_writer import get_inquiry_writer
+from .stats import record_inquiries, record_session
+from .rate_limit import PRIORITY_SINGLE, PRIORITY_BULK
+from .providers import get_provider_orchestrator, mode_for_search
+from .metrics import LOOKUP_OUTCOMES, LOOKUPS_IN_FLIGHT, stage
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+import base64
+import json
+import uuid
+from dataclasses import replace
+from datetime import datetime
+
+def inquiry_row(
+    address: str,
+    result: LookupResult,
+    search_type: str,
+    session_id: str,
+    user_ip: str,
+    user_agent: str,
+    row_number: int = None
+) -> dict:
+    """Build the column values for one property_inquiries row"""
+    
+    return {
+        "session_id": session_id,
+        "row_number": row_number,
+        "address": address,
+        "address_key": address_key(address),
+        "search_type": search_type,
+        "status": result.status,
+        "previous_status": result.previous_status,
+        "property_type": result.property_type,
+        "bedrooms": result.bedrooms,
+        "bathrooms": result.bathrooms,
+        "square_feet": result.square_feet,
+        "api_source": result.api_source,
+        "success": result.success,
+        "error_message": result.error,
+        "user_ip": user_ip,
+        "user_agent": user_agent,
+        "checked_at": result.checked_at or datetime.utcnow()
+    }
+
+def encode_cursor(created_at: datetime, inquiry_id: int) -> str:
+    """Encode a keyset pagination position as an opaque string"""
+    # Always carry microseconds, as created_at is stored (see database.utc_now)
+    raw = json.dumps([created_at.isoformat(timespec="microseconds"), inquiry_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor"""
+    created_at, inquiry_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return datetime.fromisoformat(created_at), int(inquiry_id)
+
+def log_property_inquiry(
+    db: Session,
+    address: str,
+    result: LookupResult,
+    search_type: str,
+    session_id: str,
+    user_ip: str,
+    user_agent: str,
+    row_number: int = None
+) -> PropertyInquiry:
+    """Log property inquiry to database immediately"""
+    
+    row = inquiry_row(
+        address=address,
+        result=result,
+        search_type=search_type,
+        session_id=session_id,
+        user_ip=user_ip,
+        user_agent=user_agent,
+        row_number=row_number
+    )
+    inquiry = PropertyInquiry(**row)
+    
+    db.add(inquiry)
+    record_inquiries(db, [row])
+    db.commit()
+    db.refresh(inquiry)
+    return inquiry
+
+async def create_search_session(
+    db: AsyncSession,
+    search_type: str,
+    total_addresses: int,
+    user_ip: str,
+    user_agent: str,
+    filename: str = None,
+    status: str = "completed",
+    file_path: str = None,
+    mode: str = "full"
+) -> str:
+    """Create a new search session and return session ID"""
+    
+    session_id = str(uuid.uuid4())
+    
+    session = SearchSession(
+        session_id=session_id,
+        search_type=search_type,
+        total_addresses=total_addresses,
+        user_ip=user_ip,
+        user_agent=user_agent,
+        filename=filename,
+        status=status,
+        file_path=file_path,
+        mode=mode
+    )
+    
+    db.add(session)
+    await db.run_sync(record_session)
+    await db.commit()
+    return session_id
+
+async def update_search_session(
+    db: AsyncSession,
+    session_id: str,
+    successful: int,
+    failed: int,
+    total_addresses: int = None
+):
+    """Update search session with results"""
+    
+    values = {
+        "successful_searches": successful,
+        "failed_searches": failed,
+        "completed_at": datetime.utcnow()
+    }
+    if total_addresses is not None:
+        values["total_addresses"] = total_addresses
+    
+    # The session's inquiries are stored before it is marked complete
+    await get_inquiry_writer().flush_session(session_id)
+    
+    # Single UPDATE instead of loading the session first
+    await db.execute(
+        update(SearchSession).where(SearchSession.session_id == session_id).values(**values)
+    )
+    await db.commit()
+
+async def process_property_address(
+    address: str,
+    api_client: PropertyAPIClient,
+    db: AsyncSession = None,
+    search_type: str = "single",
+    session_id: str = None,
+    user_ip: str = None,
+    user_agent: str = None,
+    use_cache: bool = True,
+    row_number: int = None
+) -> LookupResult:
+    """Process a single property address and return results"""
+    
+    with LOOKUPS_IN_FLIGHT.track(search_type=search_type):
+        return await _process_property_address(
+            address, api_client, db, search_type, session_id, user_ip, user_agent, use_cache, row_number
+        )
+
+async def _process_property_address(
+    address: str,
+    api_client: PropertyAPIClient,
+    db: AsyncSession,
+    search_type: str,
+    session_id: str,
+    user_ip: str,
+    user_agent: str,
+    use_cache: bool,
+    row_number: int
+) -> LookupResult:
+    # Concurrent lookups of the same property, from single searches and bulk jobs
+    # alike, share one upstream lookup; each caller still logs its own inquiry
+    led = False
+    
+    async def lookup() -> LookupResult:
+        nonlocal led
+        led = True
+        return await _lookup_address(address, api_client, search_type, use_cache)
+    
+    result = await get_lookup_flights().run((address_key(address), use_cache), lookup)
+    if not led:
+        LOOKUP_OUTCOMES.inc(outcome="coalesced")
+        result = result.for_address(address, api_client.generate_links(address))
+    
+    # Log to database if db session provided; the write is batched in the background
+    if db and session_id:
+        with stage("log"):
+            await get_inquiry_writer().add(inquiry_row(
+                address=address,
+                result=result,
+                search_type=search_type,
+                session_id=session_id,
+                user_ip=user_ip or "unknown",
+                user_agent=user_agent or "unknown",
+                row_number=row_number
+            ))
+    
+    return result
+
+async def _lookup_address(
+    address: str,
+    api_client: PropertyAPIClient,
+    search_type: str,
+    use_cache: bool
+) -> LookupResult:
+    # Single searches jump ahead of bulk jobs in the rate limiter queue
+    priority = PRIORITY_SINGLE if search_type == "single" else PRIORITY_BULK
+    
+    # Generate links
+    links = api_client.generate_links(address)
+    
+    # Initialize result
+    result = LookupResult(
+        address=address,
+        zillow_link=links["zillow_link"],
+        realtor_link=links["realtor_link"]
+    )
+    
+    # Serve repeat addresses from the cache before spending API quota
+    cache = get_address_cache() if use_cache else None
+    with stage("cache"):
+        cached = await cache.get(address) if cache else None
+    
+    if cached:
+        result.update(cached)
+        LOOKUP_OUTCOMES.inc(outcome="cache_hit")
+        return result
+    
+    # Upstream failures must not be cached as "Not Found"
+    cacheable = True
+    
+    try:
+        # Zillow is preferred; Realty Base is the fallback (or a hedge when Zillow is slow)
+        with stage("providers"):
+            outcome = await get_provider_orchestrator().lookup(
+                api_client, address, priority, mode_for_search(search_type)
+            )
+        
+        if outcome.fields:
+            result.update(outcome.fields)
+            result.api_source = outcome.source
+            LOOKUP_OUTCOMES.inc(outcome="zillow_hit" if outcome.source == "zillow" else f"{outcome.source}_fallback")
+        else:
+            result.status = "Not Found"
+            result.error = "No data found in either API"
+            cacheable = outcome.complete
+            LOOKUP_OUTCOMES.inc(outcome="not_found")
+    
+    except Exception as e:
+        result.error = str(e)
+        result.status = "Error"
+        cacheable = False
+        LOOKUP_OUTCOMES.inc(outcome="error")
+    
+    if cache and cacheable:
+        with stage("cache_write"):
+            await cache.set(address, result.status, result.as_dict())
+    
+    return result
+
+async def process_csv_file(
+    file_path: str,
+    start_row: int = 0,
+    max_in_flight: int = None,
+    refresh: bool = False,
+    refresh_before: datetime = None
+) -> AsyncIterator[LookupResult]:
+    """Stream property results for an uploaded CSV/Excel file in file order
+    
+    Addresses are read lazily and results are yielded as soon as they are ready.
+    Rows before start_row are skipped without being looked up.
+    
+    Rows with the same normalized address are looked up once and the result is
+    copied to each of them with that row's own address and links.
+    
+    Peak memory is one CSV chunk (CSV_CHUNK_SIZE rows of the address column),
+    max_in_flight pending results, and up to DEDUPE_MAX_ENTRIES completed
+    results kept for deduplication, plus one REFRESH_BATCH_SIZE batch of prior
+    results with refresh. These caps do not grow with file size.
+    
+    With refresh, each address's last result is loaded in batches; results
+    checked within REFRESH_MAX_AGE are reused without an API call, and the
+    rest are looked up again (bypassing the address cache) with the old
+    status kept as previous_status. Pass the session's start as refresh_before
+    so rows this upload already logged are never taken as the previous run.
+    """
+    
+    api_client = PropertyAPIClient()
+    dedupe = Deduplicator()
+    
+    async def lookup(address: str) -> LookupResult:
+        result = await dedupe.run(address_key(address), lambda: process_property_address(
+            address=address,
+            api_client=api_client,
+            search_type="bulk",
+            use_cache=not refresh
+        ))
+        if result.address == address:
+            return result
+        return result.for_address(address, api_client.generate_links(address))
+    
+    async def refresh_lookup(item) -> LookupResult:
+        address, prior = item
+        if prior is None:
+            return await lookup(address)
+        
+        if is_fresh(prior.checked_at):
+            LOOKUP_OUTCOMES.inc(outcome="refresh_reused")
+            return LookupResult(
+                address=address,
+                status=prior.status,
+                property_type=prior.property_type,
+                bedrooms=prior.bedrooms,
+                bathrooms=prior.bathrooms,
+                square_feet=prior.square_feet,
+                api_source=prior.api_source,
+                previous_status=prior.status,
+                checked_at=prior.checked_at,
+                **api_client.generate_links(address)
+            )
+        
+        return replace(await lookup(address), previous_status=prior.status)
+    
+    addresses = islice(iter_addresses(file_path), start_row, None)
+    if refresh:
+        results = bounded_map(refresh_lookup, with_prior_results(addresses, refresh_before), max_in_flight)
+    else:
+        results = bounded_map(lookup, addresses, max_in_flight)
+    async for result in results:
+        yield result
+
+async def process_address_batch(
+    items: AsyncIterable[Tuple[int, Optional[Union[str, int]], Optional[str]]],
+    db: AsyncSession,
+    session_id: str,
+    user_ip: str,
+    user_agent: str,
+    use_cache: bool = True,
+    max_in_flight: int = None
+) -> AsyncIterator[Tuple[int, Optional[Union[str, int]], LookupResult]]:
+    """Look up (index, id, address) items concurrently, yielding results as they complete
+    
+    Each address is logged under session_id with its index as row_number. An
+    item without a usable address gets an error result and no lookup.
+    """
+    
+    api_client = PropertyAPIClient()
+    
+    async def lookup(item) -> Tuple[int, Optional[Union[str, int]], LookupResult]:
+        index, item_id, address = item
+        if not address or not address.strip():
+            return index, item_id, LookupResult(address=address or "", status="Error", error="Invalid or missing address")
+        result = await process_property_address(
+            address=address,
+            api_client=api_client,
+            db=db,
+            search_type="batch",
+            session_id=session_id,
+            user_ip=user_ip,
+            user_agent=user_agent,
+            use_cache=use_cache,
+            row_number=index
+        )
+        return index, item_id, result
+    
+    results = bounded_map_unordered(lookup, items, max_in_flight)
+    try:
+        async for entry in results:
+            yield entry
+    finally:
+        # Closed right away when the consumer stops, so lookups still in flight are cancelled
+        await results.aclose()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Per-row CPU and allocations of decoding upstream payloads: full json vs orjson vs projected
+
+Decodes the recorded payloads in benchmarks/payloads/ and reads the match
+from them the way providers.parse_* do. The recorded Zillow result is
+repeated --results times to mimic a city-level or ambiguous search, and the
+Realty Base record --listing-size times, like the mock server's city listings.
+
+Usage (from property_tracker/):
+    python benchmarks/bench_decoding.py [--rows 2000] [--results 200] [--listing-size 500]
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.decoding import decode_realty_base, decode_zillow, orjson
+from app.providers import parse_realty_base, parse_zillow
+
+PAYLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "payloads")
+
+def load_payload(name: str) -> dict:
+    with open(os.path.join(PAYLOAD_DIR, name)) as f:
+        return json.load(f)
+
+def zillow_body(results: int) -> bytes:
+    payload = load_payload("zillow_search.json")
+    template = payload["results"][0]
+    payload["results"] = [{**template, "zpid": template["zpid"] + i} for i in range(results)]
+    payload["totalResultCount"] = results
+    return json.dumps(payload).encode()
+
+def realty_body(listing_size: int) -> bytes:
+    payload = load_payload("realty_base_search_buy.json")
+    template = payload["data"][0]
+    records = []
+    for number in range(1, listing_size + 1):
+        record = copy.deepcopy(template)
+        record["property_id"] = str(number)
+        record["location"]["address"]["line"] = f"{number} Main St"
+        records.append(record)
+    payload["data"] = records
+    return json.dumps(payload).encode()
+
+def measure(decode, parse, body: bytes, rows: int):
+    """CPU seconds per row, plus peak and retained bytes of one decoded body"""
+    started = time.process_time()
+    for _ in range(rows):
+        parse(decode(body))
+    cpu = (time.process_time() - started) / rows
+
+    tracemalloc.start()
+    data = decode(body)
+    parse(data)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return cpu, peak, retained
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark upstream payload decoding")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--results", type=int, default=200, help="Zillow results per response")
+    parser.add_argument("--listing-size", type=int, default=500, help="Realty Base records per city listing")
+    args = parser.parse_args()
+
+    decoders = [("json (before)", json.loads)]
+    if orjson is not None:
+        decoders.append(("orjson", orjson.loads))
+
+    cases = [
+        ("zillow", zillow_body(args.results), parse_zillow, decode_zillow),
+        ("realty_base", realty_body(args.listing_size), parse_realty_base, decode_realty_base),
+    ]
+    for provider, body, parse, projected in cases:
+        print(f"{provider}: {len(body) / 1024:.0f} KB body")
+        for name, decode in decoders + [("projected (after)", projected)]:
+            cpu, peak, retained = measure(decode, parse, body, args.rows)
+            print(
+                f"  {name:<20} {cpu * 1e6:9.1f} us/row  {peak / 1024:8.1f} KB peak  "
+                f"{retained / 1024:8.1f} KB retained"
+            )
+
+if __name__ == "__main__":
+    main()
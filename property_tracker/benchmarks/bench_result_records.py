@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Per-row CPU and memory of bulk results: Pydantic PropertyResult vs the compact LookupResult
+
+Replays the per-row work of the bulk pipeline (build the result, fill it
+from a provider answer, cache dump, fan-out copy, inquiry row) for N rows
+and keeps every result alive, as the dedupe LRU and in-flight window do.
+
+Usage (from property_tracker/):
+    python benchmarks/bench_result_records.py [--rows 50000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import PropertyResult
+from app.records import LookupResult
+
+PROVIDER_FIELDS = {
+    "status": "Sold",
+    "price": "$450,000",
+    "property_type": "SINGLE_FAMILY",
+    "bedrooms": 3,
+    "bathrooms": 2.0,
+    "square_feet": 1850,
+}
+
+def inquiry_row(result) -> dict:
+    # Same columns as app.utils.inquiry_row
+    return {
+        "address": result.address,
+        "status": result.status,
+        "property_type": result.property_type,
+        "bedrooms": result.bedrooms,
+        "bathrooms": result.bathrooms,
+        "square_feet": result.square_feet,
+        "api_source": result.api_source,
+        "success": result.status not in ("Error", "Not Found"),
+        "error_message": result.error,
+    }
+
+def pydantic_row(i: int):
+    address = f"{i} Main St, Austin, TX"
+    links = {"zillow_link": f"https://z/{i}", "realtor_link": f"https://r/{i}"}
+    result = PropertyResult(address=address, **links)
+    for field, value in PROVIDER_FIELDS.items():
+        setattr(result, field, value)
+    result.api_source = "zillow"
+    result.model_dump()
+    copy = result.model_copy(update={"address": address.upper(), **links})
+    inquiry_row(copy)
+    return copy
+
+def compact_row(i: int):
+    address = f"{i} Main St, Austin, TX"
+    links = {"zillow_link": f"https://z/{i}", "realtor_link": f"https://r/{i}"}
+    result = LookupResult(address=address, **links)
+    result.update(PROVIDER_FIELDS)
+    result.api_source = "zillow"
+    result.as_dict()
+    copy = result.for_address(address.upper(), links)
+    inquiry_row(copy)
+    return copy
+
+def measure(build, rows: int):
+    started = time.process_time()
+    kept = [build(i) for i in range(rows)]
+    cpu = time.process_time() - started
+
+    tracemalloc.start()
+    kept = [build(i) for i in range(rows)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return cpu, current
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk result record types")
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    for name, build in (("PropertyResult (before)", pydantic_row), ("LookupResult (after)", compact_row)):
+        cpu, memory = measure(build, args.rows)
+        print(f"{name:<24} {cpu / args.rows * 1e6:8.2f} us/row  {memory / args.rows:8.0f} bytes/row retained")
+
+if __name__ == "__main__":
+    main()
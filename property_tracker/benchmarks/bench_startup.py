@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Measure worker cold start: time to import app.main and time until /health answers
+
+Usage (from property_tracker/):
+    python benchmarks/bench_startup.py [--runs 5] [--port 8765]
+
+DATABASE_URL must be set (it is read from .env too); the database is not
+touched until the first request that needs it.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - started)"
+)
+
+HEAVY_MODULES = ["pandas", "openpyxl", "pyarrow"]
+
+def time_import() -> float:
+    """Seconds to import the application in a fresh interpreter"""
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT)
+    return float(output.decode().strip().splitlines()[-1])
+
+def heavy_modules_loaded() -> list:
+    """Heavy optional modules pulled in just by importing the application"""
+    snippet = f"import sys, app.main; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.check_output([sys.executable, "-c", snippet], cwd=ROOT).decode().strip()
+    return [name for name in output.split(",") if name]
+
+def time_health(port: int, timeout: float = 30.0) -> float:
+    """Seconds from launching uvicorn until /health returns 200"""
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"/health did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark worker startup time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        from dotenv import load_dotenv
+        load_dotenv(os.path.join(ROOT, ".env"))
+
+    imports = [time_import() for _ in range(args.runs)]
+    health = [time_health(args.port) for _ in range(args.runs)]
+
+    print(f"import app.main  median {statistics.median(imports):.3f}s  max {max(imports):.3f}s")
+    print(f"first /health    median {statistics.median(health):.3f}s  max {max(health):.3f}s")
+    print(f"heavy modules loaded at import: {', '.join(heavy_modules_loaded()) or 'none'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark against the local mock RapidAPI server
+
+Starts benchmarks/mock_rapidapi.py and the app (uvicorn) on a scratch
+SQLite database, then drives /search-single and /upload-file with
+synthetic CSV/XLSX files and reports rows/sec, p50/p99 latency and the
+app's peak RSS. No RapidAPI quota is used.
+
+Usage (from property_tracker/):
+    python benchmarks/bench_throughput.py --sizes 100,1000,10000 --formats csv,xlsx
+    python benchmarks/bench_throughput.py --sizes 100000 --formats csv --latency-ms 80
+
+Anything after "--" is passed to the mock server, e.g. "-- --error-rate 0.02 --rps 50".
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Homes per mock Realty Base city listing; synthetic addresses cycle through them
+LISTING_SIZE = 500
+
+def synthetic_address(i: int) -> str:
+    return f"{i % LISTING_SIZE + 1} Main St, City{i // LISTING_SIZE}, TX"
+
+def write_file(directory: str, rows: int, fmt: str) -> str:
+    path = os.path.join(directory, f"addresses_{rows}.{fmt}")
+    if fmt == "csv":
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "address"])
+            writer.writerows([i, synthetic_address(i)] for i in range(rows))
+    else:
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(["id", "address"])
+        for i in range(rows):
+            sheet.append([i, synthetic_address(i)])
+        workbook.save(path)
+    return path
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else 0.0
+
+def peak_rss_mb(pid: int) -> Optional[float]:
+    """High-water resident set size of a process (Linux)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+_BUCKET_RE = re.compile(r'^propertytracker_lookup_stage_seconds_bucket\{stage="providers",le="([^"]+)"\} (\S+)$')
+
+def provider_buckets(metrics_text: str) -> Dict[float, float]:
+    buckets = {}
+    for line in metrics_text.splitlines():
+        match = _BUCKET_RE.match(line)
+        if match:
+            bound = float("inf") if match.group(1) == "+Inf" else float(match.group(1))
+            buckets[bound] = float(match.group(2))
+    return buckets
+
+def histogram_quantile(before: Dict[float, float], after: Dict[float, float], q: float) -> Optional[float]:
+    """Quantile of the observations made between two scrapes, interpolated within buckets"""
+    bounds = sorted(after)
+    counts = [after[b] - before.get(b, 0) for b in bounds]
+    total = counts[-1] if counts else 0
+    if not total:
+        return None
+    rank = q * total
+    lower, previous = 0.0, 0.0
+    for bound, cumulative in zip(bounds, counts):
+        if cumulative >= rank:
+            if bound == float("inf"):
+                return lower
+            return lower + (bound - lower) * (rank - previous) / max(cumulative - previous, 1)
+        lower, previous = bound, cumulative
+    return None
+
+async def wait_for(url: str, timeout: float = 30):
+    started = time.monotonic()
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() - started < timeout:
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+async def bench_single(client: httpx.AsyncClient, requests: int, concurrency: int) -> dict:
+    # Warm up lazy imports and connection pools outside the measurement
+    await client.post("/search-single", data={"address": synthetic_address(9_999_999)})
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/search-single", data={"address": synthetic_address(10_000_000 + i)})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": requests,
+        "seconds": elapsed,
+        "p50": percentile(latencies, 0.5),
+        "p99": percentile(latencies, 0.99),
+    }
+
+async def bench_upload(client: httpx.AsyncClient, path: str, rows: int, poll: float) -> dict:
+    before = provider_buckets((await client.get("/metrics")).text)
+
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        response = await client.post("/upload-file", files={"file": (os.path.basename(path), f)})
+    response.raise_for_status()
+    session_id = response.json()["session_id"]
+
+    while True:
+        status = (await client.get(f"/jobs/{session_id}")).json()
+        if status["status"] in ("completed", "failed"):
+            break
+        await asyncio.sleep(poll)
+    elapsed = time.perf_counter() - started
+
+    if status["status"] != "completed":
+        raise RuntimeError(f"job {session_id} failed: {status.get('error')}")
+
+    after = provider_buckets((await client.get("/metrics")).text)
+    return {
+        "rows": status["processed_rows"],
+        "seconds": elapsed,
+        "p50": histogram_quantile(before, after, 0.5),
+        "p99": histogram_quantile(before, after, 0.99),
+    }
+
+def report(name: str, result: dict, rss: Optional[float]):
+    def ms(value):
+        return f"{value * 1000:8.1f}ms" if value is not None else "       n/a"
+    rss_text = f"{rss:7.1f}MB" if rss is not None else "     n/a"
+    print(
+        f"{name:<20} {result['rows']:>8} rows {result['seconds']:8.2f}s "
+        f"{result['rows'] / result['seconds']:9.1f} rows/s  p50 {ms(result['p50'])}  p99 {ms(result['p99'])}  "
+        f"peak RSS {rss_text}"
+    )
+
+async def run(args, app_pid: int):
+    base_url = f"http://127.0.0.1:{args.app_port}"
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        if args.single:
+            result = await bench_single(client, args.single, args.concurrency)
+            report("search-single", result, peak_rss_mb(app_pid))
+
+        with tempfile.TemporaryDirectory() as directory:
+            for fmt in args.formats:
+                for rows in args.sizes:
+                    path = write_file(directory, rows, fmt)
+                    result = await bench_upload(client, path, rows, args.poll)
+                    report(f"upload {fmt} {rows}", result, peak_rss_mb(app_pid))
+
+    print("upload p50/p99 are per-address provider lookup times from /metrics")
+
+def main():
+    argv = sys.argv[1:]
+    mock_args = argv[argv.index("--") + 1:] if "--" in argv else []
+    argv = argv[:argv.index("--")] if "--" in argv else argv
+
+    parser = argparse.ArgumentParser(description="Offline throughput benchmark")
+    parser.add_argument("--sizes", default="100,1000,10000", help="comma-separated row counts (up to 100000)")
+    parser.add_argument("--formats", default="csv,xlsx", help="comma-separated: csv, xlsx")
+    parser.add_argument("--single", type=int, default=200, help="number of /search-single requests (0 to skip)")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent /search-single requests")
+    parser.add_argument("--app-port", type=int, default=9000)
+    parser.add_argument("--mock-port", type=int, default=9100)
+    parser.add_argument("--latency-ms", default="150", help="mock upstream latency")
+    parser.add_argument("--rate-limit-rps", default="0", help="app-side upstream rate limit (0 = off)")
+    parser.add_argument("--cache", action="store_true", help="keep the address cache enabled")
+    parser.add_argument("--poll", type=float, default=0.5, help="seconds between job status polls")
+    args = parser.parse_args(argv)
+    args.sizes = [int(size) for size in args.sizes.split(",") if size]
+    args.formats = [fmt for fmt in args.formats.split(",") if fmt]
+
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    mock_url = f"http://127.0.0.1:{args.mock_port}"
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "RAPIDAPI_KEY": "benchmark",
+        "ZILLOW_BASE_URL": f"{mock_url}/zillow",
+        "REALTY_BASE_BASE_URL": f"{mock_url}/realty-base",
+        "ZILLOW_RATE_LIMIT_RPS": args.rate_limit_rps,
+        "REALTY_BASE_RATE_LIMIT_RPS": args.rate_limit_rps,
+        "CACHE_ENABLED": "true" if args.cache else "false",
+    }
+
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    mock = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "benchmarks", "mock_rapidapi.py"), "--port", str(args.mock_port),
+         "--latency-ms", args.latency_ms, "--listing-size", str(LISTING_SIZE), *mock_args],
+        cwd=ROOT
+    )
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.app_port), "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    try:
+        asyncio.run(wait_for(f"{mock_url}/docs"))
+        asyncio.run(wait_for(f"http://127.0.0.1:{args.app_port}/health"))
+        asyncio.run(run(args, app.pid))
+    finally:
+        app.terminate()
+        mock.terminate()
+        app.wait()
+        mock.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the zillow56 and realty-base-us RapidAPI endpoints
+
+Replays the recorded payloads in benchmarks/payloads/ with configurable
+latency, error rate, empty-result rate and 429 behaviour, so throughput
+can be measured without spending API quota.
+
+Usage (from property_tracker/):
+    python benchmarks/mock_rapidapi.py --port 9100 --latency-ms 150 --jitter-ms 50
+
+Point the app at it with:
+    ZILLOW_BASE_URL=http://127.0.0.1:9100/zillow
+    REALTY_BASE_BASE_URL=http://127.0.0.1:9100/realty-base
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import random
+import time
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+PAYLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "payloads")
+
+def load_payload(name: str) -> dict:
+    with open(os.path.join(PAYLOAD_DIR, name)) as f:
+        return json.load(f)
+
+class Behaviour:
+    """Latency and failure settings shared by both mock providers"""
+
+    def __init__(self, latency_ms: float, jitter_ms: float, error_rate: float, miss_rate: float, rps: float):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.miss_rate = miss_rate
+        self.rps = rps
+        self._window_started = time.monotonic()
+        self._window_count = 0
+
+    def over_limit(self) -> bool:
+        # Fixed one-second window, like RapidAPI's per-second plan limits
+        if self.rps <= 0:
+            return False
+        now = time.monotonic()
+        if now - self._window_started >= 1:
+            self._window_started, self._window_count = now, 0
+        self._window_count += 1
+        return self._window_count > self.rps
+
+    async def respond(self, build_body):
+        if self.over_limit():
+            return JSONResponse({"message": "Too many requests"}, status_code=429, headers={"Retry-After": "1"})
+
+        await asyncio.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+
+        if random.random() < self.error_rate:
+            return JSONResponse({"message": "Internal error"}, status_code=random.choice([500, 502, 503]))
+        return JSONResponse(build_body(random.random() < self.miss_rate))
+
+def create_app(behaviour: Behaviour, listing_size: int) -> FastAPI:
+    app = FastAPI(title="Mock RapidAPI")
+    zillow = load_payload("zillow_search.json")
+    realty = load_payload("realty_base_search_buy.json")
+
+    @app.get("/zillow/search")
+    async def zillow_search(location: str = ""):
+        def build(miss: bool):
+            if miss:
+                return {**zillow, "results": [], "totalResultCount": 0}
+            body = copy.deepcopy(zillow)
+            body["results"][0]["streetAddress"] = location.split(",")[0].strip()
+            return body
+        return await behaviour.respond(build)
+
+    @app.get("/realty-base/search-buy")
+    async def realty_search(city: str = "", state: str = ""):
+        def build(miss: bool):
+            if miss:
+                return {**realty, "data": []}
+            # A city listing of "<n> Main St" homes, matching the synthetic benchmark files
+            template = realty["data"][0]
+            records = []
+            for number in range(1, listing_size + 1):
+                record = copy.deepcopy(template)
+                record["property_id"] = str(number)
+                record["location"]["address"].update(line=f"{number} Main St", city=city, state_code=state)
+                records.append(record)
+            return {**realty, "data": records}
+        return await behaviour.respond(build)
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock zillow56 / realty-base-us RapidAPI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=150, help="mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=50, help="latency standard deviation")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 5xx responses")
+    parser.add_argument("--miss-rate", type=float, default=0.1, help="fraction of empty results")
+    parser.add_argument("--rps", type=float, default=0, help="answer 429 above this many requests/sec (0 = never)")
+    parser.add_argument("--listing-size", type=int, default=500, help="homes per Realty Base city listing")
+    args = parser.parse_args()
+
+    behaviour = Behaviour(args.latency_ms, args.jitter_ms, args.error_rate, args.miss_rate, args.rps)
+    uvicorn.run(create_app(behaviour, args.listing_size), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Baseline schema: property_inquiries and search_sessions
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by Base.metadata.create_all already have these tables
+    existing = sa.inspect(op.get_bind()).get_table_names()
+
+    if "property_inquiries" not in existing:
+        op.create_table(
+            "property_inquiries",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("address", sa.String()),
+            sa.Column("search_type", sa.String()),
+            sa.Column("status", sa.String()),
+            sa.Column("property_type", sa.String()),
+            sa.Column("bedrooms", sa.Integer()),
+            sa.Column("bathrooms", sa.Float()),
+            sa.Column("square_feet", sa.Integer()),
+            sa.Column("zillow_link", sa.Text()),
+            sa.Column("realtor_link", sa.Text()),
+            sa.Column("api_source", sa.String()),
+            sa.Column("success", sa.Boolean()),
+            sa.Column("error_message", sa.Text()),
+            sa.Column("user_ip", sa.String()),
+            sa.Column("user_agent", sa.Text()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_property_inquiries_id", "property_inquiries", ["id"])
+        op.create_index("ix_property_inquiries_address", "property_inquiries", ["address"])
+
+    if "search_sessions" not in existing:
+        op.create_table(
+            "search_sessions",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("session_id", sa.String()),
+            sa.Column("search_type", sa.String()),
+            sa.Column("total_addresses", sa.Integer()),
+            sa.Column("successful_searches", sa.Integer()),
+            sa.Column("failed_searches", sa.Integer()),
+            sa.Column("user_ip", sa.String()),
+            sa.Column("user_agent", sa.Text()),
+            sa.Column("filename", sa.String()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("completed_at", sa.DateTime(timezone=True)),
+        )
+        op.create_index("ix_search_sessions_id", "search_sessions", ["id"])
+        op.create_index("ix_search_sessions_session_id", "search_sessions", ["session_id"], unique=True)
+
+
+def downgrade():
+    op.drop_table("search_sessions")
+    op.drop_table("property_inquiries")
@@ -0,0 +1,37 @@
+"""Persistent tier of the address lookup cache
+
+Revision ID: 0002_address_result_cache
+Revises: 0001_baseline
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_address_result_cache'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by Base.metadata.create_all already have the table
+    if "address_result_cache" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "address_result_cache",
+        sa.Column("cache_key", sa.String(), primary_key=True),
+        sa.Column("status", sa.String()),
+        sa.Column("result", sa.Text()),
+        sa.Column("expires_at", sa.Float()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_address_result_cache_expires_at", "address_result_cache", ["expires_at"])
+    op.create_index("ix_address_result_cache_updated_at", "address_result_cache", ["updated_at"])
+
+
+def downgrade():
+    op.drop_table("address_result_cache")
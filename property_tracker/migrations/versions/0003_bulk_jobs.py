@@ -0,0 +1,56 @@
+"""Background bulk job columns
+
+Revision ID: 0003_bulk_jobs
+Revises: 0002_address_result_cache
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_bulk_jobs'
+down_revision = '0002_address_result_cache'
+branch_labels = None
+depends_on = None
+
+SESSION_COLUMNS = ["status", "file_path", "processed_rows", "claimed_by", "heartbeat_at", "error_message"]
+
+
+def _add_columns(inspector, table, columns):
+    # Skip columns that create_all already added on fresh databases
+    existing = {c["name"] for c in inspector.get_columns(table)}
+    for column in columns:
+        if column.name not in existing:
+            op.add_column(table, column)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    _add_columns(inspector, "property_inquiries", [
+        sa.Column("session_id", sa.String()),
+        sa.Column("row_number", sa.Integer()),
+    ])
+    if "ix_property_inquiries_session_id" not in {i["name"] for i in inspector.get_indexes("property_inquiries")}:
+        op.create_index("ix_property_inquiries_session_id", "property_inquiries", ["session_id"])
+
+    _add_columns(inspector, "search_sessions", [
+        sa.Column("status", sa.String()),
+        sa.Column("file_path", sa.String()),
+        sa.Column("processed_rows", sa.Integer()),
+        sa.Column("claimed_by", sa.String()),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True)),
+        sa.Column("error_message", sa.Text()),
+    ])
+
+
+def downgrade():
+    with op.batch_alter_table("search_sessions") as batch:
+        for name in reversed(SESSION_COLUMNS):
+            batch.drop_column(name)
+    op.drop_index("ix_property_inquiries_session_id", table_name="property_inquiries")
+    with op.batch_alter_table("property_inquiries") as batch:
+        batch.drop_column("row_number")
+        batch.drop_column("session_id")
@@ -0,0 +1,49 @@
+"""Aggregate tables for /admin/stats
+
+Revision ID: 0004_stats_aggregates
+Revises: 0003_bulk_jobs
+Create Date: 2026-10-17
+
+Fill the new tables with `python -m app.stats rebuild` after upgrading.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_stats_aggregates'
+down_revision = '0003_bulk_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    if "inquiry_counters" not in tables:
+        op.create_table(
+            "inquiry_counters",
+            sa.Column("name", sa.String(), primary_key=True),
+            sa.Column("value", sa.BigInteger(), nullable=False),
+        )
+
+    if "address_search_counts" not in tables:
+        op.create_table(
+            "address_search_counts",
+            sa.Column("address", sa.String(), primary_key=True),
+            sa.Column("count", sa.BigInteger(), nullable=False),
+        )
+        op.create_index("ix_address_search_counts_count", "address_search_counts", ["count"])
+
+    # Recent searches on /admin/stats; replaced by the (created_at, id) index in 0005
+    existing = {i["name"] for i in inspector.get_indexes("property_inquiries")}
+    if "ix_property_inquiries_created_at" not in existing and "ix_property_inquiries_created_at_id" not in existing:
+        op.create_index("ix_property_inquiries_created_at", "property_inquiries", ["created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_property_inquiries_created_at", table_name="property_inquiries")
+    op.drop_table("address_search_counts")
+    op.drop_table("inquiry_counters")
@@ -0,0 +1,49 @@
+"""Composite (filter, created_at, id) indexes for keyset pagination of inquiries
+
+Revision ID: 0005_inquiry_keyset_indexes
+Revises: 0004_stats_aggregates
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_inquiry_keyset_indexes'
+down_revision = '0004_stats_aggregates'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_property_inquiries_created_at_id": ["created_at", "id"],
+    "ix_property_inquiries_session_created": ["session_id", "created_at", "id"],
+    "ix_property_inquiries_success_created": ["success", "created_at", "id"],
+    "ix_property_inquiries_source_created": ["api_source", "created_at", "id"],
+    "ix_property_inquiries_status_created": ["status", "created_at", "id"],
+}
+
+
+def upgrade():
+    bind = op.get_bind()
+    existing = {i["name"] for i in sa.inspect(bind).get_indexes("property_inquiries")}
+    missing = {name: columns for name, columns in INDEXES.items() if name not in existing}
+
+    if bind.dialect.name == "postgresql":
+        # Build without blocking inquiry inserts on the large production table
+        with op.get_context().autocommit_block():
+            for name, columns in missing.items():
+                op.create_index(name, "property_inquiries", columns, postgresql_concurrently=True)
+    else:
+        for name, columns in missing.items():
+            op.create_index(name, "property_inquiries", columns)
+
+    # Superseded by the (created_at, id) index
+    if "ix_property_inquiries_created_at" in existing:
+        op.drop_index("ix_property_inquiries_created_at", table_name="property_inquiries")
+
+
+def downgrade():
+    op.create_index("ix_property_inquiries_created_at", "property_inquiries", ["created_at"])
+    for name in INDEXES:
+        op.drop_index(name, table_name="property_inquiries")
@@ -0,0 +1,42 @@
+"""Normalized address_key column on property_inquiries
+
+Revision ID: 0006_inquiry_address_key
+Revises: 0005_inquiry_keyset_indexes
+Create Date: 2026-10-17
+
+Existing rows keep a NULL key until `python -m app.normalize backfill` is run.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_inquiry_address_key'
+down_revision = '0005_inquiry_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_property_inquiries_address_key"
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if "address_key" not in {c["name"] for c in inspector.get_columns("property_inquiries")}:
+        op.add_column("property_inquiries", sa.Column("address_key", sa.String()))
+
+    if INDEX_NAME in {i["name"] for i in inspector.get_indexes("property_inquiries")}:
+        return
+
+    if bind.dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(INDEX_NAME, "property_inquiries", ["address_key"], postgresql_concurrently=True)
+    else:
+        op.create_index(INDEX_NAME, "property_inquiries", ["address_key"])
+
+
+def downgrade():
+    op.drop_index(INDEX_NAME, table_name="property_inquiries")
+    op.drop_column("property_inquiries", "address_key")
@@ -0,0 +1,58 @@
+"""Columns and index for refresh uploads
+
+Revision ID: 0007_refresh_uploads
+Revises: 0006_inquiry_address_key
+Create Date: 2026-10-17
+
+Adds property_inquiries.previous_status and checked_at, search_sessions.mode,
+and an (address_key, created_at) index that supersedes the address_key index.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_refresh_uploads'
+down_revision = '0006_inquiry_address_key'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_property_inquiries_address_key_created"
+OLD_INDEX_NAME = "ix_property_inquiries_address_key"
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    inquiry_columns = {c["name"] for c in inspector.get_columns("property_inquiries")}
+    if "previous_status" not in inquiry_columns:
+        op.add_column("property_inquiries", sa.Column("previous_status", sa.String()))
+    if "checked_at" not in inquiry_columns:
+        op.add_column("property_inquiries", sa.Column("checked_at", sa.DateTime(timezone=True)))
+
+    if "mode" not in {c["name"] for c in inspector.get_columns("search_sessions")}:
+        op.add_column("search_sessions", sa.Column("mode", sa.String()))
+
+    existing = {i["name"] for i in inspector.get_indexes("property_inquiries")}
+    if INDEX_NAME not in existing:
+        if bind.dialect.name == "postgresql":
+            with op.get_context().autocommit_block():
+                op.create_index(
+                    INDEX_NAME, "property_inquiries", ["address_key", "created_at"], postgresql_concurrently=True
+                )
+        else:
+            op.create_index(INDEX_NAME, "property_inquiries", ["address_key", "created_at"])
+
+    # Superseded by the (address_key, created_at) index
+    if OLD_INDEX_NAME in existing:
+        op.drop_index(OLD_INDEX_NAME, table_name="property_inquiries")
+
+
+def downgrade():
+    op.create_index(OLD_INDEX_NAME, "property_inquiries", ["address_key"])
+    op.drop_index(INDEX_NAME, table_name="property_inquiries")
+    op.drop_column("search_sessions", "mode")
+    op.drop_column("property_inquiries", "checked_at")
+    op.drop_column("property_inquiries", "previous_status")
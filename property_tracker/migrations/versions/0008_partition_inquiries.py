@@ -0,0 +1,125 @@
+"""Monthly partitions for property_inquiries; drop stored links
+
+Revision ID: 0008_partition_inquiries
+Revises: 0007_refresh_uploads
+Create Date: 2026-10-17
+
+Drops zillow_link and realtor_link, which are derived from the address at
+read time. On PostgreSQL the table is rebuilt as a range-partitioned table
+on created_at, one partition per month plus a default partition, with a
+(id, created_at) primary key. The copy holds an exclusive lock on the table,
+so run it in a maintenance window. Later partitions are created by
+python -m app.retention.
+
+"""
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_partition_inquiries'
+down_revision = '0007_refresh_uploads'
+branch_labels = None
+depends_on = None
+
+TABLE = "property_inquiries"
+OLD_TABLE = "property_inquiries_unpartitioned"
+LINK_COLUMNS = ["zillow_link", "realtor_link"]
+
+# Partitions created ahead of the current month
+MONTHS_AHEAD = 3
+
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partition(month):
+    upper = _add_months(month, 1)
+    op.execute(
+        f"CREATE TABLE {TABLE}_{month:%Y_%m} PARTITION OF {TABLE} "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d} 00:00:00+00') TO ('{upper:%Y-%m-%d} 00:00:00+00')"
+    )
+
+
+def _recreate_indexes(indexes):
+    for index in indexes:
+        op.create_index(index["name"], TABLE, index["column_names"])
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    existing = [c["name"] for c in inspector.get_columns(TABLE) if c["name"] in LINK_COLUMNS]
+    if bind.dialect.name != "postgresql":
+        if existing:
+            with op.batch_alter_table(TABLE) as batch:
+                for name in existing:
+                    batch.drop_column(name)
+        return
+
+    for name in existing:
+        op.drop_column(TABLE, name)
+
+    indexes = inspector.get_indexes(TABLE)
+    columns = [c["name"] for c in inspector.get_columns(TABLE) if c["name"] not in LINK_COLUMNS]
+    sequence = bind.execute(sa.text(f"SELECT pg_get_serial_sequence('{TABLE}', 'id')")).scalar()
+    oldest = bind.execute(sa.text(f"SELECT min(created_at) FROM {TABLE}")).scalar()
+
+    # Keep the id sequence when the old table is dropped
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    op.rename_table(TABLE, OLD_TABLE)
+    op.execute(f"ALTER TABLE {OLD_TABLE} RENAME CONSTRAINT {TABLE}_pkey TO {OLD_TABLE}_pkey")
+
+    op.execute(f"CREATE TABLE {TABLE} (LIKE {OLD_TABLE} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)")
+    op.execute(f"ALTER TABLE {TABLE} ALTER COLUMN created_at SET NOT NULL")
+
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    month = min(oldest.astimezone(timezone.utc).date().replace(day=1), current) if oldest else current
+    while month <= _add_months(current, MONTHS_AHEAD):
+        _create_partition(month)
+        month = _add_months(month, 1)
+    op.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+    # Indexes are built once the rows are in, rather than maintained row by row
+    column_list = ", ".join(columns)
+    selected = ", ".join("coalesce(created_at, now())" if name == "created_at" else name for name in columns)
+    op.execute(f"INSERT INTO {TABLE} ({column_list}) SELECT {selected} FROM {OLD_TABLE}")
+    op.drop_table(OLD_TABLE)
+
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {TABLE}.id")
+    op.create_primary_key(f"{TABLE}_pkey", TABLE, ["id", "created_at"])
+    _recreate_indexes(indexes)
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name != "postgresql":
+        for name in LINK_COLUMNS:
+            op.add_column(TABLE, sa.Column(name, sa.Text()))
+        return
+
+    # Back to a plain table; archived months stay archived and links are left empty
+    inspector = sa.inspect(bind)
+    indexes = inspector.get_indexes(TABLE)
+    columns = ", ".join(c["name"] for c in inspector.get_columns(TABLE))
+    sequence = bind.execute(sa.text(f"SELECT pg_get_serial_sequence('{TABLE}', 'id')")).scalar()
+
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    op.rename_table(TABLE, OLD_TABLE)
+    op.execute(f"ALTER TABLE {OLD_TABLE} RENAME CONSTRAINT {TABLE}_pkey TO {OLD_TABLE}_pkey")
+
+    op.execute(f"CREATE TABLE {TABLE} (LIKE {OLD_TABLE} INCLUDING DEFAULTS)")
+    op.execute(f"INSERT INTO {TABLE} ({columns}) SELECT {columns} FROM {OLD_TABLE}")
+    op.drop_table(OLD_TABLE)
+
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {TABLE}.id")
+    op.create_primary_key(f"{TABLE}_pkey", TABLE, ["id"])
+    _recreate_indexes(indexes)
+    for name in LINK_COLUMNS:
+        op.add_column(TABLE, sa.Column(name, sa.Text()))
@@ -0,0 +1,53 @@
+"""Store default timestamps with microseconds on SQLite
+
+Revision ID: 0009_sqlite_timestamp_precision
+Revises: 0008_partition_inquiries
+Create Date: 2026-10-17
+
+SQLite keeps datetimes as text. CURRENT_TIMESTAMP wrote 'YYYY-MM-DD HH:MM:SS'
+while SQLAlchemy binds 'YYYY-MM-DD HH:MM:SS.ffffff', so keyset cursors and
+created_at filters compared wrongly. Pads existing values and switches the
+defaults to the bound format. PostgreSQL stores real timestamps and is left
+unchanged.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_sqlite_timestamp_precision'
+down_revision = '0008_partition_inquiries'
+branch_labels = None
+depends_on = None
+
+# (table, column) for every column defaulting to the current time
+COLUMNS = [
+    ("property_inquiries", "created_at"),
+    ("search_sessions", "created_at"),
+    ("address_result_cache", "updated_at"),
+]
+
+UTC_NOW = "(strftime('%Y-%m-%d %H:%M:%f000', 'now'))"
+
+
+def _set_defaults(default):
+    for table, column in COLUMNS:
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column(column, existing_type=sa.DateTime(timezone=True), server_default=sa.text(default))
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    for table, column in COLUMNS:
+        op.execute(f"UPDATE {table} SET {column} = {column} || '.000000' WHERE length({column}) = 19")
+    _set_defaults(UTC_NOW)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    _set_defaults("CURRENT_TIMESTAMP")
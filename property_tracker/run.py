@@ -1,41 +1,110 @@
-#!/usr/bin/env python3
-"""
-Simple startup script for the Property Status Checker
-"""
-
-import uvicorn
-import os
-from dotenv import load_dotenv
-
-def main():
-    # Load environment variables
-    load_dotenv()
-    
-    # Check if required environment variables are set
-    required_vars = ['RAPIDAPI_KEY', 'DATABASE_URL']
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
-    
-    if missing_vars:
-        print("❌ Missing required environment variables:")
-        for var in missing_vars:
-            print(f"   - {var}")
-        print("\nPlease check your .env file")
-        return
-    
-    print("🚀 Starting Property Status Checker...")
-    print("📱 Web interface will be available at: http://localhost:8000")
-    print("📊 Admin stats available at: http://localhost:8000/admin/stats")
-    print("🔍 Health check available at: http://localhost:8000/health")
-    print("\n" + "="*50)
-    
-    # Start the server
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
-
-if __name__ == "__main__":
+#!/usr/bin/env python3
+"""
+Simple startup script for the Property Status Checker
+
+    python run.py                 # development: one process, reloads on code changes
+    python run.py --production    # one worker per CPU core, no reloader
+
+SERVER_MODE=production selects production mode without the flag. Production
+workers share the SQLite rate limiter (RATE_LIMIT_BACKEND=sqlite) so together
+they stay within the upstream API quota; the in-memory backend is refused with
+more than one worker.
+"""
+
+import argparse
+import importlib.util
+import uvicorn
+import os
+from dotenv import load_dotenv
+
+def cpu_count() -> int:
+    """CPU cores this process may run on (respects container CPU sets)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def fastest(module: str, fallback: str) -> str:
+    """Use an optional C implementation (uvloop, httptools) when it is installed"""
+    return module if importlib.util.find_spec(module) is not None else fallback
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Start the Property Status Checker")
+    parser.add_argument("--production", action="store_true",
+                        default=os.getenv("SERVER_MODE", "development") == "production",
+                        help="multiple workers, no reload (default when SERVER_MODE=production)")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_WORKERS", "0")),
+                        help="worker processes in production mode (default: one per CPU core); "
+                             "workers share one rate limit through RATE_LIMIT_BACKEND=sqlite")
+    parser.add_argument("--shutdown-timeout", type=float, default=float(os.getenv("SHUTDOWN_TIMEOUT", "30")),
+                        help="seconds open requests, then running bulk jobs, get to finish on shutdown")
+    return parser.parse_args()
+
+def main():
+    # Load environment variables
+    load_dotenv()
+    args = parse_args()
+    
+    # Check if required environment variables are set
+    required_vars = ['RAPIDAPI_KEY', 'DATABASE_URL']
+    missing_vars = [var for var in required_vars if not os.getenv(var)]
+    
+    if missing_vars:
+        print("❌ Missing required environment variables:")
+        for var in missing_vars:
+            print(f"   - {var}")
+        print("\nPlease check your .env file")
+        return
+    
+    print("🚀 Starting Property Status Checker...")
+    print(f"📱 Web interface will be available at: http://localhost:{args.port}")
+    print(f"📊 Admin stats available at: http://localhost:{args.port}/admin/stats")
+    print(f"🔍 Health check available at: http://localhost:{args.port}/health")
+    
+    if not args.production:
+        print("\n" + "="*50)
+        uvicorn.run(
+            "app.main:app",
+            host=args.host,
+            port=args.port,
+            reload=True,
+            log_level="info"
+        )
+        return
+    
+    workers = args.workers or cpu_count()
+    loop = fastest("uvloop", "asyncio")
+    http = fastest("httptools", "h11")
+    
+    # Inherited by every worker process: each opens its own pools before taking traffic,
+    # and lets its running bulk jobs finish before exiting
+    os.environ.setdefault("WORKER_WARMUP", "true")
+    os.environ.setdefault("JOB_DRAIN_TIMEOUT", str(args.shutdown_timeout))
+    # The memory backend keeps one bucket per process, which would multiply the
+    # upstream request rate by the number of workers
+    os.environ.setdefault("RATE_LIMIT_BACKEND", "sqlite")
+    if workers > 1 and os.environ["RATE_LIMIT_BACKEND"] == "memory":
+        print("❌ RATE_LIMIT_BACKEND=memory cannot be shared between workers")
+        print("   Use RATE_LIMIT_BACKEND=sqlite or --workers 1")
+        return
+    
+    print(f"⚙️  Production mode: {workers} workers, {loop} event loop, {http} HTTP parser")
+    print("\n" + "="*50)
+    
+    # Workers are separate processes that each import the app; DB_POOL_SIZE,
+    # HTTP_MAX_CONNECTIONS and JOB_WORKERS apply per worker
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        timeout_graceful_shutdown=args.shutdown_timeout,
+        log_level="info"
+    )
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,206 +1,299 @@
-document.addEventListener('DOMContentLoaded', function() {
-    const singleSearchForm = document.getElementById('singleSearchForm');
-    const fileUploadForm = document.getElementById('fileUploadForm');
-    const loading = document.getElementById('loading');
-    const results = document.getElementById('results');
-    const resultsSummary = document.getElementById('resultsSummary');
-    const resultsTable = document.getElementById('resultsTable');
-
-    // Single address search
-    singleSearchForm.addEventListener('submit', async function(e) {
-        e.preventDefault();
-        
-        const address = document.getElementById('singleAddress').value.trim();
-        if (!address) return;
-
-        showLoading();
-        
-        try {
-            const formData = new FormData();
-            formData.append('address', address);
-            
-            const response = await fetch('/search-single', {
-                method: 'POST',
-                body: formData
-            });
-            
-            const result = await response.json();
-            displaySingleResult(result);
-            
-        } catch (error) {
-            console.error('Error:', error);
-            alert('An error occurred while searching. Please try again.');
-        } finally {
-            hideLoading();
-        }
-    });
-
-    // File upload
-    fileUploadForm.addEventListener('submit', async function(e) {
-        e.preventDefault();
-        
-        const fileInput = document.getElementById('fileInput');
-        const file = fileInput.files[0];
-        
-        if (!file) return;
-
-        showLoading();
-        
-        try {
-            const formData = new FormData();
-            formData.append('file', file);
-            
-            const response = await fetch('/upload-file', {
-                method: 'POST',
-                body: formData
-            });
-            
-            const data = await response.json();
-            displayBulkResults(data);
-            
-        } catch (error) {
-            console.error('Error:', error);
-            alert('An error occurred while processing the file. Please try again.');
-        } finally {
-            hideLoading();
-        }
-    });
-
-    function showLoading() {
-        loading.classList.remove('hidden');
-        results.classList.add('hidden');
-    }
-
-    function hideLoading() {
-        loading.classList.add('hidden');
-    }
-
-    function displaySingleResult(result) {
-        const data = {
-            results: [result],
-            total_searched: 1,
-            successful: result.status !== 'Error' && result.status !== 'Not Found' ? 1 : 0,
-            failed: result.status === 'Error' || result.status === 'Not Found' ? 1 : 0
-        };
-        displayBulkResults(data);
-    }
-
-    function displayBulkResults(data) {
-        // Show summary
-        resultsSummary.innerHTML = `
-            <div class="summary">
-                <div class="summary-stats">
-                    <div class="stat-card">
-                        <div class="stat-number">${data.total_searched}</div>
-                        <div class="stat-label">Total Searched</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-number">${data.successful}</div>
-                        <div class="stat-label">Found</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-number">${data.failed}</div>
-                        <div class="stat-label">Not Found/Error</div>
-                    </div>
-                </div>
-            </div>
-        `;
-
-        // Create results table with properly formatted clickable links
-        let tableHTML = `
-            <table>
-                <thead>
-                    <tr>
-                        <th>Address</th>
-                        <th>Status</th>
-                        <th>Type</th>
-                        <th>Beds/Baths</th>
-                        <th>Sq Ft</th>
-                        <th>Zillow</th>
-                        <th>Realtor.com</th>
-                    </tr>
-                </thead>
-                <tbody>
-        `;
-
-        data.results.forEach(property => {
-            const statusClass = getStatusClass(property.status);
-            const bedroomBath = `${property.bedrooms || 'N/A'}/${property.bathrooms || 'N/A'}`;
-            
-            // Ensure links are properly formatted and escaped
-            const zillowLink = property.zillow_link || '#';
-            const realtorLink = property.realtor_link || '#';
-            
-            tableHTML += `
-                <tr>
-                    <td>${escapeHtml(property.address)}</td>
-                    <td class="${statusClass}">${escapeHtml(property.status)}</td>
-                    <td>${escapeHtml(property.property_type || 'N/A')}</td>
-                    <td>${bedroomBath}</td>
-                    <td>${property.square_feet || 'N/A'}</td>
-                    <td><a href="${escapeHtml(zillowLink)}" target="_blank" rel="noopener noreferrer" class="property-link zillow-link">🏠 View on Zillow</a></td>
-                    <td><a href="${escapeHtml(realtorLink)}" target="_blank" rel="noopener noreferrer" class="property-link realtor-link">🏡 View on Realtor.com</a></td>
-                </tr>
-            `;
-
-            if (property.error) {
-                tableHTML += `
-                    <tr>
-                        <td colspan="7" class="error-text">Error: ${escapeHtml(property.error)}</td>
-                    </tr>
-                `;
-            }
-        });
-
-        tableHTML += '</tbody></table>';
-        resultsTable.innerHTML = tableHTML;
-        
-        // Add click event listeners to ensure links work properly
-        addLinkEventListeners();
-        
-        results.classList.remove('hidden');
-    }
-
-    function addLinkEventListeners() {
-        // Add explicit click handlers for property links
-        document.querySelectorAll('.property-link').forEach(link => {
-            link.addEventListener('click', function(e) {
-                e.preventDefault();
-                const url = this.getAttribute('href');
-                if (url && url !== '#') {
-                    // Log the click for analytics
-                    console.log(`Opening: ${url}`);
-                    // Open in new tab
-                    window.open(url, '_blank', 'noopener,noreferrer');
-                }
-            });
-        });
-    }
-
-    function getStatusClass(status) {
-        if (!status) return '';
-        
-        const statusLower = status.toLowerCase();
-        if (statusLower.includes('active') || statusLower.includes('for sale')) {
-            return 'status-active';
-        } else if (statusLower.includes('pending')) {
-            return 'status-pending';
-        } else if (statusLower.includes('sold')) {
-            return 'status-sold';
-        } else if (statusLower.includes('error')) {
-            return 'status-error';
-        }
-        return '';
-    }
-
-    function escapeHtml(text) {
-        const map = {
-            '&': '&amp;',
-            '<': '&lt;',
-            '>': '&gt;',
-            '"': '&quot;',
-            "'": '&#039;'
-        };
-        return String(text).replace(/[&<>"']/g, function(m) { return map[m]; });
-    }
+document.addEventListener('DOMContentLoaded', function() {
+    const singleSearchForm = document.getElementById('singleSearchForm');
+    const fileUploadForm = document.getElementById('fileUploadForm');
+    const loading = document.getElementById('loading');
+    const results = document.getElementById('results');
+    const resultsSummary = document.getElementById('resultsSummary');
+    const resultsTable = document.getElementById('resultsTable');
+    const resultsView = createResultsView();
+
+    // Single address search
+    singleSearchForm.addEventListener('submit', async function(e) {
+        e.preventDefault();
+        
+        const address = document.getElementById('singleAddress').value.trim();
+        if (!address) return;
+
+        showLoading();
+        
+        try {
+            const formData = new FormData();
+            formData.append('address', address);
+            
+            const response = await fetch('/search-single', {
+                method: 'POST',
+                body: formData
+            });
+            
+            const result = await response.json();
+            displaySingleResult(result);
+            
+        } catch (error) {
+            console.error('Error:', error);
+            alert('An error occurred while searching. Please try again.');
+        } finally {
+            hideLoading();
+        }
+    });
+
+    // File upload
+    fileUploadForm.addEventListener('submit', async function(e) {
+        e.preventDefault();
+        
+        const fileInput = document.getElementById('fileInput');
+        const file = fileInput.files[0];
+        
+        if (!file) return;
+
+        showLoading();
+        
+        try {
+            const formData = new FormData();
+            formData.append('file', file);
+            
+            // Refresh re-checks only addresses without a recent result
+            const refreshMode = document.getElementById('refreshMode');
+            if (refreshMode && refreshMode.checked) {
+                formData.append('mode', 'refresh');
+            }
+            
+            const response = await fetch('/upload-file', {
+                method: 'POST',
+                body: formData
+            });
+            
+            const job = await response.json();
+            await followJob(job.session_id);
+            
+        } catch (error) {
+            console.error('Error:', error);
+            alert('An error occurred while processing the file. Please try again.');
+        } finally {
+            hideLoading();
+        }
+    });
+
+    // Follow a background bulk job over server-sent events, rendering each result as it arrives
+    function followJob(sessionId) {
+        resultsView.reset();
+        
+        return new Promise((resolve, reject) => {
+            const source = new EventSource(`/jobs/${sessionId}/stream`);
+            
+            source.addEventListener('result', function(e) {
+                resultsView.add(JSON.parse(e.data));
+            });
+            
+            source.addEventListener('status', function(e) {
+                resultsView.setProgress(JSON.parse(e.data));
+            });
+            
+            source.addEventListener('done', function(e) {
+                const job = JSON.parse(e.data);
+                source.close();
+                resultsView.setProgress(job);
+                if (job.status === 'failed') {
+                    alert(job.error || 'An error occurred while processing the file.');
+                }
+                resolve();
+            });
+            
+            // EventSource reconnects on its own and resumes after the last result received
+            source.onerror = function() {
+                if (source.readyState === EventSource.CLOSED) {
+                    reject(new Error('Result stream closed'));
+                }
+            };
+        });
+    }
+
+    function showLoading() {
+        loading.classList.remove('hidden');
+        results.classList.add('hidden');
+    }
+
+    function hideLoading() {
+        loading.classList.add('hidden');
+    }
+
+    function displaySingleResult(result) {
+        resultsView.reset();
+        resultsView.add(result);
+    }
+
+    // Results table that only keeps the rows in view in the DOM, so large jobs stay responsive
+    function createResultsView() {
+        const ROW_HEIGHT = 45;  // px, must match .results-scroll td height
+        const OVERSCAN = 20;    // rows rendered above and below the viewport
+        
+        let rows = [];
+        let successful = 0;
+        let processed = 0;
+        let renderPending = false;
+        
+        resultsTable.innerHTML = `
+            <div class="results-scroll">
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Address</th>
+                            <th>Status</th>
+                            <th>Type</th>
+                            <th>Beds/Baths</th>
+                            <th>Sq Ft</th>
+                            <th>Zillow</th>
+                            <th>Realtor.com</th>
+                        </tr>
+                    </thead>
+                    <tbody></tbody>
+                </table>
+            </div>
+        `;
+        const scroller = resultsTable.querySelector('.results-scroll');
+        const tbody = resultsTable.querySelector('tbody');
+        scroller.addEventListener('scroll', scheduleRender);
+        
+        // One delegated handler instead of a listener per link
+        resultsTable.addEventListener('click', function(e) {
+            const link = e.target.closest('.property-link');
+            if (!link) return;
+            e.preventDefault();
+            const url = link.getAttribute('href');
+            if (url && url !== '#') {
+                // Log the click for analytics
+                console.log(`Opening: ${url}`);
+                // Open in new tab
+                window.open(url, '_blank', 'noopener,noreferrer');
+            }
+        });
+        
+        function scheduleRender() {
+            if (!renderPending) {
+                renderPending = true;
+                requestAnimationFrame(render);
+            }
+        }
+        
+        function render() {
+            renderPending = false;
+            const failed = rows.length - successful;
+            
+            // Show summary
+            resultsSummary.innerHTML = `
+                <div class="summary">
+                    <div class="summary-stats">
+                        <div class="stat-card">
+                            <div class="stat-number">${Math.max(processed, rows.length)}</div>
+                            <div class="stat-label">Total Searched</div>
+                        </div>
+                        <div class="stat-card">
+                            <div class="stat-number">${successful}</div>
+                            <div class="stat-label">Found</div>
+                        </div>
+                        <div class="stat-card">
+                            <div class="stat-number">${failed}</div>
+                            <div class="stat-label">Not Found/Error</div>
+                        </div>
+                    </div>
+                </div>
+            `;
+            
+            // Only the visible window of rows, with spacers standing in for the rest
+            const first = Math.max(0, Math.floor(scroller.scrollTop / ROW_HEIGHT) - OVERSCAN);
+            const visible = Math.ceil(scroller.clientHeight / ROW_HEIGHT) + 2 * OVERSCAN;
+            const last = Math.min(rows.length, first + visible);
+            
+            let html = spacer(first);
+            for (let i = first; i < last; i++) {
+                html += rowHtml(rows[i]);
+            }
+            html += spacer(rows.length - last);
+            tbody.innerHTML = html;
+            
+            results.classList.remove('hidden');
+        }
+        
+        function spacer(count) {
+            return count > 0 ? `<tr class="spacer" style="height: ${count * ROW_HEIGHT}px"><td colspan="7"></td></tr>` : '';
+        }
+        
+        return {
+            reset() {
+                rows = [];
+                successful = 0;
+                processed = 0;
+                scroller.scrollTop = 0;
+                scheduleRender();
+            },
+            add(property) {
+                rows.push(property);
+                if (isSuccess(property)) successful++;
+                scheduleRender();
+            },
+            setProgress(job) {
+                processed = job.processed_rows;
+                scheduleRender();
+            }
+        };
+    }
+
+    function rowHtml(property) {
+        const statusClass = getStatusClass(property.status);
+        const bedroomBath = `${property.bedrooms || 'N/A'}/${property.bathrooms || 'N/A'}`;
+        
+        // Ensure links are properly formatted and escaped
+        const zillowLink = property.zillow_link || '#';
+        const realtorLink = property.realtor_link || '#';
+        
+        // Status changes since the last refresh and errors share the status cell so every row has the same height
+        const change = property.previous_status && property.previous_status !== property.status
+            ? ` <span class="status-change">(was ${escapeHtml(property.previous_status)})</span>`
+            : '';
+        const error = property.error
+            ? ` <span class="error-text" title="${escapeHtml(property.error)}">Error: ${escapeHtml(property.error)}</span>`
+            : '';
+        
+        return `
+            <tr>
+                <td title="${escapeHtml(property.address)}">${escapeHtml(property.address)}</td>
+                <td class="${statusClass}">${escapeHtml(property.status)}${change}${error}</td>
+                <td>${escapeHtml(property.property_type || 'N/A')}</td>
+                <td>${bedroomBath}</td>
+                <td>${property.square_feet || 'N/A'}</td>
+                <td><a href="${escapeHtml(zillowLink)}" target="_blank" rel="noopener noreferrer" class="property-link zillow-link">🏠 View on Zillow</a></td>
+                <td><a href="${escapeHtml(realtorLink)}" target="_blank" rel="noopener noreferrer" class="property-link realtor-link">🏡 View on Realtor.com</a></td>
+            </tr>
+        `;
+    }
+
+    function isSuccess(property) {
+        return property.status !== 'Error' && property.status !== 'Not Found';
+    }
+
+    function getStatusClass(status) {
+        if (!status) return '';
+        
+        const statusLower = status.toLowerCase();
+        if (statusLower.includes('active') || statusLower.includes('for sale')) {
+            return 'status-active';
+        } else if (statusLower.includes('pending')) {
+            return 'status-pending';
+        } else if (statusLower.includes('sold')) {
+            return 'status-sold';
+        } else if (statusLower.includes('error')) {
+            return 'status-error';
+        }
+        return '';
+    }
+
+    function escapeHtml(text) {
+        const map = {
+            '&': '&amp;',
+            '<': '&lt;',
+            '>': '&gt;',
+            '"': '&quot;',
+            "'": '&#039;'
+        };
+        return String(text).replace(/[&<>"']/g, function(m) { return map[m]; });
+    }
 });
\ No newline at end of file
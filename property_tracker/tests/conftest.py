@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+
+# Settings are read at import time, so the test environment is set before any app module loads
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DIR = tempfile.mkdtemp(prefix="property_tracker_tests_")
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}",
+    "RAPIDAPI_KEY": "test-key",
+    "CACHE_ENABLED": "false",
+    "ZILLOW_RATE_LIMIT_RPS": "0",
+    "REALTY_BASE_RATE_LIMIT_RPS": "0",
+    "RATE_LIMIT_SQLITE_PATH": os.path.join(TEST_DIR, "rate_limits.db"),
+    "UPLOAD_DIR": os.path.join(TEST_DIR, "uploads"),
+    "UPLOAD_PARSE_WORKERS": "0",
+    "ARCHIVE_DIR": os.path.join(TEST_DIR, "archive"),
+    "INQUIRY_FLUSH_INTERVAL": "0.05",
+})
+
+sys.path.insert(0, PROJECT_DIR)
+# app.main mounts ./static relative to the working directory
+os.chdir(PROJECT_DIR)
+
+import pytest
+
+from app.database import Base, dispose_engines, get_engine
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+def database():
+    """Empty tables in the test SQLite database"""
+    engine = get_engine()
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+async def async_database(database):
+    """Empty tables, with the async engine closed on the test's own event loop afterwards"""
+    yield database
+    await dispose_engines()
+
+@pytest.fixture
+async def client(async_database):
+    """HTTP client bound to the app in-process; startup and shutdown hooks are not run"""
+    import httpx
+    from app.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http_client:
+        yield http_client
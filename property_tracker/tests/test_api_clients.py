@@ -0,0 +1,53 @@
+import httpx
+import pytest
+
+from app.api_clients import PropertyAPIClient, generate_links, realty_city_state
+from app.rate_limit import RateLimitScheduler
+
+pytestmark = pytest.mark.anyio
+
+ZILLOW_BODY = {"results": [{"statusText": "For Sale", "formattedPrice": "$1", "bedrooms": 3, "zpid": 1}]}
+
+def client_for(handler) -> PropertyAPIClient:
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return PropertyAPIClient(http_client=http_client, rate_limiter=RateLimitScheduler(limits={}))
+
+async def test_search_zillow_sends_key_and_location():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json=ZILLOW_BODY)
+
+    client = client_for(handler)
+    data = await client.search_zillow("1 Main St, Austin, TX 78701")
+
+    assert data["results"][0]["statusText"] == "For Sale"
+    assert seen[0].headers["X-RapidAPI-Key"] == "test-key"
+    assert seen[0].url.params["location"] == "1 Main St, Austin, TX 78701"
+
+async def test_http_errors_become_error_dicts():
+    client = client_for(lambda request: httpx.Response(503))
+    assert await client.search_zillow("1 Main St, Austin, TX") == {"error": "HTTP 503"}
+
+async def test_transport_failures_become_error_dicts():
+    def handler(request):
+        raise httpx.ConnectError("connection refused")
+
+    client = client_for(handler)
+    assert await client.search_realty_base("1 Main St, Austin, TX") == {"error": "connection refused"}
+
+async def test_latency_is_reported_per_request():
+    latencies = []
+    client = client_for(lambda request: httpx.Response(200, json=ZILLOW_BODY))
+    await client.search_zillow("1 Main St, Austin, TX", on_latency=latencies.append)
+    assert len(latencies) == 1 and latencies[0] >= 0
+
+def test_realty_city_state():
+    assert realty_city_state("1 Main St, Austin, TX 78701") == ("Austin", "TX")
+    assert realty_city_state("Austin") == ("Austin", "")
+
+def test_generate_links_encode_the_address():
+    links = generate_links("1 Main St, Austin, TX")
+    assert links["zillow_link"] == "https://www.zillow.com/homes/1+Main+St%2C+Austin%2C+TX_rb/"
+    assert links["realtor_link"].endswith("1+Main+St%2C+Austin%2C+TX")
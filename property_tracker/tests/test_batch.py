@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import pytest
+
+from app import utils
+from app.records import LookupResult
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def lookups(monkeypatch):
+    async def lookup(address, api_client, **kwargs):
+        await asyncio.sleep(0)
+        return LookupResult(address=address, status="For Sale")
+
+    monkeypatch.setattr(utils, "process_property_address", lookup)
+
+def result_lines(response):
+    assert response.status_code == 200
+    return sorted((json.loads(line) for line in response.text.splitlines()), key=lambda line: line["index"])
+
+async def test_json_ids_are_echoed_unchanged(client, lookups):
+    response = await client.post("/search-batch", json={"addresses": [
+        {"address": "1 Main St, Austin, TX", "id": 7},
+        {"address": "2 Oak Ave, Austin, TX", "id": "row-2"},
+        {"address": "3 Elm Rd, Austin, TX"},
+        "4 Pine St, Austin, TX",
+    ]})
+    lines = result_lines(response)
+    assert [line["id"] for line in lines] == [7, "row-2", None, None]
+    assert [line["status"] for line in lines] == ["For Sale"] * 4
+    assert response.headers["X-Session-Id"]
+
+async def test_ndjson_ids_are_echoed_unchanged(client, lookups):
+    body = "\n".join([
+        json.dumps({"address": "1 Main St, Austin, TX", "id": 7}),
+        json.dumps("2 Oak Ave, Austin, TX"),
+        json.dumps({"id": 9}),
+        "not json",
+    ])
+    response = await client.post("/search-batch", content=body, headers={"Content-Type": "application/x-ndjson"})
+    lines = result_lines(response)
+
+    assert [(line["id"], line["status"]) for line in lines] == [
+        (7, "For Sale"), (None, "For Sale"), (9, "Error"), (None, "Error")
+    ]
+
+async def test_invalid_json_body_is_rejected(client):
+    response = await client.post("/search-batch", json={"addresses": [{"id": 1}]})
+    assert response.status_code == 422
+
+async def test_ndjson_client_disconnect_cancels_remaining_lookups(async_database, monkeypatch):
+    from app.database import SearchSession, SessionLocal
+    from app.main import app
+
+    cancelled = []
+
+    async def lookup(address, api_client, **kwargs):
+        # The first two finish; the rest would run long after the client left
+        delay = {"1": 0, "2": 0.1}.get(address[0], 10)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(address)
+            raise
+        return LookupResult(address=address, status="For Sale")
+
+    monkeypatch.setattr(utils, "process_property_address", lookup)
+    body = "\n".join(json.dumps(f"{n} Main St, Austin, TX") for n in range(1, 5)).encode()
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        # The client goes away once it has sent the body
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+        "path": "/search-batch", "raw_path": b"/search-batch", "query_string": b"max_in_flight=5", "root_path": "",
+        "headers": [(b"host", b"test"), (b"content-type", b"application/x-ndjson")],
+        "client": ("127.0.0.1", 1234), "server": ("test", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), 5)
+
+    assert sorted(cancelled) == ["3 Main St, Austin, TX", "4 Main St, Austin, TX"]
+    lines = [json.loads(line) for m in sent if m["type"] == "http.response.body" for line in m["body"].splitlines()]
+    assert [line["index"] for line in lines] == [0, 1]
+
+    db = SessionLocal()
+    try:
+        session = db.query(SearchSession).filter(SearchSession.search_type == "batch").one()
+        assert (session.successful_searches, session.total_addresses) == (2, 2)
+    finally:
+        db.close()
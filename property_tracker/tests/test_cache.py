@@ -0,0 +1,94 @@
+import json
+import time
+
+import pytest
+
+from app import cache as cache_module
+from app.cache import AddressCache, normalize_cache_key, ttl_for_status
+from app.database import AddressResultCache, SessionLocal
+
+pytestmark = pytest.mark.anyio
+
+RESULT = {"address": "1 Main St, Austin, TX", "status": "Sold", "price": "$1", "bedrooms": 3}
+
+def test_ttl_depends_on_status():
+    assert ttl_for_status("Sold") == 30 * 86400
+    assert ttl_for_status("Pending sale") == 86400
+    assert ttl_for_status("Not Found") == 3600
+    assert ttl_for_status("For Sale") == 12 * 3600
+    assert ttl_for_status("Error") == 0
+
+def test_keys_ignore_formatting():
+    assert normalize_cache_key("1 MAIN STREET,  austin, tx 78701") == normalize_cache_key("1 Main St, Austin, TX")
+
+async def test_memory_hit_drops_derived_fields():
+    cache = AddressCache()
+    await cache.set("1 Main St, Austin, TX", "Sold", RESULT)
+
+    hit = await cache.get("1 main street, austin, tx")
+    assert hit == {"status": "Sold", "price": "$1", "bedrooms": 3}
+    assert cache.counters["memory_hits"] == 1
+
+async def test_errors_are_not_cached():
+    cache = AddressCache()
+    await cache.set("1 Main St, Austin, TX", "Error", {"status": "Error"})
+    assert await cache.get("1 Main St, Austin, TX") is None
+    assert cache.counters["misses"] == 1
+
+async def test_least_recently_used_entry_is_evicted():
+    cache = AddressCache(max_entries=2)
+    await cache.set("1 Main St, Austin, TX", "Sold", RESULT)
+    await cache.set("2 Main St, Austin, TX", "Sold", RESULT)
+    await cache.get("1 Main St, Austin, TX")
+    await cache.set("3 Main St, Austin, TX", "Sold", RESULT)
+
+    assert await cache.get("2 Main St, Austin, TX") is None
+    assert await cache.get("1 Main St, Austin, TX") is not None
+    assert cache.counters["memory_evictions"] == 1
+
+async def test_expired_entries_miss(monkeypatch):
+    monkeypatch.setitem(cache_module.CACHE_TTLS, "sold", 1)
+    cache = AddressCache()
+    await cache.set("1 Main St, Austin, TX", "Sold", RESULT)
+
+    later = time.time() + 2
+    monkeypatch.setattr(cache_module.time, "time", lambda: later)
+    assert await cache.get("1 Main St, Austin, TX") is None
+
+async def test_persistent_tier_survives_a_new_process(database):
+    await AddressCache(session_factory=SessionLocal).set("1 Main St, Austin, TX", "Sold", RESULT)
+
+    fresh = AddressCache(session_factory=SessionLocal)
+    hit = await fresh.get("1 Main St, Austin, TX")
+    # Prices are never written to the database
+    assert hit == {"status": "Sold", "bedrooms": 3}
+    assert fresh.counters["persistent_hits"] == 1
+
+    db = SessionLocal()
+    try:
+        stored = json.loads(db.get(AddressResultCache, normalize_cache_key(RESULT["address"])).result)
+    finally:
+        db.close()
+    assert "price" not in stored
+
+async def test_persistent_eviction_trims_to_size(database, monkeypatch):
+    monkeypatch.setattr(cache_module, "EVICTION_INTERVAL", 3)
+    cache = AddressCache(max_persistent_entries=2, session_factory=SessionLocal)
+    for number in range(3):
+        await cache.set(f"{number} Main St, Austin, TX", "Sold", RESULT)
+
+    db = SessionLocal()
+    try:
+        assert db.query(AddressResultCache).count() == 2
+    finally:
+        db.close()
+    assert cache.counters["persistent_evictions"] == 1
+
+async def test_broken_persistent_tier_is_a_miss():
+    def broken_session():
+        raise RuntimeError("database is down")
+
+    cache = AddressCache(session_factory=broken_session)
+    await cache.set("1 Main St, Austin, TX", "Sold", RESULT)
+    assert await cache.get("2 Main St, Austin, TX") is None
+    assert cache.counters["persistent_errors"] == 2
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from app.city_listings import CityListing, CityListingCache
+
+pytestmark = pytest.mark.anyio
+
+RECORDS = [
+    {"address": "123 Main Street", "price": 1},
+    {"location": {"address": {"line": "9 Oak Ave Apt 1"}}, "price": 2},
+    {"streetAddress": "9 Oak Ave Apt 2", "price": 3},
+    {"address": "40 Elm Rd Unit 5", "price": 4},
+]
+
+class FakeRealtyClient:
+    """Stands in for PropertyAPIClient; each call waits until released"""
+
+    def __init__(self, response=None):
+        self.response = response or {"data": RECORDS}
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def search_realty_base(self, address, priority, **options):
+        self.calls += 1
+        await self.release.wait()
+        return self.response
+
+def test_listing_matches_by_normalized_street():
+    listing = CityListing(RECORDS, expires_at=0)
+    assert listing.match("123 MAIN ST, Austin, TX")["price"] == 1
+    assert listing.match("9 Oak Avenue Apt 2, Austin, TX")["price"] == 3
+    # A unit missing from the listing falls back to the building only when it is unambiguous
+    assert listing.match("40 Elm Road, Austin, TX")["price"] == 4
+    assert listing.match("9 Oak Ave, Austin, TX") is None
+    assert listing.match("1 Nowhere Ln, Austin, TX") is None
+
+def test_listing_without_street_fields_keeps_first_row():
+    assert CityListing([{"price": 5}], expires_at=0).match("1 Main St, Austin, TX") == {"price": 5}
+
+async def test_one_download_per_city():
+    client = FakeRealtyClient()
+    client.release.clear()
+    cache = CityListingCache(ttl=60)
+    searches = asyncio.gather(
+        cache.search(client, "123 Main St, Austin, TX"),
+        cache.search(client, "9 Oak Ave Apt 1, Austin, TX"),
+    )
+    await asyncio.sleep(0)
+    client.release.set()
+    results = await searches
+    missing = await cache.search(client, "5 Pine St, austin, tx 78701")
+
+    assert [result["data"][0]["price"] for result in results] == [1, 2]
+    assert missing == {"data": []}
+    assert client.calls == 1
+    assert cache.stats()["shared_fetches"] == 1
+    assert (cache.counters["matched"], cache.counters["unmatched"]) == (2, 1)
+
+async def test_cached_answers_need_a_downloaded_city():
+    client = FakeRealtyClient()
+    cache = CityListingCache(ttl=60)
+    assert cache.cached("123 Main St, Austin, TX") is None
+
+    await cache.search(client, "123 Main St, Austin, TX")
+    assert cache.cached("9 Oak Ave Apt 2, Austin, TX")["data"][0]["price"] == 3
+    assert cache.cached("123 Main St, Dallas, TX") is None
+    assert client.calls == 1
+
+async def test_errors_are_shared_but_not_cached():
+    client = FakeRealtyClient({"error": "HTTP 503"})
+    cache = CityListingCache(ttl=60)
+    assert await cache.search(client, "1 Main St, Austin, TX") == {"error": "HTTP 503"}
+    assert await cache.search(client, "1 Main St, Austin, TX") == {"error": "HTTP 503"}
+    assert client.calls == 2
+
+async def test_cancelled_caller_does_not_fail_waiters():
+    client = FakeRealtyClient()
+    client.release.clear()
+    cache = CityListingCache(ttl=60)
+
+    first = asyncio.create_task(cache.search(client, "123 Main St, Austin, TX"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(cache.search(client, "123 Main St, Austin, TX"))
+    await asyncio.sleep(0)
+
+    # The caller that started the download goes away, e.g. a losing hedge
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    client.release.set()
+    assert (await second)["data"][0]["price"] == 1
+    assert client.calls == 1
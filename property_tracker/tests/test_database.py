@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app import database
+from app.database import PropertyInquiry, get_async_db, get_pool_stats, to_async_url, warm_up_engines
+
+@pytest.mark.parametrize("url, async_url", [
+    ("postgresql://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+    ("postgres://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+    ("postgresql+psycopg2://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+    ("sqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+    ("mysql+aiomysql://u:p@db/app", "mysql+aiomysql://u:p@db/app"),
+])
+def test_async_url(url, async_url):
+    assert to_async_url(url) == async_url
+
+def test_pool_records_checkout_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=database._timed_pool(QueuePool, "test"),
+        pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    try:
+        with engine.connect():
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+    finally:
+        engine.dispose()
+
+    stats = database.pool_stats["test"]
+    assert (stats["checkouts"], stats["checkout_timeouts"]) == (2, 1)
+    assert stats["max_wait_seconds"] >= 0.05
+
+@pytest.mark.anyio
+async def test_warm_up_opens_both_pools(async_database):
+    await warm_up_engines()
+    stats = get_pool_stats()
+    assert set(stats) == {"sync", "async"}
+    assert all(pool["idle"] >= 1 and pool["checked_out"] == 0 for pool in stats.values())
+
+@pytest.mark.anyio
+async def test_async_session_reads_rows_written_by_the_sync_engine(async_database):
+    with async_database.begin() as connection:
+        connection.execute(PropertyInquiry.__table__.insert().values(address="1 Main St"))
+
+    sessions = get_async_db()
+    db = await sessions.__anext__()
+    try:
+        assert (await db.execute(text("SELECT address FROM property_inquiries"))).scalar() == "1 Main St"
+    finally:
+        await sessions.aclose()
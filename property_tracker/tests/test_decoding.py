@@ -0,0 +1,83 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from app import decoding
+from app.decoding import decode_realty_base, decode_zillow, first_array_item
+from app.providers import parse_realty_base, parse_zillow
+
+PAYLOADS = Path(__file__).resolve().parent.parent / "benchmarks" / "payloads"
+
+def zillow_body(results: list, **extra) -> bytes:
+    """Zillow-shaped body padded past DECODE_SCAN_MIN so the scanner runs"""
+    filler = [{"zpid": n, "note": 'quoted "text" and {brackets} [here]'} for n in range(100)]
+    return json.dumps({"results": results, "padding": filler, **extra}).encode()
+
+RESULT = {"statusText": "Sold", "formattedPrice": "$452,000", "bedrooms": 3, "photos": [{"url": "a"}], "zpid": 1}
+
+def test_first_array_item_returns_the_raw_first_element():
+    body = b'{"meta": {"note": "]}"}, "results": [{"a": "}]"}, {"b": 2}]}'
+    assert json.loads(first_array_item(body, "results")) == {"a": "}]"}
+    assert first_array_item(b'{"results": []}', "results") == b""
+
+@pytest.mark.parametrize("body", [
+    b'{"data": {"results": [{"a": 1}]}}',  # not a top-level key
+    b'{"note": "\\"results\\": [{}]"}',  # inside a string
+    b'{"results": [1, 2]}',  # not an object
+    b'{"meta": {"results": 1}, "results": [{"a": 1}]}',  # first mention is nested
+    b'{"results": [{"a": 1',  # truncated
+])
+def test_first_array_item_gives_up_on_other_layouts(body):
+    assert first_array_item(body, "results") is None
+
+def test_key_beyond_scan_limit_is_not_searched():
+    body = zillow_body([RESULT])
+    assert first_array_item(body, "results", scan_limit=5) is None
+
+@pytest.mark.parametrize("body", [
+    b'{"results": [{"a": "' + b"x" * 200000,
+    b'{"results": [{"a": "' + b'\\"' * 100000,
+    b'{"pad": "' + b'\\' * 200001 + b'", "results": [{"a": 1}]}',
+    b'{"results": [{"a": ' + b'"x", ' * 50000 + b'"',
+])
+def test_pathological_bodies_are_rejected_in_linear_time(body):
+    started = time.perf_counter()
+    first_array_item(body, "results", scan_limit=len(body))
+    assert time.perf_counter() - started < 1
+
+def test_projected_zillow_matches_full_decode(monkeypatch):
+    body = zillow_body([RESULT, {"statusText": "For Sale"}])
+    assert len(body) >= decoding.DECODE_SCAN_MIN
+    decoded = decode_zillow(body)
+    assert decoded == {"results": [{"statusText": "Sold", "formattedPrice": "$452,000", "bedrooms": 3}]}
+
+    monkeypatch.setattr(decoding, "UPSTREAM_DECODING", "full")
+    assert parse_zillow(decode_zillow(body)) == parse_zillow(decoded)
+
+def test_small_and_error_bodies_take_the_full_decode(monkeypatch):
+    monkeypatch.setattr(decoding, "first_array_item", lambda *args: pytest.fail("scanned"))
+    assert decode_zillow(b'{"results": []}') == {"results": []}
+    assert decode_zillow(zillow_body([], error="quota")) == {"results": [], "error": "quota"}
+
+def test_zillow_fallbacks_keep_the_body():
+    assert decode_zillow(zillow_body([])) == {"results": []}
+    assert decode_zillow(b'["not", "an", "object"]') == ["not", "an", "object"]
+
+def test_realty_base_keeps_every_record_projected():
+    body = (PAYLOADS / "realty_base_search_buy.json").read_bytes()
+    decoded = decode_realty_base(body)
+    full = json.loads(body)
+    assert len(decoded["data"]) == len(full["data"])
+    assert set(decoded["data"][0]) <= set(decoding.REALTY_BASE_FIELDS)
+    assert parse_realty_base(decoded) == parse_realty_base(full)
+    assert decode_realty_base(b'{"data": null, "error": "x"}') == {"data": None, "error": "x"}
+
+def test_benchmark_zillow_payload_parses_the_same():
+    body = (PAYLOADS / "zillow_search.json").read_bytes()
+    assert parse_zillow(decode_zillow(body)) == parse_zillow(json.loads(body))
+
+def test_loads_without_orjson(monkeypatch):
+    monkeypatch.setattr(decoding, "orjson", None)
+    assert decoding.loads(b'{"a": [1]}') == {"a": [1]}
@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from app.database import PropertyInquiry, SessionLocal
+from app.export import EXPORT_COLUMNS, export_inquiries, iter_inquiry_batches
+
+def add_rows(rows):
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(PropertyInquiry, rows)
+        db.commit()
+    finally:
+        db.close()
+
+@pytest.fixture
+def inquiries(database):
+    # Inserted out of file order, as concurrent lookups finish
+    add_rows([
+        {"session_id": "s1", "row_number": n, "address": f"{n} Main St", "status": "For Sale",
+         "success": True, "created_at": datetime(2026, 9, 30, 12, 0, n)}
+        for n in (2, 0, 1)
+    ] + [
+        {"session_id": "s2", "row_number": 0, "address": "9 Oak Ave", "status": "Error",
+         "success": False, "created_at": datetime(2026, 10, 1, 0, 0, 0)}
+    ])
+
+def export(fmt: str, **filters) -> bytes:
+    return b"".join(export_inquiries(fmt, **filters))
+
+def test_session_export_is_in_file_order(inquiries):
+    rows = list(csv.DictReader(io.StringIO(export("csv", session_id="s1").decode())))
+    assert [row["row_number"] for row in rows] == ["0", "1", "2"]
+    assert list(rows[0]) == EXPORT_COLUMNS
+    # Links are derived from the address rather than stored
+    assert rows[0]["zillow_link"] == "https://www.zillow.com/homes/0+Main+St_rb/"
+
+def test_date_range_is_half_open(inquiries):
+    lines = export("ndjson", created_from=datetime(2026, 9, 30), created_to=datetime(2026, 10, 1)).splitlines()
+    assert sorted(json.loads(line)["address"] for line in lines) == ["0 Main St", "1 Main St", "2 Main St"]
+
+    lines = export("ndjson", created_from=datetime(2026, 10, 1)).splitlines()
+    assert [json.loads(line)["session_id"] for line in lines] == ["s2"]
+
+def test_rows_are_fetched_in_batches(inquiries):
+    assert [len(batch) for batch in iter_inquiry_batches(session_id="s1", batch_size=2)] == [2, 1]
+
+def test_empty_csv_export_has_a_header(database):
+    assert export("csv", session_id="missing").decode().strip() == ",".join(EXPORT_COLUMNS)
+
+def test_parquet_export(inquiries):
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pq.read_table(io.BytesIO(export("parquet", session_id="s1")))
+    assert table.column_names == EXPORT_COLUMNS
+    assert table.column("row_number").to_pylist() == [0, 1, 2]
+
+@pytest.mark.anyio
+async def test_export_endpoint_streams_attachment(client, inquiries):
+    response = await client.get("/export/inquiries", params={"session_id": "s1", "format": "ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == 'attachment; filename="inquiries-s1.ndjson"'
+    assert len(response.text.splitlines()) == 3
+
+    assert (await client.get("/export/inquiries")).status_code == 400
+    assert (await client.get("/export/inquiries", params={"session_id": "s1", "format": "xml"})).status_code == 400
+    assert (await client.get("/jobs/missing/export")).status_code == 404
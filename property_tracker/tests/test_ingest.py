@@ -0,0 +1,59 @@
+import pytest
+from openpyxl import Workbook
+
+from app import ingest, utils
+from app.ingest import ADDRESS_LINES_SUFFIX, convert_to_address_lines, iter_addresses, pick_address_column
+from app.records import LookupResult
+
+def write_csv(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+def test_pick_address_column_prefers_known_names():
+    assert pick_address_column(["id", "Property Address", "city"]) == "Property Address"
+    assert pick_address_column(["location", "id"]) == "location"
+
+@pytest.mark.parametrize("parser", ["pandas", "csv"])
+def test_csv_reads_only_non_empty_addresses(tmp_path, monkeypatch, parser):
+    monkeypatch.setattr(ingest, "CSV_PARSER", parser)
+    path = write_csv(tmp_path / "upload.csv", 'id,address\n1,"1 Main St, Austin, TX"\n2,\n3,2 Oak Ave\n')
+    assert list(iter_addresses(path)) == ["1 Main St, Austin, TX", "2 Oak Ave"]
+
+def test_csv_is_read_in_chunks(tmp_path):
+    rows = "".join(f"{i} Main St\n" for i in range(25))
+    path = write_csv(tmp_path / "upload.csv", "address\n" + rows)
+    addresses = iter_addresses(path, chunk_size=10)
+    # Nothing is parsed until the first address is asked for
+    assert next(addresses) == "0 Main St"
+    assert len(list(addresses)) == 24
+
+def test_excel_rows_are_streamed(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Address", "Notes"])
+    sheet.append(["1 Main St, Austin, TX", "x"])
+    sheet.append([None, "blank"])
+    sheet.append(["2 Oak Ave, Austin, TX", None])
+    path = str(tmp_path / "upload.xlsx")
+    workbook.save(path)
+
+    assert list(iter_addresses(path, chunk_size=1)) == ["1 Main St, Austin, TX", "2 Oak Ave, Austin, TX"]
+
+def test_conversion_writes_one_address_per_line(tmp_path):
+    path = write_csv(tmp_path / "upload.csv", 'address\n"1 Main St\nAustin, TX"\n2 Oak Ave\n')
+    lines_path = str(tmp_path / f"upload{ADDRESS_LINES_SUFFIX}")
+
+    assert convert_to_address_lines(path, lines_path) == 2
+    assert list(iter_addresses(lines_path)) == ["1 Main St Austin, TX", "2 Oak Ave"]
+
+@pytest.mark.anyio
+async def test_process_csv_file_streams_results_in_file_order(tmp_path, monkeypatch):
+    path = write_csv(tmp_path / "upload.csv", "address\n" + "".join(f"{i} Main St\n" for i in range(12)))
+
+    async def fake_lookup(address, api_client, search_type, use_cache, **kwargs):
+        return LookupResult(address=address, status="For Sale")
+
+    monkeypatch.setattr(utils, "process_property_address", fake_lookup)
+
+    results = [result.address async for result in utils.process_csv_file(path, start_row=2, max_in_flight=3)]
+    assert results == [f"{i} Main St" for i in range(2, 12)]
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.database import PropertyInquiry, SessionLocal
+from app.utils import decode_cursor, encode_cursor
+
+pytestmark = pytest.mark.anyio
+
+def add_inquiries(count: int):
+    """Insert rows stamped by the database default, so many share one second"""
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(PropertyInquiry, [
+            {"address": f"{n} Main St", "search_type": "single", "status": "For Sale", "success": n % 2 == 0}
+            for n in range(count)
+        ])
+        db.commit()
+        return db.query(PropertyInquiry).order_by(PropertyInquiry.id).all()
+    finally:
+        db.close()
+
+async def walk(client, **params):
+    pages, cursor = [], None
+    while True:
+        response = await client.get("/admin/inquiries", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        page = response.json()
+        pages.append([item["id"] for item in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None or len(pages) > 10:
+            return pages
+
+def test_cursor_round_trips():
+    created_at = datetime(2026, 10, 17, 12, 30, 5)
+    cursor = encode_cursor(created_at, 42)
+    assert decode_cursor(cursor) == (created_at, 42)
+    # Whole seconds keep their fractional part, matching the stored format
+    assert decode_cursor(encode_cursor(created_at.replace(microsecond=1500), 7))[0].microsecond == 1500
+
+def test_default_timestamp_has_microseconds(database):
+    add_inquiries(1)
+    with database.connect() as connection:
+        stored = connection.execute(text("SELECT created_at FROM property_inquiries")).scalar()
+    assert len(stored) == len("2026-10-17 12:30:05.000000")
+
+async def test_pages_walk_every_row_once(client):
+    ids = [row.id for row in add_inquiries(25)]
+    pages = await walk(client, limit=10)
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert sum(pages, []) == sorted(ids, reverse=True)
+
+async def test_pages_with_a_filter(client):
+    rows = add_inquiries(25)
+    pages = await walk(client, limit=4, success=True)
+    assert sum(pages, []) == sorted((row.id for row in rows if row.success), reverse=True)
+
+async def test_created_window_includes_the_lower_bound(client):
+    rows = add_inquiries(3)
+    created_at = rows[0].created_at
+    response = await client.get("/admin/inquiries", params={
+        "created_from": created_at.isoformat(),
+        "created_to": (created_at + timedelta(seconds=1)).isoformat(),
+    })
+    assert {item["id"] for item in response.json()["items"]} >= {rows[0].id}
+
+async def test_invalid_cursor_is_rejected(client):
+    response = await client.get("/admin/inquiries", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
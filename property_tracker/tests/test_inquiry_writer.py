@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+
+from app.database import PropertyInquiry, SearchSession, SessionLocal
+from app import inquiry_writer, utils
+from app.inquiry_writer import InquiryBacklogFull, InquiryWriter
+from app.records import LookupResult
+from app.stats import get_counters
+
+pytestmark = pytest.mark.anyio
+
+def row(n: int) -> dict:
+    return {"address": f"{n} Main St", "search_type": "single", "status": "For Sale", "success": True}
+
+def count_inquiries() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(PropertyInquiry).count()
+    finally:
+        db.close()
+
+class CountingSessions:
+    """Session factory that records how many transactions the writer opened"""
+
+    def __init__(self, fail: int = 0):
+        self.opened = 0
+        self.fail = fail
+
+    def __call__(self):
+        self.opened += 1
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("database unavailable")
+        return SessionLocal()
+
+async def test_rows_are_written_in_batches(async_database):
+    sessions = CountingSessions()
+    writer = InquiryWriter(session_factory=sessions, batch_size=10, flush_interval=60)
+    for n in range(25):
+        await writer.add(row(n))
+        # A full batch wakes the background flusher
+        while writer.pending >= 10:
+            await asyncio.sleep(0.01)
+    await writer.close()
+
+    assert count_inquiries() == 25
+    # Two full batches flushed in the background, the remainder on close
+    assert sessions.opened == 3
+
+async def test_partial_batch_is_flushed_on_the_interval(async_database):
+    writer = InquiryWriter(batch_size=100, flush_interval=0.05)
+    await writer.add(row(1))
+    for _ in range(40):
+        if count_inquiries():
+            break
+        await asyncio.sleep(0.05)
+    await writer.stop()
+    assert count_inquiries() == 1
+
+async def test_writes_update_the_stats_aggregates(async_database):
+    writer = InquiryWriter(batch_size=10)
+    await writer.add(row(1))
+    await writer.add({**row(1), "status": "Error", "success": False})
+    await writer.close()
+
+    db = SessionLocal()
+    try:
+        counters = get_counters(db)
+    finally:
+        db.close()
+    assert (counters["total_inquiries"], counters["successful_searches"], counters["failed_searches"]) == (2, 1, 1)
+
+async def test_failed_flush_keeps_rows_for_retry(async_database):
+    writer = InquiryWriter(session_factory=CountingSessions(fail=1), batch_size=10, flush_interval=60)
+    await writer.add(row(1))
+    with pytest.raises(RuntimeError):
+        await writer.flush()
+    assert writer.pending == 1
+
+    await writer.close()
+    assert (writer.pending, count_inquiries()) == (0, 1)
+
+async def test_add_waits_while_the_buffer_is_full(async_database):
+    writer = InquiryWriter(batch_size=2, max_pending=2, flush_interval=60)
+
+    # Hold the flush lock so the background flusher cannot drain the buffer yet
+    async with writer._flush_lock:
+        await writer.add(row(1))
+        await writer.add(row(2))
+        blocked = asyncio.create_task(writer.add(row(3)))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+
+    await asyncio.wait_for(blocked, 5)
+    await writer.close()
+    assert count_inquiries() == 3
+
+async def test_add_fails_after_the_backpressure_timeout(async_database):
+    writer = InquiryWriter(batch_size=2, max_pending=2, flush_interval=60, backpressure_timeout=0.05)
+    async with writer._flush_lock:
+        await writer.add(row(1))
+        await writer.add(row(2))
+        with pytest.raises(InquiryBacklogFull):
+            await writer.add(row(3))
+    await writer.close()
+    assert count_inquiries() == 2
+
+async def test_flush_session_writes_only_when_the_session_has_rows(async_database):
+    writer = InquiryWriter(batch_size=10, flush_interval=60)
+    await writer.add({**row(1), "session_id": "s1"})
+    await writer.flush_session("s2")
+    assert count_inquiries() == 0
+    await writer.flush_session("s1")
+    assert (writer.pending, count_inquiries()) == (0, 1)
+    await writer.stop()
+
+async def test_single_search_is_logged_before_it_returns(client, monkeypatch):
+    async def lookup(address, api_client, search_type, use_cache):
+        return LookupResult(address=address, status="For Sale")
+
+    monkeypatch.setattr(utils, "_lookup_address", lookup)
+    monkeypatch.setattr(inquiry_writer, "INQUIRY_FLUSH_INTERVAL", 60)
+    monkeypatch.setattr(inquiry_writer, "_writer", None)
+    try:
+        response = await client.post("/search-single", data={"address": "1 Main St, Austin, TX"})
+        assert response.status_code == 200
+        assert count_inquiries() == 1
+    finally:
+        await inquiry_writer.close_inquiry_writer()
+
+async def test_full_shared_buffer_fails_searches_with_503(client, monkeypatch):
+    async def add(row, state=None):
+        raise InquiryBacklogFull("5000 inquiry rows waiting to be written")
+
+    writer = InquiryWriter()
+    monkeypatch.setattr(writer, "add", add)
+    monkeypatch.setattr(inquiry_writer, "_writer", writer)
+    monkeypatch.setattr(utils, "_lookup_address", lambda *args: asyncio.sleep(0, LookupResult(address=args[0], status="For Sale")))
+    response = await client.post("/search-single", data={"address": "1 Main St, Austin, TX"})
+    assert response.status_code == 503
+
+async def test_on_flush_commits_with_the_rows(async_database):
+    db = SessionLocal()
+    db.add(SearchSession(session_id="s1", search_type="bulk", processed_rows=0))
+    db.commit()
+    db.close()
+
+    def save_progress(db, processed):
+        if processed == 3:
+            raise RuntimeError("progress update failed")
+        db.query(SearchSession).filter(SearchSession.session_id == "s1").update({"processed_rows": processed})
+
+    writer = InquiryWriter(batch_size=10, flush_interval=60, on_flush=save_progress)
+    await writer.add(row(1), state=1)
+    await writer.add(row(2), state=2)
+    await writer.flush()
+    await writer.add(row(3), state=3)
+    with pytest.raises(RuntimeError):
+        await writer.flush()
+    await writer.stop()
+
+    # The failed progress update rolled back the row it described
+    db = SessionLocal()
+    try:
+        processed = db.query(SearchSession.processed_rows).filter(SearchSession.session_id == "s1").scalar()
+    finally:
+        db.close()
+    assert (processed, count_inquiries()) == (2, 2)
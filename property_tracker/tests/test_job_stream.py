@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from app.database import PropertyInquiry, SearchSession, SessionLocal
+from app.main import _result_event
+from app.records import LookupResult
+from app.utils import inquiry_row
+
+pytestmark = pytest.mark.anyio
+
+RESULTS = [
+    LookupResult("1 Main St, Austin, TX", status="For Sale", price="$450,000", bedrooms=3, api_source="zillow"),
+    LookupResult("2 Oak Ave, Austin, TX", status="Error", error="HTTP 503"),
+]
+
+@pytest.fixture
+def finished_job(async_database):
+    db = SessionLocal()
+    try:
+        db.add(SearchSession(session_id="s1", search_type="bulk", status="completed", processed_rows=2))
+        db.bulk_insert_mappings(PropertyInquiry, [
+            inquiry_row(result.address, result, "bulk", "s1", "127.0.0.1", "test", row_number=n)
+            for n, result in enumerate(RESULTS)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+def parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], fields.get("id"), json.loads(fields["data"])))
+    return events
+
+async def test_replayed_results_match_live_ones(client, finished_job):
+    response = await client.get("/jobs/s1/stream")
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    body = response.text
+    for n, result in enumerate(RESULTS):
+        # The event a subscriber gets while the job runs is byte-for-byte the replayed one
+        assert _result_event(n, result.as_dict()) in body
+
+    events = parse_events(body)
+    assert [(kind, event_id) for kind, event_id, _ in events] == [("result", "0"), ("result", "1"), ("done", None)]
+    assert "price" not in events[0][2]
+    assert events[0][2]["zillow_link"].startswith("https://www.zillow.com/")
+    assert events[-1][2]["status"] == "completed"
+
+async def test_reconnect_resumes_after_last_event_id(client, finished_job):
+    response = await client.get("/jobs/s1/stream", headers={"Last-Event-ID": "0"})
+    events = parse_events(response.text)
+    assert [(kind, event_id) for kind, event_id, _ in events] == [("result", "1"), ("done", None)]
+
+async def test_unknown_job_is_not_found(client):
+    assert (await client.get("/jobs/missing/stream")).status_code == 404
@@ -0,0 +1,210 @@
+import asyncio
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import jobs, utils
+from app.database import PropertyInquiry, SearchSession, SessionLocal
+from app.jobs import JobQueue, claim_job, run_job
+from app.records import LookupResult
+
+pytestmark = pytest.mark.anyio
+
+def add_job(tmp_path, rows: int, **values) -> str:
+    path = tmp_path / "upload.csv"
+    path.write_text("address\n" + "".join(f'"{i} Main St, Austin, TX"\n' for i in range(rows)))
+    session_id = f"job-{rows}-{len(os.listdir(tmp_path))}"
+    db = SessionLocal()
+    try:
+        db.add(SearchSession(
+            session_id=session_id, search_type="bulk", status="queued", file_path=str(path), **values
+        ))
+        db.commit()
+    finally:
+        db.close()
+    return session_id
+
+def load_session(session_id: str) -> SearchSession:
+    db = SessionLocal()
+    try:
+        return db.query(SearchSession).filter(SearchSession.session_id == session_id).one()
+    finally:
+        db.close()
+
+def logged_rows(session_id: str):
+    db = SessionLocal()
+    try:
+        return db.query(PropertyInquiry.row_number, PropertyInquiry.address).filter(
+            PropertyInquiry.session_id == session_id
+        ).order_by(PropertyInquiry.row_number).all()
+    finally:
+        db.close()
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Stub upstream lookups, recording the addresses asked for"""
+    seen = []
+
+    async def lookup(address, api_client, search_type, use_cache, **kwargs):
+        seen.append(address)
+        await asyncio.sleep(0)
+        return LookupResult(address=address, status="Not Found" if address.startswith("1 ") else "For Sale")
+
+    monkeypatch.setattr(utils, "process_property_address", lookup)
+    return seen
+
+def test_claim_is_exclusive(database, tmp_path, monkeypatch):
+    session_id = add_job(tmp_path, 1)
+    db = SessionLocal()
+    try:
+        assert claim_job(db, session_id).claimed_by == jobs.WORKER_ID
+        monkeypatch.setattr(jobs, "WORKER_ID", "other-host:1")
+        assert claim_job(db, session_id) is None
+    finally:
+        db.close()
+
+def test_stale_running_job_can_be_adopted(database, tmp_path, monkeypatch):
+    stale = datetime.utcnow() - timedelta(seconds=jobs.JOB_STALE_AFTER + 60)
+    session_id = add_job(tmp_path, 1, claimed_by="dead-host:1", heartbeat_at=stale)
+    db = SessionLocal()
+    try:
+        db.query(SearchSession).update({"status": "running"})
+        db.commit()
+        assert claim_job(db, session_id) is not None
+    finally:
+        db.close()
+    assert jobs._find_resumable_jobs() == []
+
+async def test_claim_runs_off_the_event_loop(async_database, tmp_path, lookups, monkeypatch):
+    threads = []
+
+    def claim(db, session_id):
+        threads.append(threading.current_thread())
+        return claim_job(db, session_id)
+
+    monkeypatch.setattr(jobs, "claim_job", claim)
+    await run_job(add_job(tmp_path, 1))
+    assert threads and threads[0] is not threading.main_thread()
+
+async def test_job_logs_every_row_and_completes(async_database, tmp_path, lookups):
+    session_id = add_job(tmp_path, 5)
+    await run_job(session_id)
+
+    session = load_session(session_id)
+    assert session.status == "completed"
+    assert (session.processed_rows, session.total_addresses) == (5, 5)
+    assert (session.successful_searches, session.failed_searches) == (4, 1)
+    assert [row.row_number for row in logged_rows(session_id)] == [0, 1, 2, 3, 4]
+    # The spooled upload and its address list are removed once the job is done
+    assert not os.path.exists(session.file_path)
+
+async def test_resumed_job_starts_after_the_checkpoint(async_database, tmp_path, lookups):
+    session_id = add_job(tmp_path, 5, processed_rows=3, successful_searches=3)
+    await run_job(session_id)
+
+    assert lookups == ["3 Main St, Austin, TX", "4 Main St, Austin, TX"]
+    session = load_session(session_id)
+    assert (session.processed_rows, session.successful_searches) == (5, 5)
+
+async def test_cancelled_job_is_requeued_at_its_checkpoint(async_database, tmp_path, monkeypatch):
+    started = asyncio.Event()
+
+    async def slow_lookup(address, api_client, search_type, use_cache, **kwargs):
+        started.set()
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(utils, "process_property_address", slow_lookup)
+    session_id = add_job(tmp_path, 3)
+
+    task = asyncio.create_task(run_job(session_id))
+    await asyncio.wait_for(started.wait(), 5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    session = load_session(session_id)
+    assert (session.status, session.claimed_by, session.processed_rows or 0) == ("queued", None, 0)
+    assert jobs._find_resumable_jobs() == [session_id]
+
+async def test_queue_runs_submitted_jobs(async_database, tmp_path, lookups, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_SWEEP_INTERVAL", 3600)
+    queue = JobQueue(workers=2)
+    await queue.start()
+    try:
+        session_id = add_job(tmp_path, 2)
+        queue.submit(session_id)
+        for _ in range(100):
+            if load_session(session_id).status == "completed":
+                break
+            await asyncio.sleep(0.05)
+    finally:
+        await queue.stop()
+    assert load_session(session_id).status == "completed"
+
+async def test_progress_is_not_saved_once_another_worker_claims_the_job(async_database, tmp_path, lookups):
+    session_id = add_job(tmp_path, 1)
+    db = SessionLocal()
+    try:
+        claim_job(db, session_id)
+        db.query(SearchSession).update({"claimed_by": "other-host:1"})
+        db.commit()
+    finally:
+        db.close()
+
+    save = jobs._save_progress(session_id)
+    db = SessionLocal()
+    try:
+        with pytest.raises(jobs.JobClaimLost):
+            save(db, {"processed_rows": 1})
+    finally:
+        db.rollback()
+        db.close()
+    assert load_session(session_id).processed_rows in (None, 0)
+
+async def test_heartbeat_keeps_a_slow_job_claimed(async_database, tmp_path, monkeypatch):
+    release = asyncio.Event()
+
+    async def slow_prepare(file_path):
+        await release.wait()
+        return file_path + ".lines", 0
+
+    monkeypatch.setattr(jobs, "JOB_HEARTBEAT_INTERVAL", 0.01)
+    monkeypatch.setattr(jobs, "prepare_upload", slow_prepare)
+    session_id = add_job(tmp_path, 1)
+    task = asyncio.create_task(run_job(session_id))
+    await asyncio.sleep(0.1)
+    first = load_session(session_id).heartbeat_at
+    await asyncio.sleep(0.1)
+    assert load_session(session_id).heartbeat_at > first
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+async def test_job_stops_when_another_worker_takes_it_over(async_database, tmp_path, monkeypatch):
+    started = asyncio.Event()
+
+    async def slow_lookup(address, api_client, search_type, use_cache, **kwargs):
+        started.set()
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(jobs, "JOB_HEARTBEAT_INTERVAL", 0.01)
+    monkeypatch.setattr(utils, "process_property_address", slow_lookup)
+    session_id = add_job(tmp_path, 3)
+
+    task = asyncio.create_task(run_job(session_id))
+    await asyncio.wait_for(started.wait(), 5)
+    db = SessionLocal()
+    try:
+        db.query(SearchSession).update({"claimed_by": "other-host:1"})
+        db.commit()
+    finally:
+        db.close()
+
+    # The job ends quietly and leaves the row and the address list to the new owner
+    await asyncio.wait_for(task, 5)
+    session = load_session(session_id)
+    assert (session.status, session.claimed_by) == ("running", "other-host:1")
+    assert os.path.exists(session.file_path)
+    assert logged_rows(session_id) == []
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from app.lookup import Deduplicator, bounded_map
+
+pytestmark = pytest.mark.anyio
+
+class ConcurrencyProbe:
+    """Async function that records how many calls overlap"""
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.running = 0
+        self.peak = 0
+        self.started = []
+        self.cancelled = []
+
+    async def __call__(self, item):
+        self.started.append(item)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delays.get(item, 0.01))
+        except asyncio.CancelledError:
+            self.cancelled.append(item)
+            raise
+        finally:
+            self.running -= 1
+        return item * 10
+
+async def test_bounded_map_keeps_input_order():
+    # Later items finish first, results still come back in input order
+    probe = ConcurrencyProbe({0: 0.05, 1: 0.03, 2: 0.01})
+    results = [result async for result in bounded_map(probe, range(3), max_in_flight=3)]
+    assert results == [0, 10, 20]
+
+async def test_bounded_map_caps_calls_in_flight():
+    probe = ConcurrencyProbe()
+    results = [result async for result in bounded_map(probe, range(20), max_in_flight=4)]
+    assert results == [i * 10 for i in range(20)]
+    assert probe.peak == 4
+
+async def test_bounded_map_runs_calls_concurrently():
+    probe = ConcurrencyProbe({i: 0.05 for i in range(10)})
+    started = asyncio.get_running_loop().time()
+    results = [result async for result in bounded_map(probe, range(10), max_in_flight=10)]
+    assert len(results) == 10
+    # Ten sequential calls would take 0.5s
+    assert asyncio.get_running_loop().time() - started < 0.3
+
+async def test_bounded_map_reads_async_iterables():
+    async def items():
+        for i in range(5):
+            yield i
+
+    results = [result async for result in bounded_map(ConcurrencyProbe(), items(), max_in_flight=2)]
+    assert results == [0, 10, 20, 30, 40]
+
+async def test_bounded_map_cancels_pending_calls_when_consumer_stops():
+    probe = ConcurrencyProbe({0: 0.01, 1: 1, 2: 1})
+    results = bounded_map(probe, range(3), max_in_flight=3)
+    assert await results.__anext__() == 0
+    await results.aclose()
+    await asyncio.sleep(0)
+    assert sorted(probe.cancelled) == [1, 2]
+
+async def test_deduplicator_shares_in_flight_and_recent_results():
+    probe = ConcurrencyProbe({1: 0.05})
+    dedupe = Deduplicator()
+    results = await asyncio.gather(*[dedupe.run("key", lambda: probe(1)) for _ in range(5)])
+    results.append(await dedupe.run("key", lambda: probe(1)))
+
+    assert results == [10] * 6
+    assert (probe.started, dedupe.calls, dedupe.shared) == ([1], 1, 5)
+
+async def test_deduplicator_evicts_least_recently_used():
+    probe = ConcurrencyProbe()
+    dedupe = Deduplicator(max_entries=2)
+    for item in (1, 2, 1, 3, 2):
+        await dedupe.run(item, lambda item=item: probe(item))
+    # 2 was evicted when 3 arrived, 1 was kept because it was used again
+    assert probe.started == [1, 2, 3, 2]
+
+async def test_deduplicator_does_not_keep_failures():
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream error")
+        return "ok"
+
+    dedupe = Deduplicator()
+    results = await asyncio.gather(dedupe.run("key", flaky), dedupe.run("key", flaky), return_exceptions=True)
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert await dedupe.run("key", flaky) == "ok"
@@ -0,0 +1,62 @@
+import pytest
+
+from app import metrics
+from app.metrics import Counter, Gauge, Histogram, render, server_timing_header, stage, start_request_timing
+
+@pytest.fixture
+def registry():
+    """Metrics created by a test are dropped from the global registry afterwards"""
+    before = list(metrics.REGISTRY)
+    yield
+    metrics.REGISTRY[:] = before
+
+def test_counter_renders_one_sample_per_label_set(registry):
+    counter = Counter("test_calls_total", "Calls")
+    counter.inc(provider="zillow")
+    counter.inc(2, provider="zillow")
+    counter.inc(provider='re"alty')
+
+    lines = counter.render()
+    assert lines[:2] == ["# HELP propertytracker_test_calls_total Calls", "# TYPE propertytracker_test_calls_total counter"]
+    assert 'propertytracker_test_calls_total{provider="zillow"} 3' in lines
+    assert 'propertytracker_test_calls_total{provider="re\\"alty"} 1' in lines
+
+def test_gauge_tracks_work_in_flight(registry):
+    gauge = Gauge("test_in_flight", "In flight")
+    with gauge.track():
+        assert gauge.render()[-1] == "propertytracker_test_in_flight 1"
+    assert gauge.render()[-1] == "propertytracker_test_in_flight 0"
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = Histogram("test_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+
+    assert histogram.render()[2:] == [
+        'propertytracker_test_seconds_bucket{le="0.1"} 1',
+        'propertytracker_test_seconds_bucket{le="1"} 3',
+        'propertytracker_test_seconds_bucket{le="+Inf"} 4',
+        "propertytracker_test_seconds_sum 6.05",
+        "propertytracker_test_seconds_count 4",
+    ]
+
+def test_stages_are_collected_for_server_timing():
+    timings = start_request_timing()
+    with stage("cache"):
+        pass
+    with stage("cache"):
+        pass
+    assert list(timings) == ["cache"]
+    assert server_timing_header({"cache": 0.0012}, 0.5) == "cache;dur=1.2, total;dur=500.0"
+
+def test_render_includes_registered_collectors():
+    text = render()
+    assert "# TYPE propertytracker_lookup_outcomes_total counter" in text
+    assert "# TYPE propertytracker_jobs_queued gauge" in text
+
+@pytest.mark.anyio
+async def test_metrics_endpoint_counts_requests(client):
+    await client.get("/health")
+    response = await client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'route="/health"' in response.text
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+from app.database import Base
+
+@pytest.fixture
+def migration_db(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'migrations.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    config = Config(os.path.join(os.path.dirname(os.path.dirname(__file__)), "alembic.ini"))
+    engine = sa.create_engine(url)
+    yield config, engine
+    engine.dispose()
+
+def schema_differences(engine):
+    with engine.connect() as connection:
+        return compare_metadata(MigrationContext.configure(connection), Base.metadata)
+
+def test_revisions_form_one_chain(migration_db):
+    config, _ = migration_db
+    script = ScriptDirectory.from_config(config)
+    assert len(script.get_heads()) == 1
+    revisions = list(script.walk_revisions())
+    # One revision per schema change, numbered in order
+    assert [revision.revision[:4] for revision in reversed(revisions)] == [f"{n:04d}" for n in range(1, len(revisions) + 1)]
+
+def test_upgrade_head_matches_the_models(migration_db):
+    config, engine = migration_db
+    command.upgrade(config, "head")
+    assert schema_differences(engine) == []
+
+def test_every_revision_upgrades_and_downgrades(migration_db):
+    config, engine = migration_db
+    script = ScriptDirectory.from_config(config)
+    for revision in reversed(list(script.walk_revisions())):
+        command.upgrade(config, revision.revision)
+    command.downgrade(config, "base")
+    assert sa.inspect(engine).get_table_names() == ["alembic_version"]
+
+def test_upgrade_adopts_tables_made_by_create_all(migration_db):
+    config, engine = migration_db
+    Base.metadata.create_all(engine)
+    command.upgrade(config, "head")
+    assert schema_differences(engine) == []
+
+def test_sqlite_timestamps_are_padded_to_microseconds(migration_db):
+    config, engine = migration_db
+    command.upgrade(config, "0008_partition_inquiries")
+    with engine.begin() as connection:
+        connection.execute(sa.text("INSERT INTO property_inquiries (address) VALUES ('old')"))
+
+    command.upgrade(config, "head")
+    with engine.begin() as connection:
+        connection.execute(sa.text("INSERT INTO property_inquiries (address) VALUES ('new')"))
+        stored = dict(connection.execute(sa.text("SELECT address, created_at FROM property_inquiries")).all())
+    assert stored["old"].endswith(".000000")
+    assert len(stored["new"]) == len(stored["old"]) == len("2026-10-17 12:30:05.000000")
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import httpx
+import pytest
+
+from app import api_clients
+from app.api_clients import PropertyAPIClient
+from app.city_listings import CityListing
+from app.providers import parse_zillow
+from app.rate_limit import RateLimitScheduler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mock_rapidapi import Behaviour, create_app
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def mock_client(monkeypatch):
+    """API client pointed at the benchmark's mock RapidAPI app, in-process"""
+
+    def connect(miss_rate: float = 0.0, rps: float = 0, listing_size: int = 5) -> PropertyAPIClient:
+        mock = create_app(Behaviour(latency_ms=0, jitter_ms=0, error_rate=0, miss_rate=miss_rate, rps=rps), listing_size)
+        monkeypatch.setattr(api_clients, "ZILLOW_BASE_URL", "http://mock/zillow")
+        monkeypatch.setattr(api_clients, "REALTY_BASE_BASE_URL", "http://mock/realty-base")
+        http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=mock))
+        return PropertyAPIClient(http_client=http_client, rate_limiter=RateLimitScheduler(limits={}))
+
+    return connect
+
+async def test_zillow_payload_parses(mock_client):
+    data = await mock_client().search_zillow("12 Main St, Austin, TX")
+    assert parse_zillow(data)["status"]
+
+async def test_misses_return_empty_results(mock_client):
+    data = await mock_client(miss_rate=1.0).search_zillow("12 Main St, Austin, TX")
+    assert parse_zillow(data) is None
+
+async def test_realty_listing_matches_synthetic_addresses(mock_client):
+    data = await mock_client(listing_size=5).search_realty_base("3 Main St, Austin, TX")
+    listing = CityListing(data["data"], expires_at=0)
+    assert listing.match("3 Main St, Austin, TX") is not None
+    assert listing.match("6 Main St, Austin, TX") is None
+
+async def test_rate_limit_answers_429(mock_client):
+    client = mock_client(rps=1)
+    await client.search_zillow("1 Main St, Austin, TX")
+    assert await client.search_zillow("1 Main St, Austin, TX") == {"error": "HTTP 429"}
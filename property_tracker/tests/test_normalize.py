@@ -0,0 +1,50 @@
+import pytest
+
+from app.database import PropertyInquiry, SessionLocal
+from app.normalize import address_key, backfill_address_keys, extract_zip, normalize_address
+
+@pytest.mark.parametrize("address", [
+    "123 Main Street, Austin, TX 78701",
+    "123 MAIN ST,  austin, tx",
+    "123 main st., Austin, TX 78701-1234, USA",
+    " 123  Main   Street , Austin , TX ",
+])
+def test_spellings_of_one_address_share_a_key(address):
+    assert address_key(address) == "123 main st austin tx"
+
+@pytest.mark.parametrize("address, key", [
+    ("456 North Oak Avenue Apartment 4B, Dallas, TX", "456 n oak ave apt 4b dallas tx"),
+    ("789 Elm Blvd #12, Houston, TX", "789 elm blvd # 12 houston tx"),
+    ("10 Sunset Boulevard Suite 200, Los Angeles, CA", "10 sunset blvd ste 200 los angeles ca"),
+])
+def test_usps_abbreviations(address, key):
+    assert address_key(address) == key
+
+def test_units_and_directions_keep_addresses_apart():
+    assert address_key("1 Main St Apt 1, Austin, TX") != address_key("1 Main St Apt 2, Austin, TX")
+    assert address_key("1 N Main St, Austin, TX") != address_key("1 S Main St, Austin, TX")
+
+def test_zip_code():
+    assert extract_zip("123 Main St, Austin, TX 78701-1234") == "78701"
+    assert extract_zip("123 Main St, Austin, TX") is None
+    # A lone house number is not a ZIP code
+    assert normalize_address("12345") == ("12345", None)
+
+def test_backfill_fills_missing_keys(database):
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(PropertyInquiry, [
+            {"address": "1 Main Street, Austin, TX"},
+            {"address": "2 Oak Ave", "address_key": "already set"},
+            {"address": None},
+        ] + [{"address": f"{n} Elm Road"} for n in range(5)])
+        db.commit()
+
+        assert backfill_address_keys(db, batch_size=2) == 6
+        keys = dict(db.query(PropertyInquiry.address, PropertyInquiry.address_key).all())
+        assert keys["1 Main Street, Austin, TX"] == "1 main st austin tx"
+        assert keys["2 Oak Ave"] == "already set"
+        assert keys["4 Elm Road"] == "4 elm rd"
+        assert backfill_address_keys(db) == 0
+    finally:
+        db.close()
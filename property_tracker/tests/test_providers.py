@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from app.providers import CircuitBreaker, Provider, ProviderOrchestrator, parse_realty_base, parse_zillow
+
+pytestmark = pytest.mark.anyio
+
+def fake_provider(name: str, answer, delay: float = 0.0, calls: list = None) -> Provider:
+    """Provider whose search returns answer after delay; answer may be an exception"""
+
+    async def search(api_client, address, priority, timeout=None, on_latency=None):
+        if calls is not None:
+            calls.append(name)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if calls is not None:
+                calls.append(f"{name} cancelled")
+            raise
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    return Provider(name, search, lambda data: data.get("fields"))
+
+HIT = {"fields": {"status": "For Sale"}}
+MISS = {"results": []}
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert (breaker.state, breaker.allow(), breaker.times_opened) == ("open", False, 1)
+
+def test_breaker_allows_one_trial_after_reset():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.01)
+    breaker.record_failure()
+    breaker.opened_at -= 1
+
+    assert breaker.allow() is True
+    assert breaker.state == "half_open"
+    # Only one trial call at a time
+    assert breaker.allow() is False
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    breaker.opened_at -= 1
+    assert breaker.allow() is True
+    breaker.record_success()
+    assert (breaker.state, breaker.allow()) == ("closed", True)
+
+async def test_sequential_falls_through_misses_and_errors():
+    calls = []
+    orchestrator = ProviderOrchestrator([
+        fake_provider("a", RuntimeError("boom"), calls=calls),
+        fake_provider("b", MISS, calls=calls),
+        fake_provider("c", HIT, calls=calls),
+    ])
+    outcome = await orchestrator.lookup(None, "1 Main St", mode="sequential")
+
+    assert calls == ["a", "b", "c"]
+    assert (outcome.source, outcome.fields) == ("c", HIT["fields"])
+    assert outcome.errors == {"a": "boom"}
+
+async def test_hedge_starts_next_provider_when_first_is_slow():
+    calls = []
+    orchestrator = ProviderOrchestrator([
+        fake_provider("slow", HIT, delay=1, calls=calls),
+        fake_provider("fast", {"fields": {"status": "Sold"}}, calls=calls),
+    ], hedge_delay=0.02)
+    outcome = await orchestrator.lookup(None, "1 Main St", mode="hedged")
+
+    assert outcome.source == "fast"
+    assert orchestrator.hedges == 1
+    await asyncio.sleep(0)
+    # The losing hedge is cancelled and its breaker trial given back
+    assert calls == ["slow", "fast", "slow cancelled"]
+
+async def test_fast_first_provider_is_not_hedged():
+    calls = []
+    orchestrator = ProviderOrchestrator([
+        fake_provider("a", HIT, calls=calls),
+        fake_provider("b", HIT, calls=calls),
+    ], hedge_delay=0.5)
+    outcome = await orchestrator.lookup(None, "1 Main St", mode="hedged")
+    assert (outcome.source, calls, orchestrator.hedges) == ("a", ["a"], 0)
+
+async def test_parallel_prefers_earlier_provider_on_ties():
+    orchestrator = ProviderOrchestrator([fake_provider("a", HIT), fake_provider("b", HIT)])
+    outcome = await orchestrator.lookup(None, "1 Main St", mode="parallel")
+    assert outcome.source == "a"
+
+async def test_open_breaker_skips_provider():
+    first = fake_provider("a", HIT)
+    first.breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    first.breaker.record_failure()
+    orchestrator = ProviderOrchestrator([first, fake_provider("b", MISS)])
+
+    outcome = await orchestrator.lookup(None, "1 Main St")
+    assert (outcome.source, outcome.skipped, outcome.complete) == (None, ["a"], False)
+    assert first.stats()["skipped"] == 1
+
+async def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        await ProviderOrchestrator([]).lookup(None, "1 Main St", mode="fastest")
+
+def test_parsers():
+    assert parse_zillow(MISS) is None
+    assert parse_zillow({"results": [{"statusText": "Sold", "formattedPrice": "$1"}]})["status"] == "Sold"
+    assert parse_realty_base({"data": [{"price": 450000, "beds": 3}]})["price"] == "$450,000"
+
+async def test_cached_answer_bypasses_an_open_breaker():
+    provider = fake_provider("a", RuntimeError("not called"))
+    provider.cached = lambda address: HIT
+    provider.breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    provider.breaker.record_failure()
+
+    outcome = await ProviderOrchestrator([provider]).lookup(None, "1 Main St")
+    assert (outcome.source, outcome.skipped) == ("a", [])
+    assert provider.breaker.state == "open"
+    assert (provider.counters["calls"], provider.counters["cached"]) == (0, 1)
+
+async def test_cached_answers_do_not_reset_the_failure_count():
+    cache = {}
+    provider = fake_provider("a", RuntimeError("boom"))
+    provider.cached = cache.get
+    provider.breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    orchestrator = ProviderOrchestrator([provider])
+
+    await orchestrator.lookup(None, "1 Main St")
+    cache["2 Oak Ave"] = HIT
+    assert (await orchestrator.lookup(None, "2 Oak Ave")).source == "a"
+    await orchestrator.lookup(None, "3 Elm Rd")
+    # Two real failures open the breaker, with the cache hit in between not counted
+    assert provider.breaker.state == "open"
+    assert provider.stats()["latency_p50"] is None
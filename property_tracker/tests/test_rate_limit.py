@@ -0,0 +1,101 @@
+import asyncio
+import os
+import threading
+
+import httpx
+import pytest
+
+from app.api_clients import ZILLOW_HOST, PropertyAPIClient
+from app.rate_limit import (
+    PRIORITY_BULK, PRIORITY_SINGLE, MemoryBucketBackend, RateLimitScheduler, SQLiteBucketBackend
+)
+
+HOST = "example.test"
+
+def test_memory_bucket_allows_burst_then_waits():
+    backend = MemoryBucketBackend()
+    assert backend.take(HOST, rate=10, burst=2) == 0
+    assert backend.take(HOST, rate=10, burst=2) == 0
+    wait = backend.take(HOST, rate=10, burst=2)
+    assert 0 < wait <= 0.1
+
+def test_memory_bucket_penalty_holds_back_requests():
+    backend = MemoryBucketBackend()
+    backend.penalize(HOST, seconds=2, rate=10, burst=5)
+    assert backend.take(HOST, rate=10, burst=5) == pytest.approx(2.1, abs=0.05)
+
+def test_sqlite_buckets_are_shared_between_processes(tmp_path):
+    # Two backends on one file stand in for two uvicorn workers
+    path = os.path.join(tmp_path, "buckets.db")
+    first, second = SQLiteBucketBackend(path), SQLiteBucketBackend(path)
+    assert first.take(HOST, rate=1, burst=2) == 0
+    assert second.take(HOST, rate=1, burst=2) == 0
+    assert first.take(HOST, rate=1, burst=2) > 0
+    assert second.take(HOST, rate=1, burst=2) > 0
+
+def test_sqlite_penalty_is_seen_by_other_processes(tmp_path):
+    path = os.path.join(tmp_path, "buckets.db")
+    first, second = SQLiteBucketBackend(path), SQLiteBucketBackend(path)
+    first.penalize(HOST, seconds=3, rate=1, burst=1)
+    assert second.take(HOST, rate=1, burst=1) == pytest.approx(4, abs=0.1)
+
+def test_sqlite_buckets_use_wal(tmp_path):
+    backend = SQLiteBucketBackend(os.path.join(tmp_path, "buckets.db"))
+    assert backend._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert backend._conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+@pytest.mark.anyio
+async def test_sqlite_backend_runs_off_the_event_loop(tmp_path):
+    backend = SQLiteBucketBackend(os.path.join(tmp_path, "buckets.db"))
+    threads = []
+    take, penalize = backend.take, backend.penalize
+    backend.take = lambda *args: threads.append(threading.current_thread()) or take(*args)
+    backend.penalize = lambda *args: threads.append(threading.current_thread()) or penalize(*args)
+
+    scheduler = RateLimitScheduler(backend, limits={HOST: (10, 1)})
+    await scheduler.acquire(HOST)
+    await scheduler.penalize(HOST, 1)
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+@pytest.mark.anyio
+async def test_scheduler_paces_requests_to_the_rate():
+    scheduler = RateLimitScheduler(limits={HOST: (20, 1)})
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    for _ in range(5):
+        await scheduler.acquire(HOST)
+    # One from the burst, then four more at 20 per second
+    assert loop.time() - started == pytest.approx(0.2, abs=0.08)
+
+@pytest.mark.anyio
+async def test_scheduler_admits_single_searches_before_bulk():
+    scheduler = RateLimitScheduler(limits={HOST: (50, 1)})
+    await scheduler.acquire(HOST)  # use up the burst so everyone below queues
+    order = []
+
+    async def request(name, priority):
+        await scheduler.acquire(HOST, priority)
+        order.append(name)
+
+    bulk = [asyncio.create_task(request(f"bulk{i}", PRIORITY_BULK)) for i in range(3)]
+    await asyncio.sleep(0)
+    single = asyncio.create_task(request("single", PRIORITY_SINGLE))
+    await asyncio.gather(*bulk, single)
+    assert order[0] == "single"
+    assert order[1:] == ["bulk0", "bulk1", "bulk2"]
+
+@pytest.mark.anyio
+async def test_unlimited_hosts_are_not_queued():
+    scheduler = RateLimitScheduler(limits={HOST: (0, 1)})
+    await asyncio.wait_for(asyncio.gather(*(scheduler.acquire(HOST) for _ in range(100))), 0.5)
+
+@pytest.mark.anyio
+async def test_429_penalizes_the_host_for_retry_after():
+    backend = MemoryBucketBackend()
+    scheduler = RateLimitScheduler(backend, limits={ZILLOW_HOST: (10, 1)})
+    transport = httpx.MockTransport(lambda request: httpx.Response(429, headers={"Retry-After": "3"}))
+    client = PropertyAPIClient(http_client=httpx.AsyncClient(transport=transport), rate_limiter=scheduler)
+
+    assert await client.search_zillow("1 Main St, Austin, TX") == {"error": "HTTP 429"}
+    assert backend.take(ZILLOW_HOST, 10, 1) == pytest.approx(3.1, abs=0.05)
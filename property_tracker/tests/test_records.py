@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from app.models import PropertyResult
+from app.records import RESULT_FIELDS, LookupResult
+from app.utils import inquiry_row
+
+def test_result_fields_match_the_api_model():
+    # Internal-only fields never reach API responses
+    assert set(RESULT_FIELDS) == set(PropertyResult.model_fields)
+    assert "checked_at" not in RESULT_FIELDS
+
+def test_success_depends_on_status():
+    assert LookupResult("1 Main St", status="For Sale").success
+    assert not LookupResult("1 Main St").success
+    assert not LookupResult("1 Main St", status="Error").success
+
+def test_update_ignores_unknown_fields():
+    result = LookupResult("1 Main St")
+    result.update({"status": "Sold", "price": "$1", "zpid": 123})
+    assert (result.status, result.price) == ("Sold", "$1")
+    assert not hasattr(result, "zpid")
+
+def test_for_address_copies_the_property_result():
+    result = LookupResult("1 Main St", status="Sold", bedrooms=3)
+    copy = result.for_address("1 MAIN STREET", {"zillow_link": "z", "realtor_link": "r"})
+    assert (copy.address, copy.status, copy.bedrooms, copy.zillow_link) == ("1 MAIN STREET", "Sold", 3, "z")
+    assert result.address == "1 Main St"
+
+def test_to_model():
+    model = LookupResult("1 Main St", status="Sold", price="$1", checked_at=datetime(2026, 1, 1)).to_model()
+    assert isinstance(model, PropertyResult)
+    assert model.model_dump()["price"] == "$1"
+
+def test_inquiry_row_leaves_out_price():
+    checked_at = datetime(2026, 1, 1)
+    row = inquiry_row(
+        address="1 Main St, Austin, TX",
+        result=LookupResult("1 Main St, Austin, TX", status="Error", price="$1", error="HTTP 500", checked_at=checked_at),
+        search_type="single", session_id="s1", user_ip="127.0.0.1", user_agent="test"
+    )
+    assert "price" not in row
+    assert (row["success"], row["error_message"], row["checked_at"]) == (False, "HTTP 500", checked_at)
+    assert row["address_key"] == "1 main st austin tx"
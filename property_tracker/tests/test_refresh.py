@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import utils
+from app.database import PropertyInquiry, SearchSession, SessionLocal
+from app.jobs import run_job
+from app.records import LookupResult
+from app.refresh import is_fresh, load_prior_results, with_prior_results
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime.utcnow()
+
+def add_inquiries(*rows):
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(PropertyInquiry, [{"address_key": "1 main st austin tx", **row} for row in rows])
+        db.commit()
+    finally:
+        db.close()
+
+async def test_latest_non_error_result_per_address(async_database):
+    add_inquiries(
+        {"status": "For Sale", "created_at": NOW - timedelta(days=3)},
+        {"status": "Sold", "created_at": NOW - timedelta(days=2)},
+        {"status": "Error", "created_at": NOW - timedelta(days=1)},
+        {"address_key": "2 oak ave austin tx", "status": "Pending", "created_at": NOW},
+    )
+    priors = await load_prior_results(["1 main st austin tx", "9 elm rd austin tx"])
+    assert list(priors) == ["1 main st austin tx"]
+    assert priors["1 main st austin tx"].status == "Sold"
+
+async def test_priors_exclude_rows_from_after_the_session_started(async_database):
+    add_inquiries(
+        {"status": "For Sale", "created_at": NOW - timedelta(days=1)},
+        {"status": "Sold", "created_at": NOW + timedelta(seconds=1)},
+    )
+    pairs = [pair async for pair in with_prior_results(["1 Main Street, Austin, TX", "2 Oak Ave"], before=NOW)]
+    assert [(address, prior and prior.status) for address, prior in pairs] == [
+        ("1 Main Street, Austin, TX", "For Sale"), ("2 Oak Ave", None)
+    ]
+
+def test_is_fresh():
+    assert is_fresh(datetime.utcnow() - timedelta(minutes=5), max_age=600)
+    assert not is_fresh(datetime.utcnow() - timedelta(minutes=15), max_age=600)
+    assert is_fresh(datetime.now(timezone.utc) - timedelta(minutes=5), max_age=600)
+    assert not is_fresh(None)
+
+async def test_resumed_refresh_job_ignores_its_own_rows(async_database, tmp_path, monkeypatch):
+    async def lookup(address, api_client, search_type, use_cache, **kwargs):
+        await asyncio.sleep(0)
+        return LookupResult(address=address, status="Pending")
+
+    monkeypatch.setattr(utils, "process_property_address", lookup)
+
+    path = tmp_path / "upload.csv"
+    path.write_text('address\n"1 Main St, Austin, TX"\n"1 Main St, Austin, TX"\n')
+    stale = NOW - timedelta(days=30)
+    db = SessionLocal()
+    try:
+        db.add(SearchSession(
+            session_id="s1", search_type="bulk", mode="refresh", status="queued", file_path=str(path),
+            processed_rows=1, created_at=NOW - timedelta(seconds=10)
+        ))
+        db.commit()
+    finally:
+        db.close()
+    # The previous run, and this job's own first row from before it was interrupted
+    add_inquiries(
+        {"status": "For Sale", "created_at": stale, "checked_at": stale},
+        {"status": "Sold", "session_id": "s1", "row_number": 0, "created_at": NOW, "checked_at": stale},
+    )
+
+    await run_job("s1")
+
+    db = SessionLocal()
+    try:
+        row = db.query(PropertyInquiry).filter(PropertyInquiry.session_id == "s1", PropertyInquiry.row_number == 1).one()
+    finally:
+        db.close()
+    assert (row.status, row.previous_status) == ("Pending", "For Sale")
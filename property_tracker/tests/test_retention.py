@@ -0,0 +1,91 @@
+from datetime import date, datetime
+
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from app import retention
+from app.database import PropertyInquiry, SessionLocal
+from app.retention import add_months, archive_month, archived_stats, current_month, run_retention
+from app.stats import get_counters, get_top_addresses, rebuild
+
+@pytest.fixture
+def db(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(retention, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    session = SessionLocal()
+    yield session
+    session.close()
+
+def add_rows(db, *created):
+    db.bulk_insert_mappings(PropertyInquiry, [
+        {"address": f"{n} Main St", "status": "For Sale", "search_type": "bulk", "success": True, "created_at": at}
+        for n, at in enumerate(created)
+    ])
+    db.commit()
+
+def month_start(month: date) -> datetime:
+    return datetime(month.year, month.month, 1)
+
+def remaining(db):
+    return sorted(at for (at,) in db.query(PropertyInquiry.created_at).all())
+
+def test_add_months():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+def test_months_past_the_window_are_archived(db):
+    this_month = month_start(current_month())
+    old_month = add_months(current_month(), -14)
+    old = month_start(old_month)
+    add_rows(db, old, old.replace(day=15), this_month)
+
+    report = run_retention(db, months=12)
+
+    assert [entry["month"] for entry in report["archived"]] == [f"{old_month:%Y-%m}"]
+    assert report["archived"][0]["rows"] == 2
+    assert remaining(db) == [this_month]
+    table = pq.read_table(report["archived"][0]["path"])
+    assert table.num_rows == 2
+    assert "zillow_link" not in table.column_names
+
+def test_month_bounds_are_exact(db):
+    add_rows(db, datetime(2025, 2, 1), datetime(2025, 2, 28, 23, 59, 59, 999999), datetime(2025, 3, 1))
+    archive_month(db, date(2025, 2, 1))
+    assert remaining(db) == [datetime(2025, 3, 1)]
+
+def test_rerun_skips_rows_already_archived(db):
+    add_rows(db, datetime(2025, 2, 3), datetime(2025, 2, 4))
+    first = archive_month(db, date(2025, 2, 1))
+    # A crash after the file was written left the rows in the table; a late row arrived too
+    db.bulk_insert_mappings(PropertyInquiry, [
+        {"id": row_id, "address": "again", "created_at": datetime(2025, 2, 3)}
+        for row_id in pq.read_table(first["path"], columns=["id"])["id"].to_pylist()
+    ])
+    db.commit()
+    add_rows(db, datetime(2025, 2, 20))
+
+    second = archive_month(db, date(2025, 2, 1))
+    assert second["rows"] == 1
+    assert second["path"].endswith("property_inquiries_2025_02.1.parquet")
+    assert remaining(db) == []
+
+def test_archived_rows_still_count_in_stats(db):
+    add_rows(db, datetime(2025, 2, 3), datetime(2025, 2, 4), datetime(2025, 3, 1))
+    archive_month(db, date(2025, 2, 1))
+
+    stats = archived_stats()
+    assert (stats["total_inquiries"], stats["months"][0]["month"]) == (2, "2025-02")
+    rebuild(db)
+    assert get_counters(db)["total_inquiries"] == 3
+    # Archived addresses are counted by reading the files
+    assert sorted(row["address"] for row in get_top_addresses(db)) == ["0 Main St", "1 Main St", "2 Main St"]
+
+def test_cached_summaries_hold_no_addresses(db):
+    add_rows(db, datetime(2025, 2, 3), datetime(2025, 2, 4))
+    add_rows(db, datetime(2025, 2, 5))
+    archive_month(db, date(2025, 2, 1))
+
+    assert "top_searched_addresses" not in archived_stats()
+    assert all("addresses" not in summary for _, summary in retention._summaries.values())
+    # The stats command still counts them, reading the files afresh
+    assert archived_stats(addresses=True)["top_searched_addresses"][0]["count"] == 2
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pytest
+
+import run
+
+@pytest.fixture
+def started(monkeypatch):
+    """Call run.main() with a throwaway environment; returns the uvicorn.run kwargs, or None"""
+    calls = []
+    monkeypatch.setattr(os, "environ", {"RAPIDAPI_KEY": "key", "DATABASE_URL": "sqlite:///test.db"})
+    monkeypatch.setattr(run, "load_dotenv", lambda: None)
+    monkeypatch.setattr(run, "cpu_count", lambda: 4)
+    monkeypatch.setattr(run.uvicorn, "run", lambda app, **kwargs: calls.append(kwargs))
+
+    def start(*argv, **env):
+        os.environ.update(env)
+        monkeypatch.setattr(sys, "argv", ["run.py", *argv])
+        calls.clear()
+        run.main()
+        return calls[0] if calls else None
+
+    return start
+
+def test_development_mode_reloads(started):
+    options = started()
+    assert options["reload"] is True
+    assert "workers" not in options
+    assert "RATE_LIMIT_BACKEND" not in os.environ
+
+def test_production_shares_the_rate_limiter(started):
+    options = started("--production", "--shutdown-timeout", "5")
+    assert (options["workers"], options["timeout_graceful_shutdown"]) == (4, 5)
+    assert os.environ["RATE_LIMIT_BACKEND"] == "sqlite"
+    assert (os.environ["WORKER_WARMUP"], os.environ["JOB_DRAIN_TIMEOUT"]) == ("true", "5.0")
+
+def test_production_refuses_per_process_rate_limits(started):
+    assert started("--production", RATE_LIMIT_BACKEND="memory") is None
+    assert started("--production", "--workers", "1", RATE_LIMIT_BACKEND="memory")["workers"] == 1
+
+def test_server_mode_selects_production(started):
+    assert started(SERVER_MODE="production", WEB_WORKERS="2")["workers"] == 2
+
+def test_missing_settings_do_not_start(started, monkeypatch):
+    monkeypatch.setattr(os, "environ", {})
+    assert started("--production") is None
+
+def test_fastest_falls_back_when_not_installed():
+    assert run.fastest("no_such_module_here", "asyncio") == "asyncio"
+    assert run.fastest("json", "asyncio") == "json"
+    assert run.cpu_count() >= 1
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+class SlowCall:
+    """Async call that waits until released and counts how often it ran"""
+
+    def __init__(self, result="ok"):
+        self.result = result
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+async def test_concurrent_callers_share_one_call():
+    call = SlowCall()
+    flights = SingleFlight()
+    callers = asyncio.gather(*[flights.run("key", call) for _ in range(5)])
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await callers == ["ok"] * 5
+    assert call.calls == 1
+    assert flights.stats() == {"in_flight": 0, "calls": 1, "shared": 4}
+
+async def test_nothing_is_kept_after_the_call():
+    call = SlowCall()
+    call.release.set()
+    flights = SingleFlight()
+    await flights.run("key", call)
+    await flights.run("key", call)
+    assert call.calls == 2
+
+async def test_failures_reach_every_caller():
+    call = SlowCall(RuntimeError("upstream error"))
+    flights = SingleFlight()
+    callers = asyncio.gather(*[flights.run("key", call) for _ in range(2)], return_exceptions=True)
+    await asyncio.sleep(0)
+    call.release.set()
+    assert [type(result) for result in await callers] == [RuntimeError, RuntimeError]
+
+async def test_cancelled_caller_does_not_cancel_the_others():
+    call = SlowCall()
+    flights = SingleFlight()
+    first = asyncio.create_task(flights.run("key", call))
+    second = asyncio.create_task(flights.run("key", call))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    call.release.set()
+    assert await second == "ok"
+    assert call.calls == 1
@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_fresh(code: str, without: tuple = ()) -> dict:
+    """Run code in a new interpreter, so imports and engines start from nothing"""
+    env = {name: value for name, value in os.environ.items() if name not in without}
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_DIR, env=env,
+        capture_output=True, text=True, check=True, timeout=60
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+def test_importing_the_app_does_no_database_or_parser_work():
+    state = run_fresh(
+        "import json, sys\n"
+        "import app.main\n"
+        "from app import database\n"
+        "print(json.dumps({\n"
+        "    'engines': [database._engine is not None, database._async_engine is not None],\n"
+        "    'heavy_modules': sorted(m for m in ('pandas', 'openpyxl', 'pyarrow') if m in sys.modules),\n"
+        "}))"
+    )
+    assert state == {"engines": [False, False], "heavy_modules": []}
+
+def test_first_session_creates_only_the_sync_engine():
+    state = run_fresh(
+        "import json\n"
+        "from app import database\n"
+        "database.SessionLocal().close()\n"
+        "print(json.dumps([database._engine is not None, database._async_engine is not None]))"
+    )
+    assert state == [True, False]
+
+def test_app_imports_without_database_settings():
+    state = run_fresh(
+        "import json\n"
+        "import app.main\n"
+        "print(json.dumps('imported'))",
+        without=("DATABASE_URL", "ASYNC_DATABASE_URL")
+    )
+    assert state == "imported"
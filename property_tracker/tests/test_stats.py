@@ -0,0 +1,59 @@
+import pytest
+
+from app import stats
+from app.database import PropertyInquiry, SearchSession, SessionLocal
+from app.stats import get_counters, get_top_addresses, rebuild, record_inquiries, record_session
+
+@pytest.fixture
+def db(database):
+    session = SessionLocal()
+    yield session
+    session.close()
+
+def inquiry(address: str, success: bool = True) -> dict:
+    return {"address": address, "search_type": "single", "status": "For Sale" if success else "Error", "success": success}
+
+ROWS = [inquiry("1 Main St"), inquiry("2 Oak Ave"), inquiry("1 Main St", success=False), inquiry("1 Main St")]
+
+def log(db, rows):
+    """Insert inquiry rows and maintain the aggregates, as InquiryWriter does"""
+    db.bulk_insert_mappings(PropertyInquiry, rows)
+    record_inquiries(db, rows)
+    db.commit()
+
+def test_counters_start_at_zero(db):
+    assert get_counters(db) == {name: 0 for name in stats.COUNTER_NAMES}
+    assert get_top_addresses(db) == []
+
+def test_record_inquiries_accumulates_across_batches(db):
+    log(db, ROWS[:2])
+    log(db, ROWS[2:])
+    record_session(db)
+    db.commit()
+
+    assert get_counters(db) == {
+        "total_inquiries": 4, "successful_searches": 3, "failed_searches": 1, "total_sessions": 1
+    }
+    assert get_top_addresses(db) == [{"address": "1 Main St", "count": 3}, {"address": "2 Oak Ave", "count": 1}]
+    assert get_top_addresses(db, limit=1) == [{"address": "1 Main St", "count": 3}]
+
+def test_portable_fallback_matches_upsert(db, monkeypatch):
+    monkeypatch.setattr(stats, "_dialect_insert", lambda db: None)
+    log(db, ROWS[:2])
+    log(db, ROWS[2:])
+    assert get_counters(db)["total_inquiries"] == 4
+    assert get_top_addresses(db)[0] == {"address": "1 Main St", "count": 3}
+
+def test_rebuild_recomputes_from_the_raw_tables(db):
+    db.bulk_insert_mappings(PropertyInquiry, ROWS)
+    db.add(SearchSession(session_id="s1", search_type="bulk"))
+    db.commit()
+    # Aggregates drifted, e.g. rows written before the tables existed
+    record_inquiries(db, [inquiry("9 Elm St")])
+    db.commit()
+
+    rebuild(db)
+    assert get_counters(db) == {
+        "total_inquiries": 4, "successful_searches": 3, "failed_searches": 1, "total_sessions": 1
+    }
+    assert [row["address"] for row in get_top_addresses(db)] == ["1 Main St", "2 Oak Ave"]
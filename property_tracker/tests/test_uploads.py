@@ -0,0 +1,79 @@
+import os
+import threading
+
+import pytest
+
+from app import ingest, main
+from app.database import SearchSession, SessionLocal
+from app.ingest import ADDRESS_LINES_SUFFIX, prepare_upload, shutdown_parse_pool
+
+pytestmark = pytest.mark.anyio
+
+CSV = b'address\n"1 Main St, Austin, TX"\n2 Oak Ave\n'
+
+@pytest.fixture
+def submitted(monkeypatch):
+    """Jobs queued by the endpoint, recorded instead of run"""
+    session_ids = []
+    monkeypatch.setattr(main.job_queue, "submit", session_ids.append)
+    return session_ids
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+async def test_upload_is_spooled_and_queued(client, upload_dir, submitted):
+    response = await client.post("/upload-file", files={"file": ("homes.csv", CSV, "text/csv")}, data={"mode": "refresh"})
+    assert response.status_code == 200
+    job = response.json()
+    assert (job["status"], job["mode"], job["filename"]) == ("queued", "refresh", "homes.csv")
+    assert submitted == [job["session_id"]]
+
+    db = SessionLocal()
+    try:
+        session = db.query(SearchSession).filter(SearchSession.session_id == job["session_id"]).one()
+    finally:
+        db.close()
+    assert os.path.dirname(session.file_path) == str(upload_dir)
+    assert session.file_path.endswith(".csv")
+    with open(session.file_path, "rb") as f:
+        assert f.read() == CSV
+
+async def test_rejected_uploads_leave_nothing_behind(client, upload_dir, submitted, monkeypatch):
+    response = await client.post("/upload-file", files={"file": ("homes.txt", CSV, "text/plain")})
+    assert response.status_code == 400
+    response = await client.post("/upload-file", files={"file": ("homes.csv", CSV, "text/csv")}, data={"mode": "fast"})
+    assert response.status_code == 400
+
+    monkeypatch.setattr(main, "UPLOAD_MAX_BYTES", 10)
+    response = await client.post("/upload-file", files={"file": ("homes.csv", CSV, "text/csv")})
+    assert response.status_code == 413
+    assert (list(upload_dir.iterdir()), submitted) == ([], [])
+
+async def test_prepare_upload_in_a_thread(tmp_path):
+    path = tmp_path / "upload.csv"
+    path.write_bytes(CSV)
+    lines_path, rows = await prepare_upload(str(path))
+
+    assert (lines_path, rows) == (str(tmp_path / f"upload{ADDRESS_LINES_SUFFIX}"), 2)
+    with open(lines_path, encoding="utf-8") as f:
+        assert f.read() == "1 Main St, Austin, TX\n2 Oak Ave\n"
+
+async def test_prepare_upload_in_a_worker_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "UPLOAD_PARSE_WORKERS", 1)
+    path = tmp_path / "upload.csv"
+    path.write_bytes(CSV)
+    try:
+        _, rows = await prepare_upload(str(path))
+        assert ingest._parse_pool is not None
+    finally:
+        shutdown_parse_pool()
+    assert rows == 2
+    assert ingest._parse_pool is None
+
+async def test_shutdown_joins_parse_workers_off_the_event_loop(async_database, monkeypatch):
+    threads = []
+    monkeypatch.setattr(main, "shutdown_parse_pool", lambda: threads.append(threading.current_thread()))
+    await main.shutdown()
+    assert threads and threads[0] is not threading.main_thread()